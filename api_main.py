@@ -1,34 +1,60 @@
-from fastapi import FastAPI, Depends, UploadFile, File, HTTPException, Query, Header
+from fastapi import FastAPI, Depends, UploadFile, File, HTTPException, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import date
 
-from app.database import get_db, engine
-from app.models.enhanced_collection import Base
+from starlette.concurrency import run_in_threadpool
+from app.cofig import DB_CREATE_TABLES
+from app.database import get_db, get_session, create_schema
 from app.crud import (
-    create_collection, get_collections, get_collection_by_record_id,
-    update_collection, delete_collection, get_collections_by_id,
-    get_editable_collections, get_readonly_collections
+    get_collection_by_record_id, update_collection, delete_collection,
+    bulk_update_collections, bulk_delete_collections,
+    get_collection_rows, get_collection_rows_by_id, next_page_cursor, search_collections
 )
+from app.async_crud import run_crud
+from app.cache import collection_cache
+from app.stats import get_collection_stats
+from app.export import EXPORT_FORMATS, export_collections
 from app.schemas import (
     CollectionCreate, CollectionUpdate, CollectionOut, 
-    CollectionHistory, ExcelUploadResponse
+    CollectionHistory, CollectionStats, ExcelUploadResponse, UploadJobStatus,
+    BulkResult, BulkTarget, CollectionBulkUpdate, CollectionSearchHit
 )
-from app.utils.excel_processor import process_excel_data
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.ingest import ingest_excel_file, DUPLICATE_FILE_MESSAGE
+from app.jobs import submit_upload_job, get_job_status
+from app.metrics import (
+    http_request_duration, db_queries_per_request, process_exited, refresh_collectors, render_metrics,
+    start_request_query_count
+)
+from app.utils.formats import SUPPORTED_SUFFIXES
+from app.utils.uploads import spool_upload
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.serialization import collection_dicts, jsonable_collection_dicts, json_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create missing tables once per worker at startup rather than on import"""
+    if DB_CREATE_TABLES:
+        await run_in_threadpool(create_schema)
+    yield
+    process_exited()
+
 # Create FastAPI app
 app = FastAPI(
     title="Collection Management API",
     description="API for managing collections with Excel upload and read-only enforcement",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -38,14 +64,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency and SQL statement count per route template (not per concrete URL)"""
+    queries = start_request_query_count()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    http_request_duration.labels(method=request.method, route=path, status=str(response.status_code)).observe(elapsed)
+    db_queries_per_request.labels(route=path).observe(queries[0])
+    refresh_collectors()
+    return response
+
+UPLOAD_EXTENSIONS = SUPPORTED_SUFFIXES + ('.zip',)
+UPLOAD_EXTENSIONS_ERROR = f"File must be one of: {', '.join(UPLOAD_EXTENSIONS)}"
+
 # Dependency for getting current user (simplified)
 def get_current_user(x_user: str = Header(None, alias="X-User")):
     if not x_user:
         raise HTTPException(status_code=401, detail="Missing X-User header")
     return x_user
 
+async def list_page(limit: int, db, **filters) -> Response:
+    """
+    Run a paged list query as column tuples and serialize it with orjson,
+    with the next-page token in the X-Next-Cursor header
+    """
+    try:
+        rows = await run_crud(get_collection_rows, db, limit=limit, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    next_cursor = next_page_cursor(rows, limit)
+    return json_response(collection_dicts(rows), headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -54,106 +112,239 @@ async def root():
 @app.post("/upload/", response_model=ExcelUploadResponse)
 async def upload_excel(
     file: UploadFile = File(...),
+    all_sheets: bool = Query(False, description="Import every sheet instead of only the first"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
     """
     Upload Excel file and process collections according to business rules
+    
+    .ods, .csv and .parquet files go through the same rules. A .zip archive
+    of such files imports every sheet of every file.
     """
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
+    if not file.filename.lower().endswith(UPLOAD_EXTENSIONS):
+        raise HTTPException(status_code=400, detail=UPLOAD_EXTENSIONS_ERROR)
     
+    path = None
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Process Excel data
-        results, errors = process_excel_data(file_content)
+        # Spool the upload to disk instead of holding it in memory
+        path = await spool_upload(file)
         
-        # Insert records into database
-        records_added = 0
-        for collection_data, read_only in results:
-            try:
-                create_collection(db, collection_data, read_only, current_user)
-                records_added += 1
-            except Exception as e:
-                errors.append(f"Failed to insert record: {str(e)}")
+        # Classify and upsert one chunk of rows at a time; identical files are skipped unparsed
+        result = await run_in_threadpool(
+            ingest_excel_file, db, path, current_user, filename=file.filename, all_sheets=all_sheets
+        )
         
         return ExcelUploadResponse(
-            message="Excel file processed successfully",
-            records_processed=len(results),
-            records_added=records_added,
-            errors=errors
+            message=DUPLICATE_FILE_MESSAGE if result.duplicate_file else "Excel file processed successfully",
+            records_processed=result.records_processed,
+            records_added=result.records_inserted,
+            records_updated=result.records_updated,
+            records_skipped=result.records_skipped,
+            duplicate_file=result.duplicate_file,
+            errors=result.errors
         )
         
     except Exception as e:
         logger.error(f"Error processing upload: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to process file: {str(e)}")
+    finally:
+        if path:
+            os.remove(path)
+
+@app.post("/upload/jobs/", response_model=UploadJobStatus, status_code=202)
+async def submit_upload(
+    file: UploadFile = File(...),
+    all_sheets: bool = Query(False, description="Import every sheet instead of only the first"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Queue an Excel upload for background processing and return its job id
+    """
+    if not file.filename.lower().endswith(UPLOAD_EXTENSIONS):
+        raise HTTPException(status_code=400, detail=UPLOAD_EXTENSIONS_ERROR)
+    
+    path = await spool_upload(file)
+    job_id = submit_upload_job(path, file.filename, current_user, all_sheets=all_sheets)
+    return get_job_status(job_id)
+
+@app.get("/upload/jobs/{job_id}", response_model=UploadJobStatus)
+async def read_upload_job(job_id: str):
+    """
+    Get progress of a background upload: rows processed, rows inserted, errors and throughput
+    """
+    job = get_job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
 
 @app.get("/collections/", response_model=List[CollectionOut])
 async def read_collections(
     ID: Optional[int] = Query(None, description="Filter by ID"),
     read_only: Optional[bool] = Query(None, description="Filter by read-only status"),
+    date_from: Optional[date] = Query(None, description="Only records dated on or after this day"),
+    date_to: Optional[date] = Query(None, description="Only records dated on or before this day"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Next-page token from the X-Next-Cursor header; replaces skip"),
+    db = Depends(get_session)
 ):
     """
-    Get collections with optional filtering
+    Get collections with optional filtering. A date range only reads the
+    monthly partitions it covers on PostgreSQL.
     """
-    collections = get_collections(db, ID=ID, read_only=read_only, skip=skip, limit=limit)
-    return collections
+    return await list_page(
+        limit, db, ID=ID, read_only=read_only, date_from=date_from, date_to=date_to, skip=skip, cursor=cursor
+    )
 
 @app.get("/collections/editable/", response_model=List[CollectionOut])
 async def read_editable_collections(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    db = Depends(get_session)
 ):
     """
     Get only editable collections (read_only = False)
     """
-    collections = get_editable_collections(db, skip=skip, limit=limit)
-    return collections
+    return await list_page(limit, db, read_only=False, skip=skip, cursor=cursor)
 
 @app.get("/collections/readonly/", response_model=List[CollectionOut])
 async def read_readonly_collections(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    db = Depends(get_session)
 ):
     """
     Get only read-only collections
     """
-    collections = get_readonly_collections(db, skip=skip, limit=limit)
-    return collections
+    return await list_page(limit, db, read_only=True, skip=skip, cursor=cursor)
+
+@app.get("/collections/stats", response_model=CollectionStats)
+async def read_collection_stats(
+    top_ids: int = Query(20, ge=0, le=1000, description="How many of the IDs with the most records to list"),
+    db = Depends(get_session)
+):
+    """
+    Totals, read-only vs editable counts, per-date histogram and per-ID record
+    counts, read from summary tables kept current by every write
+    """
+    return await run_crud(get_collection_stats, db, top_ids)
+
+@app.get("/collections/search", response_model=List[CollectionSearchHit])
+async def search_collection_records(
+    q: str = Query(..., min_length=1, max_length=200, description="Name or contact, or the start of one"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of records to return"),
+    db = Depends(get_session)
+):
+    """
+    Records whose name or contact starts with ``q`` (a whole word of the name
+    counts) or looks like it, best match first. Prefix matches score above 1;
+    fuzzy matches score their trigram similarity. A query of only whitespace
+    is rejected with 400.
+    """
+    try:
+        rows = await run_crud(search_collections, db, q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    hits = collection_dicts(rows)
+    for hit, row in zip(hits, rows):
+        hit["score"] = round(row[-1], 4)
+    return json_response(hits)
+
+@app.get("/collections/export")
+def export_collection_records(
+    format: Literal["ndjson", "csv", "xlsx"] = Query("ndjson", description="ndjson, csv or xlsx"),
+    ID: Optional[int] = Query(None, description="Filter by ID"),
+    read_only: Optional[bool] = Query(None, description="Filter by read-only status"),
+    date_from: Optional[date] = Query(None, description="Only records dated on or after this day"),
+    date_to: Optional[date] = Query(None, description="Only records dated on or before this day"),
+    gzip: bool = Query(False, description="Gzip the body (Content-Encoding: gzip)")
+):
+    """
+    Stream every matching record in record_id order. Rows are read from a
+    server-side cursor a batch at a time, so memory stays flat however large
+    the table is; a date range only reads the partitions it covers.
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    headers = {"Content-Disposition": f'attachment; filename="collections.{extension}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_collections(format, ID, read_only, gzip=gzip, date_from=date_from, date_to=date_to),
+        media_type=media_type, headers=headers
+    )
+
+@app.patch("/collections/bulk", response_model=BulkResult)
+async def bulk_update_collection_records(
+    request: CollectionBulkUpdate,
+    db = Depends(get_session),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Apply the same changes to records selected by record_ids and/or a filter.
+    Runs as one UPDATE; read-only records are left untouched and reported.
+    """
+    return await run_crud(bulk_update_collections, db, request, current_user)
+
+@app.delete("/collections/bulk", response_model=BulkResult)
+async def bulk_delete_collection_records(
+    target: BulkTarget,
+    db = Depends(get_session),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Delete records selected by record_ids and/or a filter in one DELETE;
+    read-only records are kept and reported.
+    """
+    return await run_crud(bulk_delete_collections, db, target)
 
 @app.get("/collections/{record_id}", response_model=CollectionOut)
-async def read_collection(record_id: int, db: Session = Depends(get_db)):
+async def read_collection(record_id: int, db = Depends(get_session)):
     """
     Get a specific collection by record_id
     """
-    collection = get_collection_by_record_id(db, record_id)
+    collection = await collection_cache.get_record(
+        record_id, lambda: run_crud(get_collection_by_record_id, db, record_id)
+    )
     if collection is None:
         raise HTTPException(status_code=404, detail="Collection not found")
     return collection
 
 @app.get("/collections/history/{ID}", response_model=CollectionHistory)
-async def read_collection_history(ID: int, db: Session = Depends(get_db)):
+async def read_collection_history(
+    ID: int,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; all records when omitted"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db = Depends(get_session)
+):
     """
     Get all collections for a specific ID (history view)
     """
-    collections = get_collections_by_id(db, ID)
-    if not collections:
+    async def load_history():
+        return jsonable_collection_dicts(await run_crud(get_collection_rows_by_id, db, ID))
+
+    try:
+        if limit is None and cursor is None:
+            collections = await collection_cache.get_history_dicts(ID, load_history)
+            next_cursor = None
+        else:
+            rows = await run_crud(get_collection_rows_by_id, db, ID, limit=limit, cursor=cursor)
+            collections = collection_dicts(rows)
+            next_cursor = next_page_cursor(rows, limit, history=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not collections and cursor is None:
         raise HTTPException(status_code=404, detail=f"No collections found for ID {ID}")
     
-    return CollectionHistory(ID=ID, collections=collections)
+    return json_response({"id": ID, "collections": collections, "next_cursor": next_cursor})
 
 @app.put("/collections/{record_id}", response_model=CollectionOut)
 async def update_collection_record(
     record_id: int,
     update_data: CollectionUpdate,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: str = Depends(get_current_user)
 ):
     """
@@ -163,7 +354,7 @@ async def update_collection_record(
         # Set the current user as the updater
         update_data.last_updated_by = current_user
         
-        collection = update_collection(db, record_id, update_data)
+        collection = await run_crud(update_collection, db, record_id, update_data)
         if collection is None:
             raise HTTPException(status_code=404, detail="Collection not found")
         return collection
@@ -173,20 +364,31 @@ async def update_collection_record(
 @app.delete("/collections/{record_id}")
 async def delete_collection_record(
     record_id: int,
-    db: Session = Depends(get_db),
+    db = Depends(get_session),
     current_user: str = Depends(get_current_user)
 ):
     """
     Delete a collection record (only if not read-only)
     """
     try:
-        success = delete_collection(db, record_id)
+        success = await run_crud(delete_collection, db, record_id)
         if not success:
             raise HTTPException(status_code=404, detail="Collection not found")
         return {"message": "Collection deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=403, detail=str(e))
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the record and history cache"""
+    return collection_cache.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Request, query, upload, cache and pool metrics of every API worker in Prometheus text format"""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,250 @@
+from sqlalchemy import insert, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app import crud, stats
+from app.cache import collection_cache
+from app.cofig import BULK_INSERT_BATCH_SIZE, DB_ASYNC
+from app.crud import (
+    collections_query, collection_by_record_id_query, collections_by_id_query,
+    apply_collection_update, check_deletable, collection_values, COLLECTION_OUT_COLUMNS,
+    search_collections as search_collections_sync, bulk_target_clauses, bulk_matches_query, bulk_update_statement, bulk_delete_statement, bulk_result
+)
+from app.models.enhanced_collection import Collection
+from app.schemas import (
+    BulkResult, BulkTarget, CollectionBulkUpdate, CollectionCreate, CollectionStats, CollectionUpdate
+)
+from app.search import check_search_query, invalidate_search, trigram_search_query, uses_trigram_sql
+from app.stats import (
+    check_stats_support, date_stats_query, distinct_ids_query, refresh_stats_async, summarize_stats, top_ids_query,
+    undated_stats_query
+)
+from datetime import date, datetime
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+# asyncio counterparts of app.crud; same statements and business rules, awaited on an AsyncSession
+
+async def create_collection(db: AsyncSession, data: CollectionCreate, read_only: bool, user: str = "system") -> Collection:
+    """Create a new collection record with proper business logic"""
+    check_stats_support(db)
+    db_entry = Collection(**collection_values(data, read_only, user, datetime.utcnow()))
+    db.add(db_entry)
+    await db.commit()
+    await db.refresh(db_entry)
+    collection_cache.invalidate(ids=[db_entry.id])
+    invalidate_search(db, [db_entry.id])
+    await refresh_stats_async(db, dates=[db_entry.date], ids=[db_entry.id])
+    return db_entry
+
+async def bulk_create_collections(
+    db: AsyncSession,
+    rows: Iterable[Tuple[CollectionCreate, bool]],
+    user: str = "system",
+    batch_size: int = BULK_INSERT_BATCH_SIZE
+) -> Tuple[int, List[str]]:
+    """Insert (data, read_only) pairs in batches; see crud.bulk_create_collections"""
+    check_stats_support(db)
+    records_added = 0
+    errors = []
+    rows = iter(rows)
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        now = datetime.utcnow()
+        values = [collection_values(data, read_only, user, now) for data, read_only in batch]
+        try:
+            await db.execute(insert(Collection), values)
+            await db.commit()
+            records_added += len(values)
+        except Exception:
+            await db.rollback()
+            for row in values:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(Collection), [row])
+                    records_added += 1
+                except Exception as e:
+                    errors.append(f"Failed to insert record (ID {row['id']}): {str(e)}")
+            await db.commit()
+        collection_cache.invalidate(ids={row["id"] for row in values})
+        invalidate_search(db, {row["id"] for row in values})
+        await refresh_stats_async(db, dates=[row["date"] for row in values], ids=[row["id"] for row in values])
+
+    return records_added, errors
+
+async def get_collections(
+    db: AsyncSession,
+    ID: Optional[int] = None,
+    read_only: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> List[Collection]:
+    """Get collections with optional filtering"""
+    result = await db.execute(
+        collections_query(ID, read_only, skip, limit, cursor, date_from=date_from, date_to=date_to)
+    )
+    return result.scalars().all()
+
+async def get_collection_rows(
+    db: AsyncSession,
+    ID: Optional[int] = None,
+    read_only: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> List[Row]:
+    """get_collections as CollectionOut column tuples, for the orjson list responses"""
+    result = await db.execute(
+        collections_query(ID, read_only, skip, limit, cursor, COLLECTION_OUT_COLUMNS, date_from, date_to)
+    )
+    return result.all()
+
+async def get_collection_by_record_id(db: AsyncSession, record_id: int) -> Optional[Collection]:
+    """Get a specific collection by its record_id"""
+    result = await db.execute(collection_by_record_id_query(record_id))
+    return result.scalars().first()
+
+async def get_collections_by_id(
+    db: AsyncSession, ID: int, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> List[Collection]:
+    """Get all collections for a specific ID (for history view)"""
+    result = await db.execute(collections_by_id_query(ID, limit, cursor))
+    return result.scalars().all()
+
+async def get_collection_rows_by_id(
+    db: AsyncSession, ID: int, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> List[Row]:
+    """get_collections_by_id as CollectionOut column tuples"""
+    result = await db.execute(collections_by_id_query(ID, limit, cursor, COLLECTION_OUT_COLUMNS))
+    return result.all()
+
+async def update_collection(db: AsyncSession, record_id: int, update_data: CollectionUpdate) -> Optional[Collection]:
+    """Update a collection record with read-only enforcement"""
+    check_stats_support(db)
+    db_obj = await get_collection_by_record_id(db, record_id)
+    if not db_obj:
+        return None
+
+    old_date = db_obj.date
+    apply_collection_update(db_obj, update_data)
+
+    await db.commit()
+    await db.refresh(db_obj)
+    collection_cache.invalidate(record_ids=[record_id], ids=[db_obj.id])
+    invalidate_search(db, [db_obj.id])
+    await refresh_stats_async(db, dates=[old_date, db_obj.date], ids=[db_obj.id])
+    return db_obj
+
+async def delete_collection(db: AsyncSession, record_id: int) -> bool:
+    """Delete a collection record"""
+    check_stats_support(db)
+    db_obj = await get_collection_by_record_id(db, record_id)
+    if not db_obj:
+        return False
+
+    check_deletable(db_obj)
+
+    await db.delete(db_obj)
+    await db.commit()
+    collection_cache.invalidate(record_ids=[record_id], ids=[db_obj.id])
+    invalidate_search(db, [db_obj.id])
+    await refresh_stats_async(db, dates=[db_obj.date], ids=[db_obj.id])
+    return True
+
+async def bulk_update_collections(db: AsyncSession, request: CollectionBulkUpdate, user: str) -> BulkResult:
+    """Apply the same changes to every editable record the request matches, in one UPDATE"""
+    check_stats_support(db)
+    clauses = bulk_target_clauses(request)
+    matched = (await db.execute(bulk_matches_query(clauses))).all()
+    updated = (await db.execute(bulk_update_statement(clauses, request, user))).all()
+    await db.commit()
+
+    ids = {row.id for row in matched + updated}
+    collection_cache.invalidate(record_ids=[row.record_id for row in updated], ids=ids)
+    invalidate_search(db, ids)
+    dates = [row.date for row in matched + updated] + [request.changes.date]
+    await refresh_stats_async(db, dates=dates, ids=ids)
+    return bulk_result(request, [row.record_id for row in matched], [row.record_id for row in updated], "updated")
+
+async def bulk_delete_collections(db: AsyncSession, target: BulkTarget) -> BulkResult:
+    """Delete every editable record the request matches, in one DELETE"""
+    check_stats_support(db)
+    clauses = bulk_target_clauses(target)
+    matched = (await db.execute(bulk_matches_query(clauses))).all()
+    deleted = (await db.execute(bulk_delete_statement(clauses))).all()
+    await db.commit()
+
+    ids = {row.id for row in matched + deleted}
+    collection_cache.invalidate(record_ids=[row.record_id for row in deleted], ids=ids)
+    invalidate_search(db, ids)
+    await refresh_stats_async(db, dates=[row.date for row in matched + deleted], ids=ids)
+    return bulk_result(target, [row.record_id for row in matched], [row.record_id for row in deleted], "deleted")
+
+async def search_collections(db: AsyncSession, q: str, limit: int = 20) -> List[tuple]:
+    """Ranked name/contact search; the in-process index is synced on the sync connection"""
+    check_search_query(q)
+    if uses_trigram_sql(db):
+        return (await db.execute(trigram_search_query(q, limit, COLLECTION_OUT_COLUMNS))).all()
+    return await db.run_sync(search_collections_sync, q, limit)
+
+async def get_editable_collections(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Collection]:
+    """Get only editable collections (read_only = False)"""
+    return await get_collections(db, read_only=False, skip=skip, limit=limit, cursor=cursor)
+
+async def get_readonly_collections(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Collection]:
+    """Get only read-only collections"""
+    return await get_collections(db, read_only=True, skip=skip, limit=limit, cursor=cursor)
+
+async def get_collection_stats(db: AsyncSession, top_ids: int = 20) -> CollectionStats:
+    """Dashboard totals read from the summary tables"""
+    return summarize_stats(
+        (await db.execute(date_stats_query())).all(),
+        (await db.execute(top_ids_query(top_ids))).all(),
+        (await db.execute(distinct_ids_query())).scalar_one(),
+        (await db.execute(undated_stats_query())).all()
+    )
+
+# Sync crud function -> its counterpart in this module, for run_crud
+ASYNC_COUNTERPARTS = {
+    crud.create_collection: create_collection,
+    crud.bulk_create_collections: bulk_create_collections,
+    crud.get_collections: get_collections,
+    crud.get_collection_rows: get_collection_rows,
+    crud.get_collection_by_record_id: get_collection_by_record_id,
+    crud.get_collections_by_id: get_collections_by_id,
+    crud.get_collection_rows_by_id: get_collection_rows_by_id,
+    crud.update_collection: update_collection,
+    crud.delete_collection: delete_collection,
+    crud.bulk_update_collections: bulk_update_collections,
+    crud.bulk_delete_collections: bulk_delete_collections,
+    crud.search_collections: search_collections,
+    crud.get_editable_collections: get_editable_collections,
+    crud.get_readonly_collections: get_readonly_collections,
+    stats.get_collection_stats: get_collection_stats,
+}
+
+async def run_crud(func, db, *args, **kwargs):
+    """
+    Call a crud function without blocking the event loop.
+
+    With DB_ASYNC its coroutine counterpart (ASYNC_COUNTERPARTS) is awaited on
+    the AsyncSession; otherwise the sync function runs in the threadpool.
+    Raises TypeError for a function without a counterpart.
+    """
+    if func not in ASYNC_COUNTERPARTS:
+        raise TypeError(f"{func.__module__}.{func.__qualname__} has no async counterpart")
+    if DB_ASYNC:
+        return await ASYNC_COUNTERPARTS[func](db, *args, **kwargs)
+    return await run_in_threadpool(func, db, *args, **kwargs)
@@ -0,0 +1,275 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+from app.cofig import CACHE_ENABLED, CACHE_MAX_ENTRIES, CACHE_READ_ONLY_TTL_SECONDS, CACHE_TTL_SECONDS, CACHE_REDIS_URL
+from app.metrics import register_collector
+from app.schemas import CollectionOut
+
+# Sentinel for "not in cache" so cached empty values are still hits
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with optional per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """Store a value; ``ttl=None`` keeps it until evicted or deleted"""
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedBackend(ABC):
+    """Cache shared between API workers; values are JSON strings"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+
+class LocalSharedBackend(SharedBackend):
+    """In-memory stand-in for a shared cache, for tests and single-host development"""
+
+    def __init__(self):
+        self._cache = LRUCache(max_entries=1_000_000)
+
+    def get(self, key):
+        value = self._cache.get(key)
+        return None if value is MISSING else value
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, ttl)
+
+    def delete(self, *keys):
+        self._cache.delete(*keys)
+
+
+class RedisBackend(SharedBackend):
+    """Shared cache in Redis; requires the optional ``redis`` package"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, value, ex=int(ttl) if ttl is not None else None)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+
+class CollectionCache:
+    """
+    Read-through cache for single records and per-ID history.
+
+    Read-only records rarely change, so they expire after the longer
+    ``read_only_ttl`` (still bounded: archival and deletes elsewhere must
+    reach every worker); editable records and histories expire after ``ttl``
+    seconds. Writers call
+    ``invalidate`` with the record_ids and IDs they touched.
+
+    Without a shared backend entries live in an in-process LRU, which other
+    API workers' invalidations never reach, so their copies are only
+    refreshed by the TTLs. With one, every lookup goes to the shared backend
+    and the in-process tier is not used, so an invalidation is seen by all
+    workers at once.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+        read_only_ttl: float = CACHE_READ_ONLY_TTL_SECONDS,
+        shared: Optional[SharedBackend] = None,
+        enabled: bool = True
+    ):
+        self.local = LRUCache(max_entries)
+        self.shared = shared
+        self.ttl = ttl
+        self.read_only_ttl = read_only_ttl
+        self.enabled = enabled
+        self.hits = {"record": 0, "history": 0}
+        self.misses = {"record": 0, "history": 0}
+        # Bumped on every invalidation so a load that raced with a write is not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    async def get_record(
+        self, record_id: int, load: Callable[[], Awaitable[Optional[object]]]
+    ) -> Optional[CollectionOut]:
+        """Cached CollectionOut for a record_id, loading the ORM row on a miss"""
+        if not self.enabled:
+            row = await load()
+            return CollectionOut.model_validate(row) if row is not None else None
+
+        key = f"record:{record_id}"
+        cached = self._get(key, "record")
+        if cached is not MISSING:
+            return CollectionOut.model_validate(cached)
+
+        generation = self._generation
+        row = await load()
+        if row is None:
+            return None
+        collection = CollectionOut.model_validate(row)
+        self._set(key, collection.model_dump(mode="json"), generation)
+        return collection
+
+    async def get_history(
+        self, ID: int, load: Callable[[], Awaitable[List[object]]]
+    ) -> List[CollectionOut]:
+        """Cached full history for an ID, loading the ORM rows on a miss"""
+        if not self.enabled:
+            return [CollectionOut.model_validate(row) for row in await load()]
+
+        key = f"history:{ID}"
+        cached = self._get(key, "history")
+        if cached is not MISSING:
+            return [CollectionOut.model_validate(item) for item in cached]
+
+        generation = self._generation
+        collections = [CollectionOut.model_validate(row) for row in await load()]
+        if collections:
+            self._set(key, [c.model_dump(mode="json") for c in collections], generation)
+        return collections
+
+    async def get_history_dicts(self, ID: int, load: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+        """
+        get_history for the orjson path: ``load`` returns JSON-ready dicts
+        (serialization.jsonable_collection_dicts) and hits are returned as
+        stored, without building CollectionOut objects. Shares entries with
+        get_history.
+        """
+        if not self.enabled:
+            return await load()
+
+        key = f"history:{ID}"
+        cached = self._get(key, "history")
+        if cached is not MISSING:
+            return cached
+
+        generation = self._generation
+        collections = await load()
+        if collections:
+            self._set(key, collections, generation)
+        return collections
+
+    def invalidate(self, record_ids: Iterable[int] = (), ids: Iterable[int] = ()) -> None:
+        """Drop cached entries for the given record_ids and IDs"""
+        keys = [f"record:{r}" for r in record_ids] + [f"history:{i}" for i in ids]
+        if not keys:
+            return
+        with self._lock:
+            self._generation += 1
+        self.local.delete(*keys)
+        if self.shared:
+            self.shared.delete(*keys)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self.local),
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+            }
+
+    def _get(self, key: str, kind: str):
+        if self.shared:
+            raw = self.shared.get(key)
+            value = json.loads(raw) if raw is not None else MISSING
+        else:
+            value = self.local.get(key)
+        with self._lock:
+            if value is MISSING:
+                self.misses[kind] += 1
+            else:
+                self.hits[kind] += 1
+        return value
+
+    def _set(self, key: str, value, generation: int) -> None:
+        if self._generation != generation:
+            return
+        ttl = self._ttl_for(value)
+        if self.shared:
+            self.shared.set(key, json.dumps(value), ttl)
+        else:
+            self.local.set(key, value, ttl)
+
+    def _ttl_for(self, value) -> float:
+        """Read-only records get the longer read-only TTL; everything else uses the TTL"""
+        if isinstance(value, dict) and value.get("read_only"):
+            return self.read_only_ttl
+        return self.ttl
+
+
+collection_cache = CollectionCache(
+    shared=RedisBackend(CACHE_REDIS_URL) if CACHE_REDIS_URL else None,
+    enabled=CACHE_ENABLED
+)
+
+register_collector(
+    "collection_cache_hits_total", "Collection cache hits by kind", ("kind",),
+    lambda: {(kind,): n for kind, n in collection_cache.hits.items()}, kind="counter"
+)
+register_collector(
+    "collection_cache_misses_total", "Collection cache misses by kind", ("kind",),
+    lambda: {(kind,): n for kind, n in collection_cache.misses.items()}, kind="counter"
+)
+register_collector(
+    "collection_cache_entries", "Entries in the in-process collection cache", (),
+    lambda: {(): len(collection_cache.local)}
+)
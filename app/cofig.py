@@ -17,6 +17,108 @@ DATABASE_URL = os.getenv(
     f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
 )
 
+# Serve API queries through SQLAlchemy asyncio (asyncpg) instead of blocking sessions
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Async driver URL derived from DATABASE_URL unless given explicitly
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1).replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+
+# Production server (serve.py): uvicorn worker processes, one per CPU by default
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+
+# SQLAlchemy connection pool, per engine in each API worker process (DB_ASYNC workers also keep
+# a sync engine for uploads). DB_MAX_CONNECTIONS is what all workers together may open, below
+# Postgres max_connections (100 by default) with room for cron and admin sessions; the pool
+# defaults split it between WEB_CONCURRENCY workers, capped at 10 + 10 per engine.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+_CONNECTIONS_PER_ENGINE = max(2, DB_MAX_CONNECTIONS // (WEB_CONCURRENCY * (2 if DB_ASYNC else 1)))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(min(10, _CONNECTIONS_PER_ENGINE // 2))))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(min(10, _CONNECTIONS_PER_ENGINE - DB_POOL_SIZE))))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Seconds after which a pooled connection is replaced (-1 = never)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Server-side limit per SQL statement on PostgreSQL, in milliseconds (0 = no limit)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# Create missing tables when an API worker starts (serve.py does it once before starting
+# its workers). Set false when the schema is managed by init.sql or migrations.
+DB_CREATE_TABLES = os.getenv("DB_CREATE_TABLES", "true").lower() in ("1", "true", "yes")
+
+# Number of rows written per transaction by bulk uploads
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+
+# Rows fetched per round trip (and encoded per chunk) by /collections/export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Lowest trigram similarity (0-1) /collections/search accepts as a fuzzy match; prefix matches always count.
+# On Postgres the % operator uses pg_trgm.similarity_threshold (also 0.3 by default) for the index lookup.
+SEARCH_SIMILARITY = float(os.getenv("SEARCH_SIMILARITY", "0.3"))
+
+# PostgreSQL partitions collections by month of date (app.partitions). Partitions are created
+# this many months ahead at startup and by `python -m app.partitions`; rows outside them wait in
+# the default partition until the next run splits them out.
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+# Archival (`python -m app.partitions --archive`): months older than ARCHIVE_AFTER_MONTHS holding
+# only read-only records are taken out of collections. "detach" moves them to the ARCHIVE_SCHEMA
+# schema; "export" writes them to ARCHIVE_DIR as gzipped NDJSON and drops them.
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "24"))
+ARCHIVE_MODE = os.getenv("ARCHIVE_MODE", "detach")
+ARCHIVE_SCHEMA = os.getenv("ARCHIVE_SCHEMA", "archive")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+# Rows read from a worksheet per chunk when streaming uploads
+EXCEL_CHUNK_SIZE = int(os.getenv("EXCEL_CHUNK_SIZE", "5000"))
+
+# Excel reader: "auto" picks the fastest installed engine (calamine, then openpyxl/xlrd/odf) for
+# files up to EXCEL_STREAM_THRESHOLD_MB, and streams larger .xlsx/.xlsm files with openpyxl, which
+# keeps memory bounded by the chunk size at a lower row rate (calamine loads the whole sheet).
+# Naming an engine ("calamine", "openpyxl", ...) uses it for every size.
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "auto")
+EXCEL_STREAM_THRESHOLD_MB = float(os.getenv("EXCEL_STREAM_THRESHOLD_MB", "10"))
+
+# Directory uploads are spooled to before parsing (None = system temp dir)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Worker processes parsing sheets in parallel for zip and all-sheets uploads (1 = parse inline).
+# One pool per API worker, started on the first such upload and shared by all later ones.
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# Zip uploads: archives with more members, or whose readable files unpack to more than
+# ZIP_MAX_UNCOMPRESSED_MB in total, are refused
+ZIP_MAX_MEMBERS = int(os.getenv("ZIP_MAX_MEMBERS", "1000"))
+ZIP_MAX_UNCOMPRESSED_MB = float(os.getenv("ZIP_MAX_UNCOMPRESSED_MB", "1024"))
+
+# Background upload jobs: worker threads and where job state is kept ("memory" or "database").
+# serve.py defaults to "database" when it starts several workers, which must see the same jobs.
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "2"))
+UPLOAD_JOB_STORE = os.getenv("UPLOAD_JOB_STORE", "memory")
+
+# Read-through cache for record and history lookups. Read-only records rarely change, so they
+# expire after the longer CACHE_READ_ONLY_TTL_SECONDS (the bound on how long other workers may
+# serve a record archived or deleted elsewhere); CACHE_REDIS_URL adds a shared tier (needs the
+# redis package).
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_READ_ONLY_TTL_SECONDS = float(os.getenv("CACHE_READ_ONLY_TTL_SECONDS", "3600"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL") or None
+
+# Connection pool for the legacy MySQL models (app/db.py). Idle connections older than
+# MYSQL_POOL_PING_AFTER seconds are pinged before reuse (0 = always ping).
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "30"))
+MYSQL_POOL_PING_AFTER = float(os.getenv("MYSQL_POOL_PING_AFTER", "0"))
+
+# Rows pulled per round trip by the streaming legacy fetches (iter_collections etc.)
+LEGACY_FETCH_BATCH_SIZE = int(os.getenv("LEGACY_FETCH_BATCH_SIZE", "500"))
+
 # MySQL configuration for legacy code
 MYSQL_CONFIG = {
     "host": os.getenv("MYSQL_HOST", "localhost"),
@@ -1,59 +1,327 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, delete, func, insert, select, tuple_, update, Row, Select
+from app.cache import collection_cache
+from app.cofig import BULK_INSERT_BATCH_SIZE
+from app.database import UPSERT_INSERTS
 from app.models.enhanced_collection import Collection
-from app.schemas import CollectionCreate, CollectionUpdate
-from datetime import datetime
-from typing import List, Optional
+from app.schemas import BulkOutcome, BulkResult, BulkTarget, CollectionBulkUpdate, CollectionCreate, CollectionUpdate
+from app.search import (
+    check_search_query, index_for, invalidate_search, rows_in_rank_order, trigram_search_query, uses_trigram_sql
+)
+from app.stats import check_stats_support, refresh_stats
+from app.utils.dedup import UploadKeys, row_fingerprint
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.serialization import COLLECTION_FIELDS
+from datetime import date, datetime
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+# Columns behind CollectionOut, in field order, for list queries that skip the ORM
+COLLECTION_OUT_COLUMNS = tuple(getattr(Collection, field) for field in COLLECTION_FIELDS)
 
 def create_collection(db: Session, data: CollectionCreate, read_only: bool, user: str = "system") -> Collection:
     """Create a new collection record with proper business logic"""
-    db_entry = Collection(
-        id=data.id,
-        name=data.name,
-        email=data.email,
-        contact=data.contact,
-        date=data.date or datetime.utcnow().date(),
-        read_only=read_only,
-        last_updated_by=user,
-        last_updated_at=datetime.utcnow()
-    )
+    check_stats_support(db)
+    db_entry = Collection(**collection_values(data, read_only, user, datetime.utcnow()))
     db.add(db_entry)
     db.commit()
     db.refresh(db_entry)
+    collection_cache.invalidate(ids=[db_entry.id])
+    invalidate_search(db, [db_entry.id])
+    refresh_stats(db, dates=[db_entry.date], ids=[db_entry.id])
     return db_entry
 
-def get_collections(
-    db: Session, 
-    ID: Optional[int] = None, 
+def bulk_create_collections(
+    db: Session,
+    rows: Iterable[Tuple[CollectionCreate, bool]],
+    user: str = "system",
+    batch_size: int = BULK_INSERT_BATCH_SIZE
+) -> Tuple[int, List[str]]:
+    """
+    Insert (data, read_only) pairs in batches, one transaction per batch.
+
+    Each batch is sent as a single executemany INSERT. If a batch fails it is
+    rolled back and retried row by row (each row in its own savepoint) so only
+    the offending rows are reported. Returns (records_added, errors).
+    """
+    check_stats_support(db)
+    records_added = 0
+    errors = []
+    rows = iter(rows)
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        now = datetime.utcnow()
+        values = [collection_values(data, read_only, user, now) for data, read_only in batch]
+        try:
+            db.execute(insert(Collection), values)
+            db.commit()
+            records_added += len(values)
+        except Exception:
+            db.rollback()
+            added, batch_errors = _insert_rows_individually(db, values)
+            records_added += added
+            errors.extend(batch_errors)
+        collection_cache.invalidate(ids={row["id"] for row in values})
+        invalidate_search(db, {row["id"] for row in values})
+        refresh_stats(db, dates=[row["date"] for row in values], ids=[row["id"] for row in values])
+
+    return records_added, errors
+
+def collection_values(data: CollectionCreate, read_only: bool, user: str, now: datetime) -> dict:
+    """Column values for a new record; shared by the single-row and bulk inserts"""
+    return {
+        "id": data.id,
+        "name": data.name,
+        "email": data.email,
+        "contact": data.contact,
+        "date": data.date or now.date(),
+        "read_only": read_only,
+        "last_updated_by": user,
+        "last_updated_at": now,
+    }
+
+def _insert_rows_individually(db: Session, values: List[dict]) -> Tuple[int, List[str]]:
+    """Fallback for a failed batch: insert each row in a savepoint and collect failures"""
+    added = 0
+    errors = []
+    for row in values:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Collection), [row])
+            added += 1
+        except Exception as e:
+            errors.append(f"Failed to insert record (ID {row['id']}): {str(e)}")
+    db.commit()
+    return added, errors
+
+def upsert_collections(
+    db: Session,
+    rows: Iterable[Tuple[CollectionCreate, bool]],
+    user: str = "system",
+    batch_size: int = BULK_INSERT_BATCH_SIZE
+) -> Tuple[int, int, int, List[str]]:
+    """
+    Upload path for (data, read_only) pairs: insert new rows, fill in blanks
+    of records uploaded before, and skip the rest.
+
+    Rows are matched on upload_key (ID, sheet date and occurrence, see
+    dedup.upload_key) and compared by fingerprint (ID, name, contact, sheet
+    date), so unchanged rows never reach the database. Distinct rows sharing
+    an ID and date in one file become separate records; identical rows
+    collapse into one; the keys and fingerprints seen so far are kept on
+    disk (dedup.UploadKeys), not in memory.
+    A matched record only takes the sheet's name or contact where its own
+    is still NULL: values entered since the first upload (and email, which
+    sheets never carry) are never overwritten, nor are read-only records. A
+    record the fill-in completes becomes read-only, as it would have been
+    had it been uploaded complete.
+    New and updated rows of a batch go out as one INSERT ... ON CONFLICT DO
+    UPDATE. Returns (inserted, updated, skipped, errors).
+    """
+    check_stats_support(db)
+    inserted = updated = skipped = 0
+    errors = []
+    from app.partitions import is_partitioned  # app.partitions imports this module
+
+    rows = iter(rows)
+    statement = upsert_statement(db.get_bind().dialect.name, is_partitioned(db))
+
+    with UploadKeys() as keys:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            counts = _upsert_batch(db, statement, keys, batch, user)
+            inserted += counts[0]
+            updated += counts[1]
+            skipped += counts[2]
+            errors.extend(counts[3])
+
+    return inserted, updated, skipped, errors
+
+def _upsert_batch(
+    db: Session, statement, keys: UploadKeys, batch: List[Tuple[CollectionCreate, bool]], user: str
+) -> Tuple[int, int, int, List[str]]:
+    """One batch of upsert_collections; returns its (inserted, updated, skipped, errors)"""
+    skipped = 0
+    errors = []
+    now = datetime.utcnow()
+    rows = []
+    for data, read_only in batch:
+        row = collection_values(data, read_only, user, now)
+        # Undated rows are stored under the upload day but keyed without a date
+        sheet_date = data.date if "date" in data.model_fields_set else None
+        row["row_fingerprint"] = row_fingerprint(row["id"], row["name"], row["contact"], sheet_date)
+        rows.append((row, sheet_date))
+
+    values = {}
+    assigned = keys.keys_for((row["id"], sheet_date, row["row_fingerprint"]) for row, sheet_date in rows)
+    for (row, _), key in zip(rows, assigned):
+        if key is None:  # identical to a row earlier in the upload
+            skipped += 1
+            continue
+        row["upload_key"] = key
+        values[key] = row
+    if not values:
+        return 0, 0, skipped, errors
+
+    stored = {
+        row.upload_key: row
+        for row in db.execute(
+            select(
+                Collection.upload_key, Collection.record_id, Collection.row_fingerprint, Collection.read_only,
+                Collection.name, Collection.contact, Collection.date
+            ).where(Collection.upload_key.in_(list(values)))
+        )
+    }
+    changes = []  # (row, record_id of the record it fills in, None for a new record)
+    for key, row in values.items():
+        record = stored.get(key)
+        if record is None:
+            changes.append((row, None))
+        elif record.row_fingerprint == row["row_fingerprint"] or not fills_blanks(record, row):
+            skipped += 1
+        elif record.read_only:
+            skipped += 1
+            errors.append(f"Skipped change to read-only record (ID {row['id']}, date {record.date})")
+        else:
+            # An undated row's date is the upload day; keep the stored record's
+            row["date"] = record.date
+            changes.append((row, record.record_id))
+    if not changes:
+        return 0, 0, skipped, errors
+
+    try:
+        db.execute(statement, [row for row, _ in changes])
+        db.commit()
+        written = changes
+    except Exception:
+        db.rollback()
+        written = []
+        for row, record_id in changes:
+            try:
+                with db.begin_nested():
+                    db.execute(statement, [row])
+                written.append((row, record_id))
+            except Exception as e:
+                errors.append(f"Failed to insert record (ID {row['id']}): {str(e)}")
+        db.commit()
+
+    filled = [record_id for _, record_id in written if record_id is not None]
+    ids = {row["id"] for row, _ in written}
+    collection_cache.invalidate(record_ids=filled, ids=ids)
+    invalidate_search(db, ids)
+    refresh_stats(db, dates=[row["date"] for row, _ in written], ids=ids)
+    return len(written) - len(filled), len(filled), skipped, errors
+
+# Columns a sheet provides; a re-upload may only fill these in where they are still NULL
+UPLOAD_FILLABLE_COLUMNS = ("name", "contact")
+
+def fills_blanks(record, row: dict) -> bool:
+    """Whether an uploaded row has a value for a sheet column the stored record lacks"""
+    return any(getattr(record, column) is None and row[column] is not None for column in UPLOAD_FILLABLE_COLUMNS)
+
+def upsert_statement(dialect_name: str, partitioned: bool = False):
+    """
+    INSERT ... ON CONFLICT on the upload key DO UPDATE that only fills NULL
+    sheet columns (COALESCE keeps whatever the record already has), makes
+    the record read-only once both are filled, and leaves read-only records
+    alone. ``partitioned`` (see
+    partitions.is_partitioned) selects the partitioned table's unique key.
+    """
+    if dialect_name not in UPSERT_INSERTS:
+        raise ValueError(f"Upload upserts are not supported on {dialect_name}")
+    statement = UPSERT_INSERTS[dialect_name](Collection)
+    # A partitioned table can only have upload_key unique together with date; tables
+    # created before partitioning keep UNIQUE (upload_key)
+    conflict_target = [Collection.upload_key, Collection.date] if partitioned else [Collection.upload_key]
+    fill = {column: func.coalesce(getattr(Collection, column), statement.excluded[column]) for column in UPLOAD_FILLABLE_COLUMNS}
+    return statement.on_conflict_do_update(
+        index_elements=conflict_target,
+        set_={
+            **fill,
+            # Complete once filled in (name and contact, besides the ID): read-only, as on insert
+            "read_only": and_(*(
+                func.coalesce(getattr(Collection, column), statement.excluded[column]).isnot(None)
+                for column in UPLOAD_FILLABLE_COLUMNS
+            )),
+            "last_updated_by": statement.excluded.last_updated_by,
+            "last_updated_at": statement.excluded.last_updated_at,
+        },
+        where=and_(
+            Collection.read_only.isnot(True),
+            or_(*(getattr(Collection, column).is_(None) for column in UPLOAD_FILLABLE_COLUMNS))
+        )
+    )
+
+def collections_query(
+    ID: Optional[int] = None,
     read_only: Optional[bool] = None,
-    skip: int = 0, 
-    limit: int = 100
-) -> List[Collection]:
-    """Get collections with optional filtering"""
-    query = db.query(Collection)
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    columns: Optional[tuple] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> Select:
+    """
+    SELECT behind get_collections; shared with the async crud.
+
+    Rows come in record_id order. With a cursor the page starts after the
+    record it points at (keyset pagination) and ``skip`` is ignored.
+    ``columns`` selects those columns as tuples instead of ORM objects.
+    ``date_from``/``date_to`` (inclusive) let PostgreSQL skip the monthly
+    partitions outside the range.
+    """
+    query = select(*columns) if columns else select(Collection)
     
     if ID is not None:
-        query = query.filter(Collection.id == ID)
+        query = query.where(Collection.id == ID)
     if read_only is not None:
-        query = query.filter(Collection.read_only == read_only)
+        query = query.where(Collection.read_only == read_only)
+    if date_from is not None:
+        query = query.where(Collection.date >= date_from)
+    if date_to is not None:
+        query = query.where(Collection.date <= date_to)
     
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(Collection.record_id)
+    if cursor:
+        last_record_id, _ = decode_cursor(cursor)
+        return query.where(Collection.record_id > last_record_id).limit(limit)
+    return query.offset(skip).limit(limit)
 
-def get_collection_by_record_id(db: Session, record_id: int) -> Optional[Collection]:
-    """Get a specific collection by its record_id"""
-    return db.query(Collection).filter(Collection.record_id == record_id).first()
+def collection_by_record_id_query(record_id: int) -> Select:
+    return select(Collection).where(Collection.record_id == record_id).limit(1)
 
-def get_collections_by_id(db: Session, ID: int) -> List[Collection]:
-    """Get all collections for a specific ID (for history view)"""
-    return db.query(Collection).filter(Collection.id == ID).order_by(Collection.last_updated_at.desc()).all()
+def collections_by_id_query(
+    ID: int, limit: Optional[int] = None, cursor: Optional[str] = None, columns: Optional[tuple] = None
+) -> Select:
+    """History for an ID, newest first; keyset-paged on (last_updated_at, record_id)"""
+    query = (select(*columns) if columns else select(Collection)).where(Collection.id == ID).order_by(
+        Collection.last_updated_at.desc(), Collection.record_id.desc()
+    )
+    if cursor:
+        last_record_id, last_updated_at = decode_cursor(cursor, history=True)
+        query = query.where(
+            tuple_(Collection.last_updated_at, Collection.record_id) < tuple_(last_updated_at, last_record_id)
+        )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
 
-def update_collection(db: Session, record_id: int, update_data: CollectionUpdate) -> Optional[Collection]:
-    """Update a collection record with read-only enforcement"""
-    db_obj = get_collection_by_record_id(db, record_id)
-    
-    if not db_obj:
+def next_page_cursor(rows: List, limit: Optional[int], history: bool = False) -> Optional[str]:
+    """Token for the page after ``rows``, or None when this was the last page"""
+    if limit is None or len(rows) < limit:
         return None
-    
+    last = rows[-1]
+    return encode_cursor(last.record_id, last.last_updated_at if history else None)
+
+def apply_collection_update(db_obj: Collection, update_data: CollectionUpdate) -> None:
+    """Apply an update to a loaded record, enforcing read-only"""
     if db_obj.read_only:
         raise ValueError("Cannot update read-only record")
     
@@ -65,28 +333,214 @@ def update_collection(db: Session, record_id: int, update_data: CollectionUpdate
     # Update audit fields
     db_obj.last_updated_by = update_data.last_updated_by
     db_obj.last_updated_at = datetime.utcnow()
+
+def check_deletable(db_obj: Collection) -> None:
+    if db_obj.read_only:
+        raise ValueError("Cannot delete read-only record")
+
+def get_collections(
+    db: Session, 
+    ID: Optional[int] = None, 
+    read_only: Optional[bool] = None,
+    skip: int = 0, 
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> List[Collection]:
+    """Get collections with optional filtering"""
+    return db.execute(
+        collections_query(ID, read_only, skip, limit, cursor, date_from=date_from, date_to=date_to)
+    ).scalars().all()
+
+def get_collection_rows(
+    db: Session,
+    ID: Optional[int] = None,
+    read_only: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> List[Row]:
+    """get_collections as CollectionOut column tuples, for the orjson list responses"""
+    return db.execute(
+        collections_query(ID, read_only, skip, limit, cursor, COLLECTION_OUT_COLUMNS, date_from, date_to)
+    ).all()
+
+def get_collection_by_record_id(db: Session, record_id: int) -> Optional[Collection]:
+    """Get a specific collection by its record_id"""
+    return db.execute(collection_by_record_id_query(record_id)).scalars().first()
+
+def get_collections_by_id(
+    db: Session, ID: int, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> List[Collection]:
+    """Get all collections for a specific ID (for history view)"""
+    return db.execute(collections_by_id_query(ID, limit, cursor)).scalars().all()
+
+def get_collection_rows_by_id(
+    db: Session, ID: int, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> List[Row]:
+    """get_collections_by_id as CollectionOut column tuples"""
+    return db.execute(collections_by_id_query(ID, limit, cursor, COLLECTION_OUT_COLUMNS)).all()
+
+def update_collection(db: Session, record_id: int, update_data: CollectionUpdate) -> Optional[Collection]:
+    """Update a collection record with read-only enforcement"""
+    check_stats_support(db)
+    db_obj = get_collection_by_record_id(db, record_id)
+    
+    if not db_obj:
+        return None
+    
+    old_date = db_obj.date
+    apply_collection_update(db_obj, update_data)
     
     db.commit()
     db.refresh(db_obj)
+    collection_cache.invalidate(record_ids=[record_id], ids=[db_obj.id])
+    invalidate_search(db, [db_obj.id])
+    refresh_stats(db, dates=[old_date, db_obj.date], ids=[db_obj.id])
     return db_obj
 
 def delete_collection(db: Session, record_id: int) -> bool:
     """Delete a collection record"""
+    check_stats_support(db)
     db_obj = get_collection_by_record_id(db, record_id)
     if not db_obj:
         return False
     
-    if db_obj.read_only:
-        raise ValueError("Cannot delete read-only record")
+    check_deletable(db_obj)
     
     db.delete(db_obj)
     db.commit()
+    collection_cache.invalidate(record_ids=[record_id], ids=[db_obj.id])
+    invalidate_search(db, [db_obj.id])
+    refresh_stats(db, dates=[db_obj.date], ids=[db_obj.id])
     return True
 
-def get_editable_collections(db: Session, skip: int = 0, limit: int = 100) -> List[Collection]:
+def search_collections(db: Session, q: str, limit: int = 20) -> List[tuple]:
+    """
+    Records whose name or contact starts with or resembles ``q``, best match
+    first, as CollectionOut column tuples with the score appended. Postgres
+    answers from its trigram indexes; other databases use the in-process
+    index in app.search. Raises ValueError for a query that is empty once
+    normalized.
+    """
+    check_search_query(q)
+    if uses_trigram_sql(db):
+        return db.execute(trigram_search_query(q, limit, COLLECTION_OUT_COLUMNS)).all()
+    index = index_for(db)
+    index.sync(db)
+    return rows_in_rank_order(db, index.search(q, limit), COLLECTION_OUT_COLUMNS)
+
+def get_editable_collections(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Collection]:
     """Get only editable collections (read_only = False)"""
-    return get_collections(db, read_only=False, skip=skip, limit=limit)
+    return get_collections(db, read_only=False, skip=skip, limit=limit, cursor=cursor)
 
-def get_readonly_collections(db: Session, skip: int = 0, limit: int = 100) -> List[Collection]:
+def get_readonly_collections(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Collection]:
     """Get only read-only collections"""
-    return get_collections(db, read_only=True, skip=skip, limit=limit) 
\ No newline at end of file
+    return get_collections(db, read_only=True, skip=skip, limit=limit, cursor=cursor) 
+
+def bulk_target_clauses(target: BulkTarget) -> list:
+    """WHERE clauses selecting the records a bulk request names"""
+    clauses = []
+    if target.record_ids:
+        clauses.append(Collection.record_id.in_(target.record_ids))
+    if target.filter:
+        if target.filter.ids:
+            clauses.append(Collection.id.in_(target.filter.ids))
+        if target.filter.date is not None:
+            clauses.append(Collection.date == target.filter.date)
+        if target.filter.date_from is not None:
+            clauses.append(Collection.date >= target.filter.date_from)
+        if target.filter.date_to is not None:
+            clauses.append(Collection.date <= target.filter.date_to)
+    return clauses
+
+def bulk_matches_query(clauses: list) -> Select:
+    """
+    Every record a bulk request matches, read-only or not, with what the
+    stats refresh needs. The rows stay locked (FOR UPDATE; SQLite locks the
+    database on write instead) until the request commits, so none changes
+    read-only status or is removed before the UPDATE/DELETE.
+    """
+    return select(Collection.record_id, Collection.id, Collection.date).where(*clauses).with_for_update()
+
+def bulk_update_statement(clauses: list, request: CollectionBulkUpdate, user: str):
+    """
+    One UPDATE for the whole request. ``read_only IS NOT TRUE`` keeps locked
+    rows out of the statement, so the init.sql trigger never has to reject one.
+    """
+    values = request.changes.model_dump(exclude_unset=True)
+    values.update(last_updated_by=user, last_updated_at=datetime.utcnow())
+    return (
+        update(Collection)
+        .where(*clauses, Collection.read_only.isnot(True))
+        .values(**values)
+        .returning(Collection.record_id, Collection.id, Collection.date)
+        .execution_options(synchronize_session=False)
+    )
+
+def bulk_delete_statement(clauses: list):
+    """One DELETE for the whole request, skipping read-only rows"""
+    return (
+        delete(Collection)
+        .where(*clauses, Collection.read_only.isnot(True))
+        .returning(Collection.record_id, Collection.id, Collection.date)
+        .execution_options(synchronize_session=False)
+    )
+
+def bulk_result(target: BulkTarget, matched: List[int], affected: List[int], status: str) -> BulkResult:
+    """
+    Per-record outcomes: ``status`` for affected rows, read_only for matched
+    ones left alone. Affected rows are counted as matched too: a row
+    inserted by another writer after the locked SELECT can still be caught by
+    the UPDATE/DELETE filter.
+    """
+    affected = set(affected)
+    matched = set(matched) | affected
+    results = [
+        BulkOutcome(record_id=record_id, status=status if record_id in affected else "read_only")
+        for record_id in sorted(matched)
+    ]
+    missing = sorted(set(target.record_ids or ()) - set(matched))
+    results.extend(BulkOutcome(record_id=record_id, status="not_found") for record_id in missing)
+    return BulkResult(
+        affected=len(affected),
+        read_only=len(matched) - len(affected),
+        not_found=len(missing),
+        results=results
+    )
+
+def bulk_update_collections(db: Session, request: CollectionBulkUpdate, user: str) -> BulkResult:
+    """Apply the same changes to every editable record the request matches, in one UPDATE"""
+    check_stats_support(db)
+    clauses = bulk_target_clauses(request)
+    matched = db.execute(bulk_matches_query(clauses)).all()
+    updated = db.execute(bulk_update_statement(clauses, request, user)).all()
+    db.commit()
+
+    ids = {row.id for row in matched + updated}
+    collection_cache.invalidate(record_ids=[row.record_id for row in updated], ids=ids)
+    invalidate_search(db, ids)
+    dates = [row.date for row in matched + updated] + [request.changes.date]
+    refresh_stats(db, dates=dates, ids=ids)
+    return bulk_result(request, [row.record_id for row in matched], [row.record_id for row in updated], "updated")
+
+def bulk_delete_collections(db: Session, target: BulkTarget) -> BulkResult:
+    """Delete every editable record the request matches, in one DELETE"""
+    check_stats_support(db)
+    clauses = bulk_target_clauses(target)
+    matched = db.execute(bulk_matches_query(clauses)).all()
+    deleted = db.execute(bulk_delete_statement(clauses)).all()
+    db.commit()
+
+    ids = {row.id for row in matched + deleted}
+    collection_cache.invalidate(record_ids=[row.record_id for row in deleted], ids=ids)
+    invalidate_search(db, ids)
+    refresh_stats(db, dates=[row.date for row in matched + deleted], ids=ids)
+    return bulk_result(target, [row.record_id for row in matched], [row.record_id for row in deleted], "deleted")
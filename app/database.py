@@ -1,10 +1,45 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.cofig import DATABASE_URL
+from sqlalchemy.orm import Session, sessionmaker
+from app.cofig import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DB_ASYNC, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_STATEMENT_TIMEOUT_MS
+)
+from app.metrics import instrument_engine, register_collector
+
+# Dialect-specific INSERTs supporting ON CONFLICT, used by upload upserts and the stats refresh
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def engine_options(url: str, async_driver: bool = False) -> dict:
+    """create_engine keyword arguments from the DB_POOL_* and DB_STATEMENT_TIMEOUT_MS settings"""
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool class; the sizing options do not apply
+        return {}
+
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        if async_driver:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def pool_stats(pool) -> dict:
+    """Connections checked out and in overflow for a QueuePool (empty for other pool classes)"""
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {("checked_out",): pool.checkedout(), ("overflow",): max(pool.overflow(), 0), ("idle",): pool.checkedin()}
 
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -12,10 +47,45 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
+def create_schema(bind=None):
+    """Create missing tables for every model (existing tables are left untouched) and missing partitions"""
+    # Model modules import Base from here, so load them only when needed
+    import app.models.enhanced_collection, app.models.collection_stats  # noqa: F401
+    import app.models.upload_job, app.models.uploaded_file  # noqa: F401
+    Base.metadata.create_all(bind=bind or engine)
+    # PostgreSQL partitions collections by month; make sure the coming months have partitions
+    from app.partitions import ensure_partitions
+
+    with Session(bind or engine) as db:
+        ensure_partitions(db)
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close() 
+
+# Async engine, only created when enabled so asyncpg stays optional
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, async_driver=True))
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+register_collector(
+    "db_pool_connections", "SQLAlchemy pool connections by state", ("state",),
+    lambda: pool_stats((async_engine.sync_engine if async_engine is not None else engine).pool)
+)
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session dependency used by the API routes, selected by DB_ASYNC
+get_session = get_async_db if DB_ASYNC else get_db
\ No newline at end of file
@@ -1,5 +1,255 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
 import mysql.connector
-from app.cofig import DB_CONFIG
+from app.cofig import (
+    DB_CONFIG, MYSQL_POOL_SIZE, MYSQL_POOL_TIMEOUT, MYSQL_POOL_PING_AFTER, BULK_INSERT_BATCH_SIZE,
+    LEGACY_FETCH_BATCH_SIZE
+)
+from app.metrics import register_collector
 
 def get_connection():
     return mysql.connector.connect(**DB_CONFIG)
+
+class PoolTimeout(Exception):
+    """No connection became free within the checkout timeout"""
+
+class ConnectionPool:
+    """
+    Fixed-size pool of MySQL connections, opened lazily.
+
+    Connections idle for longer than ``ping_after`` seconds are pinged on
+    checkout and replaced if the server dropped them. Tracks checkout wait
+    time and utilization for monitoring.
+    """
+
+    def __init__(self, size=MYSQL_POOL_SIZE, timeout=MYSQL_POOL_TIMEOUT,
+                 ping_after=MYSQL_POOL_PING_AFTER, connect=get_connection):
+        self.size = size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._connect = connect
+        # (connection, returned_at); LIFO keeps hot connections in use. A discarded connection
+        # leaves (None, None) behind so a waiting checkout wakes up and opens a replacement.
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._replaced = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        """Check out a healthy connection, opening one if the pool is not yet full"""
+        started = time.monotonic()
+        conn = self._checkout(started)
+        waited = time.monotonic() - started
+
+        with self._lock:
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn, broken=False):
+        """Return a connection, rolling back any open transaction; broken ones are closed"""
+        with self._lock:
+            self._in_use -= 1
+        if not broken:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((conn, time.monotonic()))
+                return
+            except Exception:
+                pass
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a ``with`` block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except mysql.connector.Error:
+            self.release(conn, broken=not _is_alive(conn))
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "utilization": self._in_use / self.size if self.size else 0.0,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "replaced": self._replaced,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_max": self._wait_max,
+                "wait_seconds_avg": self._wait_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if conn is not None:
+                self._discard(conn)
+
+    def _checkout(self, started):
+        while True:
+            try:
+                conn, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve_slot():
+                    return self._open()
+                conn, returned_at = self._wait_for_idle(started)
+
+            if conn is None:
+                # A slot was freed: claim it on the next pass (or wait again if another thread did)
+                continue
+            if time.monotonic() - returned_at < self.ping_after or _is_alive(conn):
+                return conn
+            # Dropped by the server: free its slot and open a replacement on the next pass
+            with self._lock:
+                self._replaced += 1
+            self._discard(conn)
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return True
+            return False
+
+    def _open(self):
+        try:
+            return self._connect()
+        except Exception:
+            self._free_slot()
+            raise
+
+    def _wait_for_idle(self, started):
+        remaining = None if self.timeout is None else self.timeout - (time.monotonic() - started)
+        try:
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            return self._idle.get(timeout=remaining)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"No MySQL connection available within {self.timeout}s (pool size {self.size})")
+
+    def _free_slot(self):
+        with self._lock:
+            self._opened -= 1
+        self._idle.put((None, None))
+
+    def _discard(self, conn):
+        self._free_slot()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+def _is_alive(conn):
+    try:
+        conn.ping(reconnect=False)
+        return True
+    except Exception:
+        return False
+
+pool = ConnectionPool()
+
+register_collector(
+    "legacy_pool_connections", "Legacy MySQL pool connections by state", ("state",),
+    lambda: {(state,): pool.stats()[state] for state in ("open", "in_use", "peak_in_use")}
+)
+register_collector(
+    "legacy_pool_checkout_timeouts_total", "Checkouts that gave up waiting for a connection", (),
+    lambda: {(): pool.stats()["timeouts"]}, kind="counter"
+)
+register_collector(
+    "legacy_pool_wait_seconds_total", "Total time spent waiting to check out a connection", (),
+    lambda: {(): pool.stats()["wait_seconds_total"]}, kind="counter"
+)
+
+def pooled_connection():
+    """Context manager borrowing a connection from the shared legacy pool"""
+    return pool.connection()
+
+def executemany_chunked(query, rows, chunk_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Run ``executemany`` over ``rows`` on one pooled connection, committing
+    after every ``chunk_size`` rows. Returns the number of rows written.
+    """
+    total = 0
+    rows = iter(rows)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                cursor.executemany(query, chunk)
+                conn.commit()
+                total += len(chunk)
+        finally:
+            cursor.close()
+    return total
+
+def build_select(table, allowed_columns, columns, filters=None):
+    """
+    SELECT of ``columns`` from ``table`` with ``column = value`` filters ANDed
+    together. Column names are checked against ``allowed_columns`` since they
+    are interpolated into the SQL. Returns (query, params).
+    """
+    unknown = [c for c in list(columns) + list(filters or ()) if c not in allowed_columns]
+    if unknown:
+        raise ValueError(f"Unknown {table} column(s): {', '.join(unknown)}")
+
+    query = f"SELECT {', '.join(f'`{c}`' for c in columns)} FROM {table}"
+    params = ()
+    if filters:
+        query += " WHERE " + " AND ".join(f"`{c}` = %s" for c in filters)
+        params = tuple(filters.values())
+    return query, params
+
+def stream_rows(query, params=(), batch_size=LEGACY_FETCH_BATCH_SIZE):
+    """
+    Yield lists of up to ``batch_size`` dict rows from an unbuffered
+    (server-side) cursor, so the full result set is never held in memory.
+    The pooled connection stays checked out until the generator is exhausted
+    or closed.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # A generator closed early leaves rows on the wire; drain them so the connection is reusable
+            if conn.unread_result:
+                conn.consume_results()
+            cursor.close()
@@ -1,6 +1,5 @@
 import pandas as pd
-from app.models.collection import insert_collection
-from app.db import get_connection
+from app.models.collection import insert_collection, insert_collections_many
 
 def upload_collection_with_manual_input(file_path):
     try:
@@ -23,35 +22,29 @@ def upload_collection_with_manual_input(file_path):
 
     except Exception as e:
         print("❌ Error processing Excel file:", e)
-    cursor = conn.cursor()
-    conn = get_connection()
+
+def collection_rows_from_frame(df):
+    """
+    (raw_id, collected_by, phone_no, email_address) tuples for every sheet row,
+    cleaned column-wise. A missing or blank email becomes None.
+    """
+    ids = df['ID No'].astype(str).str.strip()
+    collected_by = df['Collected By'].astype(str).str.strip()
+    phone_no = df['Phone No'].astype(str).str.strip()
+    if 'Email Address' in df.columns:
+        email = df['Email Address'].fillna('').astype(str).str.strip()
+        email = [value or None for value in email.tolist()]
+    else:
+        email = [None] * len(df)
+    return zip(ids.tolist(), collected_by.tolist(), phone_no.tolist(), email)
 
 def upload_collection_from_excel(file_path):
     try:
         df = pd.read_excel(file_path)
-
-        for index, row in df.iterrows():
-            raw_id = str(row['ID No']).strip()
-            collected_by = str(row['Collected By']).strip()
-            phone_no = str(row['Phone No']).strip()
-            email_address = str(row.get('Email Address', '')).strip() or None
-
-            insert_collection(raw_id, collected_by, phone_no, email_address)
-
-        print("\n✅ Collection entries uploaded successfully.")
+        count = insert_collections_many(collection_rows_from_frame(df))
+        print(f"\n✅ {count} collection entries uploaded successfully.")
+        return count
 
     except Exception as e:
         print("❌ Error processing Excel file:", e)
-        cursor.close()
-        conn.close()
-        print("❌ Database connection closed due to error.")
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
-        print("✅ Database connection closed successfully.")
-        cursor = conn.cursor()
-        conn = get_connection()
-        print("✅ Collection entries uploaded successfully.")
-        cursor.close()
-        conn.close()
+        raise
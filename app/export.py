@@ -0,0 +1,150 @@
+import csv
+import io
+import os
+import tempfile
+import zlib
+from datetime import date
+from typing import Callable, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+from app.cofig import EXPORT_BATCH_SIZE
+from app.crud import COLLECTION_OUT_COLUMNS, collections_query
+from app.database import SessionLocal
+from app.utils.serialization import COLLECTION_FIELDS, collection_dicts, jsonable_collection_dicts
+
+# Media type and file extension per export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+# Rows per worksheet before an XLSX export continues on the next sheet (Excel's limit minus the header)
+XLSX_MAX_ROWS = 1_048_575
+
+# Bytes read per chunk when streaming a finished XLSX file
+_FILE_CHUNK = 1024 * 1024
+
+# Leading characters that make Excel and other spreadsheets read a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def export_query(
+    ID: Optional[int] = None,
+    read_only: Optional[bool] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Select:
+    """Every matching record as CollectionOut column tuples, fetched ``batch_size`` rows at a time"""
+    query = collections_query(
+        ID, read_only, limit=None, columns=COLLECTION_OUT_COLUMNS, date_from=date_from, date_to=date_to
+    )
+    return query.execution_options(yield_per=batch_size)
+
+
+def spreadsheet_safe(value):
+    """
+    ``value`` with a leading quote when it is text a spreadsheet would run as
+    a formula (CSV/formula injection through uploaded names and contacts)
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_batches(query: Select, session_factory: Callable[[], Session] = SessionLocal) -> Iterator[List[tuple]]:
+    """
+    Row batches from a server-side cursor (yield_per), so memory holds one
+    batch however large the table is. Opens its own session because the
+    response body outlives the request's dependencies.
+    """
+    with session_factory() as db:
+        for batch in db.execute(query).partitions():
+            yield batch
+
+
+def encode_ndjson(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(orjson.dumps(row) + b"\n" for row in collection_dicts(batch))
+
+
+def encode_csv(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLLECTION_FIELDS)
+    for batch in batches:
+        writer.writerows(
+            tuple("" if value is None else spreadsheet_safe(value) for value in row.values())
+            for row in jsonable_collection_dicts(batch)
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def encode_xlsx(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """
+    XLSX is a zip archive and cannot be sent until it is complete, so rows
+    go through a write-only workbook (which spools sheets to disk) into a
+    temporary file that is then streamed.
+    """
+    from openpyxl import Workbook
+
+    with tempfile.TemporaryDirectory(prefix="export-") as directory:
+        path = os.path.join(directory, "collections.xlsx")
+        workbook = Workbook(write_only=True)
+        sheet, sheet_rows = None, XLSX_MAX_ROWS
+        for batch in batches:
+            for row in collection_dicts(batch):
+                if sheet_rows == XLSX_MAX_ROWS:
+                    sheet = workbook.create_sheet(f"Collections {len(workbook.worksheets) + 1}")
+                    sheet.append(COLLECTION_FIELDS)
+                    sheet_rows = 0
+                sheet.append([spreadsheet_safe(value) for value in row.values()])
+                sheet_rows += 1
+        if sheet is None:
+            workbook.create_sheet("Collections 1").append(COLLECTION_FIELDS)
+        workbook.save(path)
+
+        with open(path, "rb") as f:
+            while chunk := f.read(_FILE_CHUNK):
+                yield chunk
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv, "xlsx": encode_xlsx}
+
+
+def gzip_stream(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream incrementally into gzip format"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_collections(
+    fmt: str,
+    ID: Optional[int] = None,
+    read_only: Optional[bool] = None,
+    gzip: bool = False,
+    session_factory: Callable[[], Session] = SessionLocal,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> Iterator[bytes]:
+    """
+    The body of /collections/export: encoded (and optionally gzipped) chunks.
+    CSV and XLSX cells that would start a formula are quoted (spreadsheet_safe);
+    NDJSON keeps values as stored.
+    """
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    query = export_query(ID, read_only, date_from, date_to)
+    chunks = ENCODERS[fmt](iter_batches(query, session_factory))
+    return gzip_stream(chunks) if gzip else chunks
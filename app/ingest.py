@@ -0,0 +1,102 @@
+import time
+from datetime import datetime
+from sqlalchemy.orm import Session
+from typing import Callable, List, NamedTuple, Optional
+from app.cofig import INGEST_WORKERS
+from app.crud import upsert_collections
+from app.metrics import upload_phase_duration, upload_rows, upload_rows_per_second
+from app.models.uploaded_file import UploadedFile
+from app.utils.dedup import file_sha256
+
+DUPLICATE_FILE_MESSAGE = "Identical file was already uploaded; no records changed"
+
+# Called after each chunk with (records_processed, records_inserted, errors) for that chunk
+ProgressCallback = Callable[[int, int, List[str]], None]
+
+
+class IngestResult(NamedTuple):
+    records_processed: int
+    records_inserted: int
+    records_updated: int
+    records_skipped: int
+    errors: List[str]
+    duplicate_file: bool = False
+
+
+def ingest_excel_file(
+    db: Session,
+    path: str,
+    user: str,
+    on_progress: Optional[ProgressCallback] = None,
+    filename: Optional[str] = None,
+    all_sheets: bool = False,
+    workers: int = INGEST_WORKERS
+) -> IngestResult:
+    """
+    Classify a spooled workbook chunk by chunk and upsert each chunk.
+
+    By default only the first sheet is read. Zip archives of workbooks, and
+    workbooks uploaded with ``all_sheets``, have every sheet parsed across
+    ``workers`` processes; this process remains the only writer.
+
+    A file whose content hash matches an earlier clean upload is not parsed
+    at all; every row counts as skipped. Otherwise unchanged rows are
+    skipped, changed ones updated and new ones inserted (see
+    crud.upsert_collections).
+    """
+    # Imported here so pandas and the readers load on the first upload, not at API startup
+    from app.utils.excel_processor import process_excel_stream
+    from app.utils.parallel_excel import is_zip_upload, iter_parallel_sheets
+
+    content_hash = file_sha256(path)
+    previous = db.get(UploadedFile, content_hash)
+    if previous is not None:
+        upload_rows.labels(outcome="skipped").inc(previous.records_processed)
+        return IngestResult(0, 0, 0, previous.records_processed, [], duplicate_file=True)
+
+    records_processed = 0
+    records_inserted = 0
+    records_updated = 0
+    records_skipped = 0
+    errors = []
+    started = time.perf_counter()
+
+    if all_sheets or is_zip_upload(path):
+        chunks = iter_parallel_sheets(path, filename, workers)
+    else:
+        chunks = process_excel_stream(path)
+
+    for results, chunk_errors in chunks:
+        with upload_phase_duration.labels(phase="write").time():
+            inserted, updated, skipped, upsert_errors = upsert_collections(db, results, user)
+        chunk_errors = chunk_errors + upsert_errors
+        upload_rows.labels(outcome="inserted").inc(inserted)
+        upload_rows.labels(outcome="updated").inc(updated)
+        upload_rows.labels(outcome="skipped").inc(skipped)
+        upload_rows.labels(outcome="error").inc(len(chunk_errors))
+
+        records_processed += len(results)
+        records_inserted += inserted
+        records_updated += updated
+        records_skipped += skipped
+        errors.extend(chunk_errors)
+
+        if on_progress:
+            on_progress(len(results), inserted, chunk_errors)
+
+    elapsed = time.perf_counter() - started
+    if records_processed and elapsed > 0:
+        upload_rows_per_second.set(records_processed / elapsed)
+
+    # Only remember files that went in cleanly, so a retry can pick up failed rows
+    if not errors:
+        db.merge(UploadedFile(
+            content_hash=content_hash,
+            filename=filename,
+            uploaded_by=user,
+            uploaded_at=datetime.utcnow(),
+            records_processed=records_processed
+        ))
+        db.commit()
+
+    return IngestResult(records_processed, records_inserted, records_updated, records_skipped, errors)
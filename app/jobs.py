@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.cofig import UPLOAD_JOB_STORE, UPLOAD_JOB_WORKERS
+from app.database import SessionLocal
+from app.ingest import ingest_excel_file, DUPLICATE_FILE_MESSAGE
+from app.models.upload_job import UploadJob
+from app.schemas import UploadJobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class JobStore(ABC):
+    """Where upload job state lives; shared by the API and the worker threads"""
+
+    @abstractmethod
+    def create(self, job_id: str, filename: Optional[str], user: str) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+
+    @abstractmethod
+    def add_progress(self, job_id: str, processed: int, inserted: int, errors: List[str]) -> None:
+        ...
+
+
+def _new_job(job_id: str, filename: Optional[str], user: str) -> dict:
+    return {
+        "job_id": job_id,
+        "status": JOB_QUEUED,
+        "filename": filename,
+        "submitted_by": user,
+        "rows_processed": 0,
+        "rows_inserted": 0,
+        "errors": [],
+        "message": None,
+        "created_at": datetime.utcnow(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+
+class InMemoryJobStore(JobStore):
+    """Per-process job state; only visible to the API worker that accepted the upload"""
+
+    def __init__(self):
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id, filename, user):
+        with self._lock:
+            self._jobs[job_id] = _new_job(job_id, filename, user)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job, errors=list(job["errors"])) if job else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def add_progress(self, job_id, processed, inserted, errors):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["rows_processed"] += processed
+            job["rows_inserted"] += inserted
+            job["errors"].extend(errors)
+
+
+class DatabaseJobStore(JobStore):
+    """Job state in the upload_jobs table, visible to every API worker"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+
+    def create(self, job_id, filename, user):
+        job = _new_job(job_id, filename, user)
+        job["errors"] = json.dumps(job["errors"])
+        with self._session_factory() as db:
+            db.add(UploadJob(**job))
+            db.commit()
+
+    def get(self, job_id):
+        with self._session_factory() as db:
+            job = db.get(UploadJob, job_id)
+            if job is None:
+                return None
+            record = {column.name: getattr(job, column.name) for column in UploadJob.__table__.columns}
+            record["errors"] = json.loads(record["errors"])
+            return record
+
+    def update(self, job_id, **fields):
+        with self._session_factory() as db:
+            db.query(UploadJob).filter(UploadJob.job_id == job_id).update(fields)
+            db.commit()
+
+    def add_progress(self, job_id, processed, inserted, errors):
+        # Each job is only written by the worker running it, so read-modify-write is safe
+        with self._session_factory() as db:
+            job = db.get(UploadJob, job_id)
+            job.rows_processed += processed
+            job.rows_inserted += inserted
+            if errors:
+                job.errors = json.dumps(json.loads(job.errors) + errors)
+            db.commit()
+
+
+def create_job_store(kind: str = UPLOAD_JOB_STORE) -> JobStore:
+    if kind == "memory":
+        return InMemoryJobStore()
+    if kind == "database":
+        return DatabaseJobStore()
+    raise ValueError(f"Unknown upload job store: {kind}")
+
+
+job_store = create_job_store()
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_JOB_WORKERS, thread_name_prefix="upload-job")
+
+
+def submit_upload_job(
+    path: str, filename: Optional[str], user: str, store: JobStore = None, all_sheets: bool = False
+) -> str:
+    """
+    Register a job for a spooled upload and queue it on the worker pool. The
+    job owns the spooled file from then on; if it cannot be queued the file is
+    removed here (and the job, if registered, marked failed).
+    """
+    store = store or job_store
+    job_id = uuid.uuid4().hex
+    created = False
+    try:
+        store.create(job_id, filename, user)
+        created = True
+        _executor.submit(run_upload_job, job_id, path, user, store, filename=filename, all_sheets=all_sheets)
+    except Exception as e:
+        os.remove(path)
+        if created:
+            store.update(job_id, status=JOB_FAILED, message=str(e), finished_at=datetime.utcnow())
+        raise
+    return job_id
+
+
+def run_upload_job(
+    job_id: str,
+    path: str,
+    user: str,
+    store: JobStore,
+    session_factory: Callable[[], Session] = SessionLocal,
+    filename: Optional[str] = None,
+    all_sheets: bool = False
+) -> None:
+    """Ingest a spooled upload, reporting progress to the store after each chunk"""
+    store.update(job_id, status=JOB_RUNNING, started_at=datetime.utcnow())
+    try:
+        with session_factory() as db:
+            result = ingest_excel_file(
+                db, path, user,
+                on_progress=lambda processed, inserted, errors: store.add_progress(job_id, processed, inserted, errors),
+                filename=filename,
+                all_sheets=all_sheets
+            )
+        store.update(
+            job_id, status=JOB_COMPLETED, finished_at=datetime.utcnow(),
+            message=DUPLICATE_FILE_MESSAGE if result.duplicate_file else None
+        )
+    except Exception as e:
+        logger.error(f"Upload job {job_id} failed: {str(e)}")
+        store.update(job_id, status=JOB_FAILED, message=str(e), finished_at=datetime.utcnow())
+    finally:
+        os.remove(path)
+
+
+def get_job_status(job_id: str, store: JobStore = None) -> Optional[UploadJobStatus]:
+    """Current state of a job, including its insert throughput so far"""
+    job = (store or job_store).get(job_id)
+    if job is None:
+        return None
+
+    rows_per_second = 0.0
+    if job["started_at"]:
+        elapsed = ((job["finished_at"] or datetime.utcnow()) - job["started_at"]).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round(job["rows_processed"] / elapsed, 1)
+
+    return UploadJobStatus(**job, rows_per_second=rows_per_second)
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Metrics are prometheus_client metrics. A single process renders its own
+# registry; with several API workers (serve.py) PROMETHEUS_MULTIPROC_DIR is
+# set, every process writes its samples there and /metrics merges all of them,
+# whichever worker answers the scrape.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+# Seconds between copies of collector values (cache, pools) into the metrics
+COLLECTOR_REFRESH_INTERVAL = 1.0
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+registry = CollectorRegistry()
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"), buckets=DEFAULT_BUCKETS, registry=registry
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("operation",),
+    buckets=QUERY_BUCKETS, registry=registry
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed while serving one request", ("route",),
+    buckets=COUNT_BUCKETS, registry=registry
+)
+upload_phase_duration = Histogram(
+    "upload_phase_duration_seconds", "Time spent per upload phase (read, classify, write)", ("phase",),
+    buckets=DEFAULT_BUCKETS, registry=registry
+)
+upload_rows = Counter(
+    "upload_rows_total", "Uploaded rows by outcome", ("outcome",), registry=registry
+)
+upload_rows_per_second = Gauge(
+    "upload_last_rows_per_second", "Rows per second (processed / wall time) of the most recent upload",
+    registry=registry, multiprocess_mode="mostrecent"
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """(body, content type) of a scrape: this process's metrics, or every worker's in multiprocess mode"""
+    refresh_collectors(force=True)
+    if not MULTIPROCESS:
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    merged = CollectorRegistry()
+    multiprocess.MultiProcessCollector(merged)
+    return generate_latest(merged), CONTENT_TYPE_LATEST
+
+
+def process_exited(pid: Optional[int] = None) -> None:
+    """Drop an exiting worker's live gauges from the multiprocess files (its counters keep counting)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+# Mutable per-request query counter; a list so threadpool workers running in a
+# copied context still increment the request's own count
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar("request_queries", default=None)
+
+
+def start_request_query_count() -> List[int]:
+    counter = [0]
+    _request_queries.set(counter)
+    return counter
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on a (sync) SQLAlchemy engine and count it against the current request"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_query_duration.labels(operation=_operation(statement)).observe(elapsed)
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+
+class Collected:
+    """
+    A metric copied from stats another component keeps: ``callback`` returns
+    {label values: value}. Gauges are set to the latest values (summed over
+    live workers in multiprocess mode); counters are incremented by the growth
+    since the previous copy.
+    """
+
+    def __init__(self, metric, callback: Callable[[], Dict[Tuple[str, ...], float]], kind: str):
+        self.metric = metric
+        self.callback = callback
+        self.kind = kind
+        self._last: Dict[Tuple[str, ...], float] = {}
+
+    def refresh(self) -> None:
+        for key, value in self.callback().items():
+            child = self.metric.labels(*key) if key else self.metric
+            if self.kind == "counter":
+                growth = value - self._last.get(key, 0)
+                if growth > 0:
+                    child.inc(growth)
+            else:
+                child.set(value)
+            self._last[key] = value
+
+
+_collected: List[Collected] = []
+_refresh_lock = threading.Lock()
+_last_refresh = 0.0
+
+
+def register_collector(name: str, help: str, labelnames: Sequence[str], callback, kind: str = "gauge") -> Collected:
+    """Expose stats another component already keeps (cache, connection pool) without keeping them twice"""
+    if kind == "counter":
+        metric = Counter(name, help, labelnames, registry=registry)
+    else:
+        metric = Gauge(name, help, labelnames, registry=registry, multiprocess_mode="livesum")
+    collected = Collected(metric, callback, kind)
+    _collected.append(collected)
+    return collected
+
+
+def refresh_collectors(force: bool = False) -> None:
+    """
+    Copy the collectors' current values into their metrics, at most once per
+    COLLECTOR_REFRESH_INTERVAL unless forced. Called after every request so
+    each worker's values stay current for scrapes answered by another worker.
+    """
+    global _last_refresh
+    now = time.monotonic()
+    if not force and now - _last_refresh < COLLECTOR_REFRESH_INTERVAL:
+        return
+    with _refresh_lock:
+        _last_refresh = now
+        for collected in _collected:
+            collected.refresh()
@@ -1,30 +1,59 @@
-from app.db import get_connection
-from app.utils.sanitize import sanitize_id_no
+from app.cofig import BULK_INSERT_BATCH_SIZE, LEGACY_FETCH_BATCH_SIZE
+from app.db import pooled_connection, executemany_chunked, build_select, stream_rows
+from app.utils.normalize import canonical_contact, id_digits
 from datetime import datetime
 
-def insert_collection(raw_id, collected_by, phone_no, email_address=None):
-    id_no = sanitize_id_no(raw_id)
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
+INSERT_COLLECTION = """
     INSERT INTO Collection (`ID No`, collected_by, phone_no, email_address, collection_date)
     VALUES (%s, %s, %s, %s, %s)
     """
-    collection_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    cursor.execute(query, (id_no, collected_by, phone_no, email_address, collection_date))
-    conn.commit()
+def insert_collection(raw_id, collected_by, phone_no, email_address=None):
+    id_no = id_digits(raw_id)
+    collection_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    cursor.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERT_COLLECTION, (id_no, collected_by, canonical_contact(phone_no), email_address, collection_date))
+        conn.commit()
+        cursor.close()
     print("✅ Collection record inserted successfully!")
 
+def insert_collections_many(rows, chunk_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Insert many (raw_id, collected_by, phone_no, email_address) rows with
+    executemany on one connection, committing every chunk_size rows. IDs
+    and phone numbers are normalized like uploads (app.utils.normalize).
+    """
+    collection_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    params = (
+        (id_digits(raw_id), collected_by, canonical_contact(phone_no), email_address, collection_date)
+        for raw_id, collected_by, phone_no, email_address in rows
+    )
+    count = executemany_chunked(INSERT_COLLECTION, params, chunk_size)
+    print(f"✅ {count} collection records inserted successfully!")
+    return count
+
 def fetch_collections():
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Collection")
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM Collection")
+        results = cursor.fetchall()
+        cursor.close()
     return results
+
+COLLECTION_COLUMNS = ("ID No", "collected_by", "phone_no", "email_address", "collection_date")
+
+def iter_collections(columns=None, filters=None, batch_size=LEGACY_FETCH_BATCH_SIZE):
+    """
+    Stream Collection records as lists of dict rows, batch_size at a time.
+    Defaults to every column; filters maps column names to required values,
+    with `ID No` sanitized like on insert. Bad column names raise ValueError.
+    """
+    if columns is None:
+        columns = COLLECTION_COLUMNS
+    filters = dict(filters or {})
+    if "ID No" in filters:
+        filters["ID No"] = id_digits(filters["ID No"])
+    query, params = build_select("Collection", COLLECTION_COLUMNS, columns, filters)
+    return stream_rows(query, params, batch_size)
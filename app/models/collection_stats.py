@@ -0,0 +1,40 @@
+from sqlalchemy import Boolean, Column, Date, Index, Integer
+from app.database import Base
+
+
+class CollectionDateStats(Base):
+    """Record counts per date and read-only flag; maintained by app.stats on every write"""
+    __tablename__ = 'collection_date_stats'
+
+    date = Column(Date, primary_key=True)
+    read_only = Column(Boolean, primary_key=True)
+    records = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<CollectionDateStats(date={self.date}, read_only={self.read_only}, records={self.records})>"
+
+
+class CollectionUndatedStats(Base):
+    """Record counts of records without a date, per read-only flag; maintained by app.stats on every write"""
+    __tablename__ = 'collection_undated_stats'
+
+    read_only = Column(Boolean, primary_key=True)
+    records = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<CollectionUndatedStats(read_only={self.read_only}, records={self.records})>"
+
+
+class CollectionIdStats(Base):
+    """Record counts per ID; maintained by app.stats on every write"""
+    __tablename__ = 'collection_id_stats'
+
+    id = Column(Integer, primary_key=True)
+    records = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('idx_collection_id_stats_records', records.desc(), 'id'),
+    )
+
+    def __repr__(self):
+        return f"<CollectionIdStats(id={self.id}, records={self.records})>"
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, TIMESTAMP, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, Boolean, TIMESTAMP, ForeignKey, Text, Index, PrimaryKeyConstraint, UniqueConstraint
 from sqlalchemy.sql import func
 from app.database import Base
 from datetime import datetime
 
+def _not_postgresql(ddl, target, bind, dialect, **kw):
+    return dialect.name != "postgresql"
+
 class Collection(Base):
     __tablename__ = 'collections'
     
@@ -15,6 +18,25 @@ class Collection(Base):
     read_only = Column(Boolean, default=False)
     last_updated_by = Column(String(255), nullable=True)
     last_updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
+    # Set by uploads: natural key (ID, sheet date, occurrence; see app.utils.dedup) and hash of the uploaded fields, for re-upload dedup
+    upload_key = Column(String(64), nullable=True)
+    row_fingerprint = Column(String(32), nullable=True)
+    
+    # On PostgreSQL the table is partitioned by month of date (app.partitions). Unique
+    # keys of a partitioned table must contain the partition key, so there the primary
+    # key and the upload key are declared together with date.
+    __table_args__ = (
+        PrimaryKeyConstraint('record_id').ddl_if(callable_=_not_postgresql),
+        UniqueConstraint('record_id', 'date').ddl_if(dialect='postgresql'),
+        UniqueConstraint('upload_key').ddl_if(callable_=_not_postgresql),
+        UniqueConstraint('upload_key', 'date').ddl_if(dialect='postgresql'),
+        # Composite indexes backing keyset pagination for each filter combination
+        Index('idx_collections_date', 'date'),
+        Index('idx_collections_read_only_record', 'read_only', 'record_id'),
+        Index('idx_collections_id_record', 'id', 'record_id'),
+        Index('idx_collections_id_history', 'id', last_updated_at.desc(), record_id.desc()),
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
     
     def __repr__(self):
         return f"<Collection(record_id={self.record_id}, id={self.id}, name='{self.name}', read_only={self.read_only})>" 
\ No newline at end of file
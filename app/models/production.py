@@ -1,27 +1,56 @@
-from app.db import get_connection
-from app.utils.sanitize import sanitize_id_no
+from app.cofig import BULK_INSERT_BATCH_SIZE, LEGACY_FETCH_BATCH_SIZE
+from app.db import pooled_connection, executemany_chunked, build_select, stream_rows
+from app.utils.normalize import id_digits
 
-def insert_production(raw_id, expires_on, user_image, produced_on, dispatched_on):
-    id_no = sanitize_id_no(raw_id)
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
+INSERT_PRODUCTION = """
     INSERT INTO Production (`ID No`, expires_on, user_image, produced_on, dispatched_on)
     VALUES (%s, %s, %s, %s, %s)
     """
-    cursor.execute(query, (id_no, expires_on, user_image, produced_on, dispatched_on))
-    conn.commit()
 
-    cursor.close()
-    conn.close()
+def insert_production(raw_id, expires_on, user_image, produced_on, dispatched_on):
+    id_no = id_digits(raw_id)
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERT_PRODUCTION, (id_no, expires_on, user_image, produced_on, dispatched_on))
+        conn.commit()
+        cursor.close()
     print("✅ Production record inserted successfully!")
 
+def insert_productions_many(rows, chunk_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Insert many (raw_id, expires_on, user_image, produced_on, dispatched_on)
+    rows with executemany on one connection, committing every chunk_size rows.
+    """
+    params = (
+        (id_digits(raw_id), expires_on, user_image, produced_on, dispatched_on)
+        for raw_id, expires_on, user_image, produced_on, dispatched_on in rows
+    )
+    count = executemany_chunked(INSERT_PRODUCTION, params, chunk_size)
+    print(f"✅ {count} production records inserted successfully!")
+    return count
+
 def fetch_production():
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Production")
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM Production")
+        results = cursor.fetchall()
+        cursor.close()
     return results
+
+PRODUCTION_COLUMNS = ("ID No", "expires_on", "user_image", "produced_on", "dispatched_on")
+
+def iter_production(columns=None, filters=None, batch_size=LEGACY_FETCH_BATCH_SIZE):
+    """
+    Stream Production records as lists of dict rows, batch_size at a time.
+    Defaults to every column but the user_image BLOB, which has to be asked
+    for in columns; filters maps column names to required values, with
+    `ID No` sanitized like on insert. Bad column names raise ValueError.
+    """
+    if columns is None:
+        columns = [c for c in PRODUCTION_COLUMNS if c != "user_image"]
+    filters = dict(filters or {})
+    if "ID No" in filters:
+        filters["ID No"] = id_digits(filters["ID No"])
+    query, params = build_select("Production", PRODUCTION_COLUMNS, columns, filters)
+    return stream_rows(query, params, batch_size)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from app.database import Base
+
+
+class UploadJob(Base):
+    __tablename__ = 'upload_jobs'
+
+    job_id = Column(String(32), primary_key=True)
+    status = Column(String(16), nullable=False)
+    filename = Column(String(255), nullable=True)
+    submitted_by = Column(String(255), nullable=True)
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_inserted = Column(Integer, default=0, nullable=False)
+    errors = Column(Text, default='[]', nullable=False)  # JSON-encoded list of messages
+    message = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=False)
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<UploadJob(job_id='{self.job_id}', status='{self.status}', rows_processed={self.rows_processed})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from app.database import Base
+
+
+class UploadedFile(Base):
+    """A workbook that was ingested cleanly; identical re-uploads are skipped by content hash"""
+    __tablename__ = 'uploaded_files'
+
+    content_hash = Column(String(64), primary_key=True)  # hex SHA-256 of the file
+    filename = Column(String(255), nullable=True)
+    uploaded_by = Column(String(255), nullable=True)
+    uploaded_at = Column(TIMESTAMP, nullable=False)
+    records_processed = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<UploadedFile(content_hash='{self.content_hash}', filename='{self.filename}')>"
@@ -1,27 +1,57 @@
-from app.db import get_connection
-from app.utils.sanitize import sanitize_id_no
+from app.cofig import BULK_INSERT_BATCH_SIZE, LEGACY_FETCH_BATCH_SIZE
+from app.db import pooled_connection, executemany_chunked, build_select, stream_rows
+from app.utils.normalize import canonical_contact, id_digits
 
-def insert_user(raw_id, name, dob, expires_in, phone_no, image_data):
-    id_no = sanitize_id_no(raw_id)
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
+INSERT_USER = """
     INSERT INTO Users (`ID No`, name, dob, expires_in, phone_no, user_image)
     VALUES (%s, %s, %s, %s, %s, %s)
     """
-    cursor.execute(query, (id_no, name, dob, expires_in, phone_no, image_data))
-    conn.commit()
 
-    cursor.close()
-    conn.close()
+def insert_user(raw_id, name, dob, expires_in, phone_no, image_data):
+    id_no = id_digits(raw_id)
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERT_USER, (id_no, name, dob, expires_in, canonical_contact(phone_no), image_data))
+        conn.commit()
+        cursor.close()
     print("✅ User inserted successfully!")
 
+def insert_users_many(rows, chunk_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Insert many (raw_id, name, dob, expires_in, phone_no, image_data) rows
+    with executemany on one connection, committing every chunk_size rows.
+    IDs and phone numbers are normalized like uploads (app.utils.normalize).
+    """
+    params = (
+        (id_digits(raw_id), name, dob, expires_in, canonical_contact(phone_no), image_data)
+        for raw_id, name, dob, expires_in, phone_no, image_data in rows
+    )
+    count = executemany_chunked(INSERT_USER, params, chunk_size)
+    print(f"✅ {count} users inserted successfully!")
+    return count
+
 def fetch_users():
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Users")
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM Users")
+        results = cursor.fetchall()
+        cursor.close()
     return results
+
+USER_COLUMNS = ("ID No", "name", "dob", "expires_in", "phone_no", "user_image")
+
+def iter_users(columns=None, filters=None, batch_size=LEGACY_FETCH_BATCH_SIZE):
+    """
+    Stream users as lists of dict rows, batch_size at a time. Defaults to
+    every column but the user_image BLOB, which has to be asked for in
+    columns; filters maps column names to required values, with `ID No`
+    sanitized like on insert. Bad column names raise ValueError.
+    """
+    if columns is None:
+        columns = [c for c in USER_COLUMNS if c != "user_image"]
+    filters = dict(filters or {})
+    if "ID No" in filters:
+        filters["ID No"] = id_digits(filters["ID No"])
+    query, params = build_select("Users", USER_COLUMNS, columns, filters)
+    return stream_rows(query, params, batch_size)
@@ -0,0 +1,269 @@
+"""
+Monthly range partitions of collections on PostgreSQL.
+
+The model declares collections ``PARTITION BY RANGE (date)`` there, with a
+default partition for NULL dates and months that have no partition yet.
+ensure_partitions creates the partitions for the coming months and splits
+rows waiting in the default partition out into partitions of their own;
+archive_partitions takes old months holding only read-only records out of
+the table. Other databases keep a plain table and both are no-ops.
+
+Run from cron (the API only does it at startup):
+  python -m app.partitions              create upcoming partitions, split the default partition
+  python -m app.partitions --archive    also archive read-only months older than ARCHIVE_AFTER_MONTHS
+"""
+
+import argparse
+import logging
+import os
+from datetime import date, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import collection_cache
+from app.cofig import (
+    ARCHIVE_AFTER_MONTHS, ARCHIVE_DIR, ARCHIVE_MODE, ARCHIVE_SCHEMA, EXPORT_BATCH_SIZE, PARTITION_MONTHS_AHEAD
+)
+from app.crud import COLLECTION_OUT_COLUMNS, collections_query
+from app.database import SessionLocal
+from app.export import encode_ndjson, gzip_stream, iter_batches
+from app.search import invalidate_search
+from app.stats import refresh_stats
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MODES = ("detach", "export")
+
+DEFAULT_PARTITION = "collections_default"
+
+# pg_advisory_xact_lock key serializing partition maintenance between API workers and cron
+_LOCK_KEY = 0x636F6C6C  # "coll"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """collections_p2024_01 holds January 2024"""
+    return f"collections_p{month:%Y_%m}"
+
+
+def is_partitioned(db: Session) -> bool:
+    """Whether collections is a partitioned PostgreSQL table (False on other databases and for pre-partitioning tables)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('collections'))"
+    )).scalar_one()
+
+
+def attached_partitions(db: Session) -> List[str]:
+    return db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('collections') ORDER BY c.relname"
+    )).scalars().all()
+
+
+def _month_range(month: date) -> str:
+    # Dates formatted by us, not user input: DDL takes no bind parameters
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+def _create_partition(db: Session, month: date) -> None:
+    """
+    Create ``month``'s partition, moving any of its rows out of the default
+    partition first: a partition cannot be attached while the default one
+    still holds rows in its range.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    db.execute(text(f"CREATE TABLE {name} (LIKE collections INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds).rowcount
+    db.execute(text(f"ALTER TABLE collections ATTACH PARTITION {name} FOR VALUES {_month_range(month)}"))
+    logger.info("Created partition %s (%d rows moved from %s)", name, moved, DEFAULT_PARTITION)
+
+
+def ensure_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """
+    Create the default partition, this month's and the next ``months_ahead``
+    months' partitions, and partitions for every month with rows in the
+    default partition. Returns the names of the partitions created.
+    """
+    if not is_partitioned(db):
+        if db.get_bind().dialect.name == "postgresql":
+            logger.warning("collections is not partitioned (created before partitioning); skipping partition maintenance")
+        return []
+
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    existing = set(attached_partitions(db))
+    if DEFAULT_PARTITION not in existing:
+        db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF collections DEFAULT"))
+
+    this_month = month_start(today or date.today())
+    months = {add_months(this_month, n) for n in range(months_ahead + 1)}
+    months.update(db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', date)::date FROM {DEFAULT_PARTITION} WHERE date IS NOT NULL"
+    )).scalars())
+
+    created = []
+    for month in sorted(months):
+        if partition_name(month) not in existing:
+            _create_partition(db, month)
+            created.append(partition_name(month))
+    db.commit()
+    return created
+
+
+def _has_editable(db: Session, name: str) -> bool:
+    return db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE read_only IS NOT TRUE)")).scalar_one()
+
+
+def archivable_partitions(db: Session, before: date) -> List[Tuple[str, date]]:
+    """(name, month) of the partitions ending by ``before`` that hold no editable records"""
+    result = []
+    for name in attached_partitions(db):
+        if not name.startswith("collections_p"):
+            continue
+        year, month = name[len("collections_p"):].split("_")
+        start = date(int(year), int(month), 1)
+        if add_months(start, 1) > before:
+            continue
+        if _has_editable(db, name):
+            logger.info("Not archiving %s: it still has editable records", name)
+            continue
+        result.append((name, start))
+    return result
+
+
+def _export_month(month: date, path: str, session_factory: Callable[[], Session]) -> int:
+    """Write the month's records to ``path`` as gzipped NDJSON, the /collections/export format"""
+    last_day = add_months(month, 1) - timedelta(days=1)
+    query = collections_query(
+        limit=None, columns=COLLECTION_OUT_COLUMNS, date_from=month, date_to=last_day
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    partial = f"{path}.partial"
+    size = 0
+    with open(partial, "wb") as f:
+        for chunk in gzip_stream(encode_ndjson(iter_batches(query, session_factory))):
+            f.write(chunk)
+            size += len(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+    return size
+
+
+def _archive_name(db: Session, name: str) -> str:
+    """
+    ``name``, or ``name_2``, ``name_3``... when ARCHIVE_SCHEMA already holds an
+    earlier archive of the month (it was recreated from the default partition
+    after being archived)
+    """
+    candidate, n = name, 1
+    while db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"{ARCHIVE_SCHEMA}.{candidate}"}).scalar_one():
+        n += 1
+        candidate = f"{name}_{n}"
+    return candidate
+
+
+def _archive_path(archive_dir: str, name: str) -> str:
+    """Export file for ``name``, suffixed like _archive_name so an earlier export is never overwritten"""
+    path, n = os.path.join(archive_dir, f"{name}.ndjson.gz"), 1
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(archive_dir, f"{name}_{n}.ndjson.gz")
+    return path
+
+
+def archive_partitions(
+    db: Session,
+    older_than_months: int = ARCHIVE_AFTER_MONTHS,
+    mode: str = ARCHIVE_MODE,
+    archive_dir: str = ARCHIVE_DIR,
+    today: Optional[date] = None,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> List[str]:
+    """
+    Take months that ended ``older_than_months`` ago and hold only read-only
+    records out of collections: "detach" keeps each one as a table in
+    ARCHIVE_SCHEMA, "export" writes it to ``archive_dir`` as
+    collections_pYYYY_MM.ndjson.gz and drops it; a month archived before gets
+    a numeric suffix. Returns the partitions archived.
+
+    Only this process's cache is invalidated directly; other API workers drop
+    the archived records once their cache entries expire (CACHE_TTL_SECONDS,
+    CACHE_READ_ONLY_TTL_SECONDS for read-only records) or, with a shared cache
+    backend, right away.
+    """
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Unknown archive mode: {mode}")
+    if not is_partitioned(db):
+        return []
+
+    before = add_months(month_start(today or date.today()), -older_than_months)
+    archived = []
+    for name, month in archivable_partitions(db, before):
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+        # Holds off new rows for the month until the partition is gone
+        db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        if _has_editable(db, name):  # written to since the check above
+            db.rollback()
+            continue
+        touched = db.execute(text(f"SELECT record_id, id, date FROM {name}")).all()
+        if mode == "export":
+            os.makedirs(archive_dir, exist_ok=True)
+            path = _archive_path(archive_dir, name)
+            size = _export_month(month, path, session_factory)
+            logger.info("Exported %s (%d records, %d bytes) to %s", name, len(touched), size, path)
+
+        db.execute(text(f"ALTER TABLE collections DETACH PARTITION {name}"))
+        if mode == "export":
+            db.execute(text(f"DROP TABLE {name}"))
+        else:
+            db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            archive_name = _archive_name(db, name)
+            if archive_name != name:
+                db.execute(text(f"ALTER TABLE {name} RENAME TO {archive_name}"))
+            db.execute(text(f"ALTER TABLE {archive_name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            logger.info("Moved %s (%d records) to %s.%s", name, len(touched), ARCHIVE_SCHEMA, archive_name)
+        db.commit()
+
+        ids = {row.id for row in touched}
+        collection_cache.invalidate(record_ids=[row.record_id for row in touched], ids=ids)
+        invalidate_search(db, ids)
+        refresh_stats(db, dates=[row.date for row in touched], ids=ids)
+        archived.append(name)
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--archive", action="store_true", help="Also archive old read-only months")
+    parser.add_argument("--older-than-months", type=int, default=ARCHIVE_AFTER_MONTHS)
+    parser.add_argument("--mode", choices=ARCHIVE_MODES, default=ARCHIVE_MODE)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        created = ensure_partitions(db, args.months_ahead)
+        print(f"Partitions created: {', '.join(created) or 'none'}")
+        if args.archive:
+            archived = archive_partitions(db, args.older_than_months, args.mode, args.archive_dir)
+            print(f"Partitions archived: {', '.join(archived) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
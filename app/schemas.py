@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Union
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional, Union
 from datetime import date, datetime
 
 class CollectionBase(BaseModel):
@@ -19,6 +19,52 @@ class CollectionUpdate(BaseModel):
     date: Optional[Union[date, datetime]] = None
     last_updated_by: str
 
+# Most record_ids one bulk request may name; larger edits should use a filter
+BULK_MAX_RECORD_IDS = 10000
+
+class CollectionFilter(BaseModel):
+    """Predicate selecting records for a bulk edit; all given fields must match"""
+    ids: Optional[list[int]] = Field(None, max_length=BULK_MAX_RECORD_IDS)  # ID numbers
+    date: Optional[Union[date, datetime]] = None
+    date_from: Optional[Union[date, datetime]] = None
+    date_to: Optional[Union[date, datetime]] = None
+
+class BulkTarget(BaseModel):
+    record_ids: Optional[list[int]] = Field(None, max_length=BULK_MAX_RECORD_IDS)
+    filter: Optional[CollectionFilter] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        # An empty target must never mean "every record"
+        if not self.record_ids and not (self.filter and self.filter.model_dump(exclude_none=True)):
+            raise ValueError("Give record_ids or a non-empty filter")
+        return self
+
+class CollectionBulkChanges(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    contact: Optional[str] = None
+    date: Optional[Union[date, datetime]] = None
+
+class CollectionBulkUpdate(BulkTarget):
+    changes: CollectionBulkChanges
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.changes.model_fields_set:
+            raise ValueError("changes must set at least one field")
+        return self
+
+class BulkOutcome(BaseModel):
+    record_id: int
+    status: Literal["updated", "deleted", "read_only", "not_found"]
+
+class BulkResult(BaseModel):
+    affected: int  # records updated or deleted
+    read_only: int  # matched but left untouched
+    not_found: int  # requested record_ids that do not exist
+    results: list[BulkOutcome] = []
+
 class CollectionOut(CollectionBase):
     record_id: int
     read_only: bool
@@ -28,12 +74,52 @@ class CollectionOut(CollectionBase):
     class Config:
         from_attributes = True
 
+class CollectionSearchHit(CollectionOut):
+    score: float  # trigram similarity; prefix matches get 1 added
+
 class CollectionHistory(BaseModel):
     id: int
     collections: list[CollectionOut]
+    next_cursor: Optional[str] = None
 
 class ExcelUploadResponse(BaseModel):
     message: str
     records_processed: int
-    records_added: int
-    errors: list[str] = [] 
\ No newline at end of file
+    records_added: int  # new records inserted
+    records_updated: int = 0
+    records_skipped: int = 0
+    duplicate_file: bool = False
+    errors: list[str] = [] 
+
+class DateCount(BaseModel):
+    date: date
+    total: int = 0
+    read_only: int = 0
+    editable: int = 0
+
+class IdCount(BaseModel):
+    id: int
+    records: int
+
+class CollectionStats(BaseModel):
+    total: int
+    read_only: int
+    editable: int
+    undated: int = 0  # records without a date, counted in the totals but not in by_date
+    distinct_ids: int
+    by_date: list[DateCount] = []
+    top_ids: list[IdCount] = []  # IDs with the most records, most first
+
+class UploadJobStatus(BaseModel):
+    job_id: str
+    status: str
+    filename: Optional[str] = None
+    submitted_by: Optional[str] = None
+    rows_processed: int = 0
+    rows_inserted: int = 0
+    errors: list[str] = []
+    rows_per_second: float = 0.0
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
\ No newline at end of file
@@ -0,0 +1,309 @@
+import re
+import threading
+import weakref
+from array import array
+from bisect import insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import Select, and_, case, func, literal, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.cofig import SEARCH_SIMILARITY
+from app.models.enhanced_collection import Collection
+from app.utils.normalize import canonical_contact, normalize_whitespace
+
+# Records reloaded per statement when the in-process index catches up on writes
+RELOAD_CHUNK = 500
+
+# Rows fetched per round trip while building the in-process index
+BUILD_BATCH_SIZE = 10_000
+
+# Words as pg_trgm sees them: runs of letters and digits
+_WORD = re.compile(r"[^\W_]+")
+
+
+def name_key(name: Optional[str]) -> str:
+    return normalize_whitespace(name, case="lower") or ""
+
+
+def contact_key(contact: Optional[str]) -> str:
+    return (canonical_contact(contact) or "").lower()
+
+
+def check_search_query(q: str) -> None:
+    """
+    Raise ValueError for a query with nothing left to match once normalized:
+    as an empty LIKE prefix it would match every record
+    """
+    if not name_key(q):
+        raise ValueError("Search query is empty")
+
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm's trigrams: each word padded with two spaces in front and one behind"""
+    grams = set()
+    for word in _WORD.findall(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def prefix_trigrams(text: str) -> Set[str]:
+    """Trigrams every text with a word starting like each word of ``text`` contains"""
+    grams = set()
+    for word in _WORD.findall(text):
+        padded = f"  {word}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """pg_trgm similarity(): shared trigrams over all trigrams"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def is_prefix_match(query_name: str, query_contact: str, name: str, contact: str) -> bool:
+    """The name, or a word in it, starts with the query; or the contact does"""
+    return bool(
+        (query_name and (name.startswith(query_name) or f" {query_name}" in f" {name}"))
+        or (query_contact and contact.startswith(query_contact))
+    )
+
+
+class NgramIndex:
+    """
+    In-process trigram index over name and contact, for databases without
+    pg_trgm (SQLite, tests).
+
+    Built from the table on first use, then kept current by ``invalidate``:
+    writers name the ID numbers they touched and the next search reloads
+    those IDs' records. Only writes made through this process are seen, so
+    multi-worker deployments should search on Postgres.
+
+    Each field has a posting list of record_ids per trigram. A search counts,
+    with numpy, how many of the query's trigrams every record shares; that
+    gives each record's exact similarity, so only the records that can make
+    the top ``limit`` are checked against their text.
+
+    Posting lists are append-only; records that change or disappear leave
+    stale entries, which can only raise a record's count, so they never hide
+    a match. They are dropped once there are more of them than live records.
+    """
+
+    FIELDS = (0, 1)  # name, contact
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._dirty: Set[int] = set()
+        self._docs: Dict[int, Tuple[int, str, str]] = {}  # record_id -> (ID, name key, contact key)
+        self._by_id: Dict[int, Set[int]] = {}
+        self._postings: Tuple[Dict[str, array], ...] = ({}, {})
+        self._sizes = (array("i"), array("i"))  # trigram count of each record's name and contact, by record_id
+        self._stale = 0
+
+    def invalidate(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            if self._built:
+                self._dirty.update(ids)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # Maintenance
+
+    def _add(self, record_id: int, ID: int, name: Optional[str], contact: Optional[str]) -> None:
+        doc = (ID, name_key(name), contact_key(contact))
+        self._docs[record_id] = doc
+        self._by_id.setdefault(ID, set()).add(record_id)
+        self._index(record_id, doc)
+
+    def _index(self, record_id: int, doc: Tuple[int, str, str]) -> None:
+        missing = record_id + 1 - len(self._sizes[0])
+        if missing > 0:
+            grow = bytes(4 * max(missing, len(self._sizes[0])))
+            for sizes in self._sizes:
+                sizes.frombytes(grow)
+        for field in self.FIELDS:
+            grams = trigrams(doc[field + 1])
+            self._sizes[field][record_id] = len(grams)
+            postings = self._postings[field]
+            for gram in grams:
+                entries = postings.get(gram)
+                if entries is None:
+                    entries = postings[gram] = array("q")
+                entries.append(record_id)
+
+    def _remove_id(self, ID: int) -> None:
+        for record_id in self._by_id.pop(ID, ()):
+            del self._docs[record_id]
+            self._stale += 1
+
+    def _compact(self) -> None:
+        self._postings = ({}, {})
+        self._sizes = (array("i"), array("i"))
+        self._stale = 0
+        for record_id, doc in self._docs.items():
+            self._index(record_id, doc)
+
+    def sync(self, db: Session) -> None:
+        """Build the index, or reload the records of IDs written since the last search"""
+        with self._lock:
+            if not self._built:
+                query = select(Collection.record_id, Collection.id, Collection.name, Collection.contact)
+                for batch in db.execute(query.execution_options(yield_per=BUILD_BATCH_SIZE)).partitions():
+                    for row in batch:
+                        self._add(*row)
+                self._built = True
+                return
+
+            dirty, self._dirty = list(self._dirty), set()
+            for start in range(0, len(dirty), RELOAD_CHUNK):
+                chunk = dirty[start:start + RELOAD_CHUNK]
+                rows = db.execute(
+                    select(Collection.record_id, Collection.id, Collection.name, Collection.contact)
+                    .where(Collection.id.in_(chunk))
+                ).all()
+                for ID in chunk:
+                    self._remove_id(ID)
+                for row in rows:
+                    self._add(*row)
+            if self._stale > len(self._docs):
+                self._compact()
+
+    # Lookup
+
+    def _shared(self, field: int, grams: Set[str]) -> np.ndarray:
+        """How many of ``grams`` each record_id's ``field`` has"""
+        postings = self._postings[field]
+        lists = [np.frombuffer(postings[gram], dtype=np.int64) for gram in grams if gram in postings]
+        if not lists:
+            return np.zeros(len(self._sizes[field]), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self._sizes[field]))
+
+    def _similarities(self, field: int, grams: Set[str]) -> np.ndarray:
+        if not grams:
+            return np.zeros(len(self._sizes[field]))
+        shared = self._shared(field, grams)
+        sizes = np.frombuffer(self._sizes[field], dtype=np.int32)
+        return shared / np.maximum(len(grams) + sizes - shared, 1)
+
+    def _prefix_candidates(self, field: int, grams: Set[str]) -> np.ndarray:
+        if not grams:
+            return np.zeros(len(self._sizes[field]), dtype=bool)
+        return self._shared(field, grams) >= len(grams)
+
+    def search(self, q: str, limit: int, threshold: float = SEARCH_SIMILARITY) -> List[Tuple[int, float]]:
+        """(record_id, score) pairs, best first; prefix matches score 1 + similarity"""
+        query_name, query_contact = name_key(q), contact_key(q)
+        name_grams, contact_grams = trigrams(query_name), trigrams(query_contact)
+
+        with self._lock:
+            if not self._docs:
+                return []
+            # Upper bounds: stale postings can only raise a count, and the
+            # prefix trigrams are necessary but not sufficient for a prefix match
+            closeness = np.maximum(self._similarities(0, name_grams), self._similarities(1, contact_grams))
+            prefix = (
+                self._prefix_candidates(0, prefix_trigrams(query_name))
+                | self._prefix_candidates(1, prefix_trigrams(query_contact))
+            )
+            bound = closeness + prefix
+            candidates = np.flatnonzero(prefix | (closeness >= threshold))
+            order = candidates[np.lexsort((candidates, -bound[candidates]))]
+
+            hits: List[Tuple[float, int]] = []  # (-score, record_id), kept sorted
+            for record_id in order.tolist():
+                if len(hits) >= limit and -hits[limit - 1][0] >= bound[record_id]:
+                    break
+                doc = self._docs.get(record_id)
+                if doc is None:
+                    continue
+                _, name, contact = doc
+                score = max(similarity(name_grams, trigrams(name)), similarity(contact_grams, trigrams(contact)))
+                if is_prefix_match(query_name, query_contact, name, contact):
+                    score += 1.0
+                elif score < threshold:
+                    continue
+                insort(hits, (-score, record_id))
+
+        return [(record_id, -score) for score, record_id in hits[:limit]]
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, NgramIndex]" = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def _engine(db) -> Engine:
+    bind = db.get_bind()
+    return getattr(bind, "sync_engine", bind)
+
+
+def index_for(db: Session) -> NgramIndex:
+    """The in-process index of the database ``db`` is bound to"""
+    engine = _engine(db)
+    with _indexes_lock:
+        index = _indexes.get(engine)
+        if index is None:
+            index = _indexes[engine] = NgramIndex()
+        return index
+
+
+def invalidate_search(db, ids: Iterable[int]) -> None:
+    """Tell the in-process index which ID numbers a committed write touched"""
+    index = _indexes.get(_engine(db))
+    if index is not None:
+        index.invalidate(ids)
+
+
+def discard_index(engine: Engine) -> None:
+    """Drop the in-process index of ``engine``'s database, after its table was rewritten behind the API's back"""
+    with _indexes_lock:
+        _indexes.pop(engine, None)
+
+
+def uses_trigram_sql(db) -> bool:
+    return _engine(db).dialect.name == "postgresql"
+
+
+def trigram_search_query(q: str, limit: int, columns: tuple) -> Select:
+    """
+    Ranked search on Postgres, served by the pg_trgm GIN indexes from
+    init.sql: prefix matches (LIKE) first, then fuzzy matches (the %
+    operator, pg_trgm.similarity_threshold) by similarity
+    """
+    check_search_query(q)
+    query_name, query_contact = name_key(q), contact_key(q)
+    name, contact = func.lower(Collection.name), func.lower(Collection.contact)
+    name_pattern = query_name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    contact_pattern = query_contact.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    prefix = or_(
+        name.like(f"{name_pattern}%", escape="\\"),
+        name.like(f"% {name_pattern}%", escape="\\"),
+        contact.like(f"{contact_pattern}%", escape="\\") if query_contact else literal(False),
+    )
+    closeness = func.greatest(func.similarity(name, query_name), func.similarity(contact, query_contact))
+    score = (closeness + case((prefix, 1.0), else_=0.0)).label("score")
+    # % finds candidates through the index; the explicit bound applies SEARCH_SIMILARITY
+    fuzzy = and_(or_(name.op("%")(query_name), contact.op("%")(query_contact)), closeness >= SEARCH_SIMILARITY)
+    return (
+        select(*columns, score)
+        .where(or_(prefix, fuzzy))
+        .order_by(score.desc(), Collection.record_id)
+        .limit(limit)
+    )
+
+
+def rows_in_rank_order(db: Session, hits: List[Tuple[int, float]], columns: tuple) -> List[tuple]:
+    """``columns`` of each hit plus its score, the shape trigram_search_query returns"""
+    if not hits:
+        return []
+    rows = db.execute(select(*columns).where(Collection.record_id.in_([record_id for record_id, _ in hits]))).all()
+    by_record_id = {row.record_id: row for row in rows}
+    return [(*by_record_id[record_id], score) for record_id, score in hits if record_id in by_record_id]
@@ -0,0 +1,196 @@
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, exists, false, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import UPSERT_INSERTS
+from app.models.collection_stats import CollectionDateStats, CollectionIdStats, CollectionUndatedStats
+from app.models.enhanced_collection import Collection
+from app.schemas import CollectionStats, DateCount, IdCount
+
+# Summary tables behind /collections/stats. Writers pass the dates and IDs they
+# touched and only those summary rows are recounted, so reading the stats costs
+# the same however large collections grows; a None date recounts the records
+# without a date. rebuild_stats recounts everything (after writes that bypass
+# the app, e.g. init.sql or manual SQL).
+
+_read_only = func.coalesce(Collection.read_only, false())
+
+
+def _as_date(value) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def check_stats_support(db) -> None:
+    """
+    Raise ValueError when the summary tables cannot be maintained on ``db``'s
+    database. Writers call it before writing, since the refresh only runs
+    after their commit.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name not in UPSERT_INSERTS:
+        raise ValueError(f"Collection stats are not supported on {dialect_name}")
+
+
+def stats_refresh_statements(dialect_name: str, dates: Iterable = (), ids: Iterable[int] = ()) -> list:
+    """Statements recounting the summary rows for ``dates`` and ``ids``; shared with the async refresh"""
+    if dialect_name not in UPSERT_INSERTS:
+        raise ValueError(f"Collection stats are not supported on {dialect_name}")
+    dialect_insert = UPSERT_INSERTS[dialect_name]
+    dates = list(dates)
+    undated = any(d is None for d in dates)
+    dates = sorted({_as_date(d) for d in dates if d is not None})
+    ids = sorted({i for i in ids if i is not None})
+    statements = []
+
+    if dates:
+        counts = (
+            select(Collection.date, _read_only, func.count())
+            .where(Collection.date.in_(dates))
+            .group_by(Collection.date, _read_only)
+        )
+        upsert = dialect_insert(CollectionDateStats).from_select(["date", "read_only", "records"], counts)
+        statements.append(upsert.on_conflict_do_update(
+            index_elements=[CollectionDateStats.date, CollectionDateStats.read_only],
+            set_={"records": upsert.excluded.records}
+        ))
+        statements.append(delete(CollectionDateStats).where(
+            CollectionDateStats.date.in_(dates),
+            ~exists().where(Collection.date == CollectionDateStats.date, _read_only == CollectionDateStats.read_only)
+        ))
+
+    if undated:
+        counts = select(_read_only, func.count()).where(Collection.date.is_(None)).group_by(_read_only)
+        upsert = dialect_insert(CollectionUndatedStats).from_select(["read_only", "records"], counts)
+        statements.append(upsert.on_conflict_do_update(
+            index_elements=[CollectionUndatedStats.read_only], set_={"records": upsert.excluded.records}
+        ))
+        statements.append(delete(CollectionUndatedStats).where(
+            ~exists().where(Collection.date.is_(None), _read_only == CollectionUndatedStats.read_only)
+        ))
+
+    if ids:
+        counts = select(Collection.id, func.count()).where(Collection.id.in_(ids)).group_by(Collection.id)
+        upsert = dialect_insert(CollectionIdStats).from_select(["id", "records"], counts)
+        statements.append(upsert.on_conflict_do_update(
+            index_elements=[CollectionIdStats.id], set_={"records": upsert.excluded.records}
+        ))
+        statements.append(delete(CollectionIdStats).where(
+            CollectionIdStats.id.in_(ids), ~exists().where(Collection.id == CollectionIdStats.id)
+        ))
+
+    return statements
+
+
+def refresh_stats(db: Session, dates: Iterable = (), ids: Iterable[int] = ()) -> None:
+    """Recount the summary rows for the dates and IDs a committed write touched"""
+    statements = stats_refresh_statements(db.get_bind().dialect.name, dates, ids)
+    if not statements:
+        return
+    for statement in statements:
+        db.execute(statement)
+    db.commit()
+
+
+async def refresh_stats_async(db: AsyncSession, dates: Iterable = (), ids: Iterable[int] = ()) -> None:
+    """AsyncSession counterpart of refresh_stats"""
+    statements = stats_refresh_statements(db.get_bind().dialect.name, dates, ids)
+    if not statements:
+        return
+    for statement in statements:
+        await db.execute(statement)
+    await db.commit()
+
+
+def rebuild_stats(db: Session) -> None:
+    """Recount both summary tables from scratch"""
+    db.execute(delete(CollectionDateStats))
+    db.execute(delete(CollectionUndatedStats))
+    db.execute(delete(CollectionIdStats))
+    db.execute(insert(CollectionDateStats).from_select(
+        ["date", "read_only", "records"],
+        select(Collection.date, _read_only, func.count())
+        .where(Collection.date.isnot(None))
+        .group_by(Collection.date, _read_only)
+    ))
+    db.execute(insert(CollectionUndatedStats).from_select(
+        ["read_only", "records"],
+        select(_read_only, func.count()).where(Collection.date.is_(None)).group_by(_read_only)
+    ))
+    db.execute(insert(CollectionIdStats).from_select(
+        ["id", "records"], select(Collection.id, func.count()).group_by(Collection.id)
+    ))
+    db.commit()
+
+
+def date_stats_query():
+    return select(CollectionDateStats.date, CollectionDateStats.read_only, CollectionDateStats.records).order_by(
+        CollectionDateStats.date
+    )
+
+
+def undated_stats_query():
+    return select(CollectionUndatedStats.read_only, CollectionUndatedStats.records)
+
+
+def top_ids_query(limit: int):
+    return select(CollectionIdStats.id, CollectionIdStats.records).order_by(
+        CollectionIdStats.records.desc(), CollectionIdStats.id
+    ).limit(limit)
+
+
+def distinct_ids_query():
+    return select(func.count()).select_from(CollectionIdStats)
+
+
+def summarize_stats(date_rows, top_rows, distinct_ids: int, undated_rows=()) -> CollectionStats:
+    """
+    Fold (date, read_only, records) summary rows, and (read_only, records)
+    rows for records without a date, into the /collections/stats response
+    """
+    by_date: List[DateCount] = []
+    for day, read_only, records in date_rows:
+        if not by_date or by_date[-1].date != day:
+            by_date.append(DateCount(date=day))
+        entry = by_date[-1]
+        if read_only:
+            entry.read_only += records
+        else:
+            entry.editable += records
+        entry.total += records
+
+    undated = {True: 0, False: 0}
+    for read_only, records in undated_rows:
+        undated[bool(read_only)] += records
+
+    read_only = sum(entry.read_only for entry in by_date) + undated[True]
+    editable = sum(entry.editable for entry in by_date) + undated[False]
+    return CollectionStats(
+        total=read_only + editable,
+        read_only=read_only,
+        editable=editable,
+        undated=undated[True] + undated[False],
+        distinct_ids=distinct_ids,
+        by_date=by_date,
+        top_ids=[IdCount(id=ID, records=records) for ID, records in top_rows]
+    )
+
+
+def get_collection_stats(db: Session, top_ids: int = 20) -> CollectionStats:
+    """Dashboard totals read from the summary tables"""
+    return summarize_stats(
+        db.execute(date_stats_query()).all(),
+        db.execute(top_ids_query(top_ids)).all(),
+        db.execute(distinct_ids_query()).scalar_one(),
+        db.execute(undated_stats_query()).all()
+    )
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    with SessionLocal() as session:
+        rebuild_stats(session)
+    print("Collection stats rebuilt")
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.cofig import UPLOAD_SPOOL_DIR
+
+# Size of each read when hashing a spooled upload
+HASH_READ_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file's contents, read in fixed-size pieces"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            piece = f.read(HASH_READ_SIZE)
+            if not piece:
+                break
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def _date_part(row_date) -> str:
+    """ISO date of a dated row, "" for a row whose sheet left the date blank"""
+    if row_date is None:
+        return ""
+    return (row_date.date() if isinstance(row_date, datetime) else row_date).isoformat()
+
+
+def upload_key(ID: int, row_date, occurrence: int = 0) -> str:
+    """
+    Natural key of an uploaded row: ID, the sheet's date ("" when undated,
+    rather than the upload day, so the key is the same on every re-upload)
+    and, for the second and later distinct rows with that ID and date in
+    one file, their occurrence number
+    """
+    key = f"{ID}:{_date_part(row_date)}"
+    return f"{key}:{occurrence}" if occurrence else key
+
+
+def row_fingerprint(ID: int, name: Optional[str], contact: Optional[str], row_date) -> str:
+    """Hash of the uploaded fields that decide whether a re-uploaded row changed"""
+    parts = (str(ID), name or "", contact or "", _date_part(row_date))
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
+class UploadKeys:
+    """
+    Assigns upload keys across one upload: the occurrence number of each
+    distinct row per (ID, sheet date), and None for a row identical to one
+    earlier in the upload. The fingerprints and counts live in a temporary
+    SQLite file (in UPLOAD_SPOOL_DIR), so memory stays bounded however many
+    rows a streamed upload has.
+    """
+
+    # Bind parameters per lookup, under SQLite's lowest default limit
+    LOOKUP_CHUNK = 900
+
+    def __init__(self, directory: Optional[str] = UPLOAD_SPOOL_DIR):
+        fd, self.path = tempfile.mkstemp(prefix="upload-keys-", suffix=".sqlite3", dir=directory)
+        os.close(fd)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(
+            "PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF; PRAGMA cache_size = -32768;"
+            "CREATE TABLE seen (fingerprint TEXT PRIMARY KEY) WITHOUT ROWID;"
+            "CREATE TABLE occurrences (row_group TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID;"
+        )
+
+    def _lookup(self, sql: str, values: List[str]) -> Dict[str, object]:
+        found = {}
+        for start in range(0, len(values), self.LOOKUP_CHUNK):
+            chunk = values[start:start + self.LOOKUP_CHUNK]
+            found.update(self._db.execute(sql.format(", ".join("?" * len(chunk))), chunk))
+        return found
+
+    def keys_for(self, rows: Iterable[Tuple[int, object, str]]) -> List[Optional[str]]:
+        """
+        upload_key of each (ID, sheet date, fingerprint) row of a batch, in
+        order, or None for a row identical to an earlier one
+        """
+        rows = list(rows)
+        seen = self._lookup(
+            "SELECT fingerprint, 1 FROM seen WHERE fingerprint IN ({})", list({fp for _, _, fp in rows})
+        )
+        counts = self._lookup(
+            "SELECT row_group, n FROM occurrences WHERE row_group IN ({})",
+            list({upload_key(ID, row_date) for ID, row_date, _ in rows})
+        )
+        keys, new_fingerprints, changed = [], [], {}
+        for ID, row_date, fingerprint in rows:
+            if fingerprint in seen:
+                keys.append(None)
+                continue
+            seen[fingerprint] = 1
+            new_fingerprints.append((fingerprint,))
+            group = upload_key(ID, row_date)
+            occurrence = changed.get(group, counts.get(group, 0))
+            changed[group] = occurrence + 1
+            keys.append(upload_key(ID, row_date, occurrence))
+        self._db.executemany("INSERT INTO seen VALUES (?)", new_fingerprints)
+        self._db.executemany("INSERT OR REPLACE INTO occurrences VALUES (?, ?)", changed.items())
+        return keys
+
+    def close(self) -> None:
+        self._db.close()
+        os.remove(self.path)
+
+    def __enter__(self) -> "UploadKeys":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
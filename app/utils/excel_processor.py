@@ -1,12 +1,39 @@
+import io
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import List, Tuple, Optional
+from datetime import date, datetime, time
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+from app.cofig import EXCEL_CHUNK_SIZE
+from app.metrics import upload_phase_duration
 from app.schemas import CollectionCreate
+from app.utils.normalize import canonical_contact_column, normalize_whitespace_column
+from app.utils.readers import EXCEL_READ_OPTIONS, iter_frames
 import logging
 
 logger = logging.getLogger(__name__)
 
-def process_excel_data(file_content: bytes) -> List[Tuple[CollectionCreate, bool]]:
+# Strings accepted as an ID are exactly the ones int() accepts (no decimals, no exponents)
+ID_PATTERN = r"\s*[+-]?\d+\s*"
+DATE_FORMAT = "%Y-%m-%d"
+# Fields populated by the import; passed to model_construct to skip recomputing them per row
+IMPORT_FIELDS = frozenset({'id', 'name', 'contact', 'date', 'email'})
+UNDATED_IMPORT_FIELDS = IMPORT_FIELDS - {'date'}
+
+ExcelSource = Union[bytes, str, BinaryIO]
+
+
+def read_excel_frame(source: ExcelSource, sheet: Union[str, int] = 0) -> pd.DataFrame:
+    """
+    Read one sheet (the first by default) of an Excel workbook from raw bytes,
+    a path or a file object, with the streaming readers' NA handling ("N/A"
+    stays text) so a file classifies the same on either path
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pd.read_excel(source, sheet_name=sheet, **EXCEL_READ_OPTIONS)
+
+
+def process_excel_data(file_content: ExcelSource) -> Tuple[List[Tuple[CollectionCreate, bool]], List[str]]:
     """
     Process Excel data according to business rules:
     - If 3 columns (ID, Name, Contact) are filled: mark as read_only
@@ -15,102 +42,215 @@ def process_excel_data(file_content: bytes) -> List[Tuple[CollectionCreate, bool
     - Email column is ignored during import but can be added later
     """
     try:
-        # Read Excel file
-        df = pd.read_excel(file_content)
-        
-        results = []
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                # Extract data from Excel row
-                id_val = row.get('ID')
-                name = row.get('Name')
-                contact = row.get('Contact')
-                date_val = row.get('Date')
-                
-                # Skip rows without ID
-                if pd.isna(id_val) or id_val is None:
-                    continue
-                
-                # Convert ID to integer
-                try:
-                    id_val = int(id_val)
-                except (ValueError, TypeError):
-                    errors.append(f"Row {index + 1}: Invalid ID value '{id_val}'")
-                    continue
-                
-                # Count filled required fields (ID, Name, Contact)
-                filled_fields = sum([
-                    not pd.isna(id_val),
-                    not pd.isna(name) and name is not None and str(name).strip() != '',
-                    not pd.isna(contact) and contact is not None and str(contact).strip() != ''
-                ])
-                
-                # Determine read-only status based on business rules
-                if filled_fields >= 3:
-                    read_only = True
-                elif filled_fields == 2 and not pd.isna(id_val):
-                    read_only = False
-                else:
-                    # Skip rows that don't meet minimum requirements
-                    continue
-                
-                # Process date
-                if pd.notna(date_val) and date_val is not None:
-                    try:
-                        if isinstance(date_val, str):
-                            date_val = datetime.strptime(date_val, '%Y-%m-%d').date()
-                        elif isinstance(date_val, datetime):
-                            date_val = date_val.date()
-                        else:
-                            date_val = datetime.utcnow().date()
-                    except (ValueError, TypeError):
-                        date_val = datetime.utcnow().date()
-                else:
-                    date_val = datetime.utcnow().date()
-                
-                # Create CollectionCreate object
-                collection_data = CollectionCreate(
-                    ID=id_val,
-                    Name=str(name).strip() if pd.notna(name) and name is not None else None,
-                    Contact=str(contact).strip() if pd.notna(contact) and contact is not None else None,
-                    Date=date_val,
-                    Email=None  # Email is ignored during import
-                )
-                
-                results.append((collection_data, read_only))
-                
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-                continue
-        
+        with upload_phase_duration.labels(phase="read").time():
+            df = read_excel_frame(file_content)
+        with upload_phase_duration.labels(phase="classify").time():
+            results, errors = classify_frame(df)
+
         logger.info(f"Processed {len(results)} valid records from Excel file")
         if errors:
             logger.warning(f"Found {len(errors)} errors during processing")
-            
+
         return results, errors
-        
+
+    except Exception as e:
+        logger.error(f"Error processing Excel file: {str(e)}")
+        raise ValueError(f"Failed to process Excel file: {str(e)}")
+
+
+def process_excel_stream(
+    source: Union[str, BinaryIO],
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    sheet: Optional[str] = None
+) -> Iterator[Tuple[List[Tuple[CollectionCreate, bool]], List[str]]]:
+    """
+    Streaming variant of process_excel_data.
+
+    Reads a sheet (the first unless ``sheet`` names one) ``chunk_size`` rows at a time and yields
+    ``(results, errors)`` for each chunk, so memory is bounded by the chunk
+    size rather than the workbook size. Row numbers in errors refer to the
+    whole sheet, exactly as process_excel_data reports them.
+    """
+    today = datetime.utcnow().date()
+    row_offset = 0
+    total = 0
+
+    try:
+        chunks = iter_excel_chunks(source, chunk_size, sheet)
+        while True:
+            with upload_phase_duration.labels(phase="read").time():
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            with upload_phase_duration.labels(phase="classify").time():
+                results, errors = classify_frame(chunk, row_offset=row_offset, today=today)
+            row_offset += len(chunk)
+            total += len(results)
+            yield results, errors
     except Exception as e:
         logger.error(f"Error processing Excel file: {str(e)}")
         raise ValueError(f"Failed to process Excel file: {str(e)}")
 
+    logger.info(f"Processed {total} valid records from {row_offset} Excel rows")
+
+
+def iter_excel_chunks(
+    source: Union[str, BinaryIO],
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    sheet: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield a sheet (the first unless ``sheet`` names one) as DataFrames of at most ``chunk_size`` rows.
+
+    Paths are read by the engine app.utils.readers picks for their format
+    (.xlsx/.xls/.ods, .csv or .parquet); file objects are read as .xlsx.
+    """
+    return iter_frames(source, chunk_size, sheet)
+
+
+def classify_frame(
+    df: pd.DataFrame,
+    row_offset: int = 0,
+    today: Optional[date] = None
+) -> Tuple[List[Tuple[CollectionCreate, bool]], List[str]]:
+    """
+    Apply the import rules to a whole DataFrame at once.
+
+    Every rule is evaluated as a column operation; Python only loops over the
+    rows that survive classification to build the CollectionCreate objects.
+    Error messages cite ``row_offset + position + 1`` so callers reading a
+    sheet in chunks keep the row numbers of the original file.
+    """
+    if 'ID' not in df.columns or df.empty:
+        return [], []
+
+    # CollectionCreate.date validates to a datetime, so hand model_construct midnight datetimes
+    today = datetime.combine(today or datetime.utcnow().date(), time.min)
+    row_numbers = np.arange(len(df)) + row_offset + 1
+
+    ids, id_present, id_valid = _coerce_ids(df['ID'])
+
+    invalid = id_present & ~id_valid
+    errors = [
+        f"Row {row}: Invalid ID value '{value}'"
+        for row, value in zip(row_numbers[invalid], df['ID'].to_numpy()[invalid])
+    ]
+
+    names, name_filled = _clean_text(df.get('Name'), len(df), normalize_whitespace_column)
+    contacts, contact_filled = _clean_text(df.get('Contact'), len(df), canonical_contact_column)
+
+    # ID always counts as one filled field once it is valid
+    filled_fields = 1 + name_filled.astype(np.int8) + contact_filled.astype(np.int8)
+    keep = id_valid & (filled_fields >= 2)
+    read_only = filled_fields >= 3
+
+    dates, dated = _normalize_dates(df.get('Date'), keep, today)
+
+    # Rows whose date was defaulted leave it out of the fields set, so dedup keys them without one
+    results = [
+        (
+            CollectionCreate.model_construct(
+                _fields_set=IMPORT_FIELDS if has_date else UNDATED_IMPORT_FIELDS,
+                id=int(id_val),
+                name=name,
+                contact=contact,
+                date=date_val,
+                email=None  # Email is ignored during import
+            ),
+            bool(ro)
+        )
+        for id_val, name, contact, date_val, has_date, ro in zip(
+            ids[keep], names[keep], contacts[keep], dates, dated, read_only[keep]
+        )
+    ]
+
+    return results, errors
+
+
+def _coerce_ids(column: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (ids as int64, present mask, valid mask) for the ID column"""
+    present = column.notna().to_numpy()
+
+    if pd.api.types.is_bool_dtype(column) or pd.api.types.is_integer_dtype(column):
+        ids = column.fillna(0).astype(np.int64).to_numpy()
+        return ids, present, present
+
+    numeric = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = present & np.isfinite(numeric)
+
+    if not pd.api.types.is_numeric_dtype(column):
+        # Strings must look like integers; non-string cells keep their numeric value
+        try:
+            is_int_text = column.str.fullmatch(ID_PATTERN)
+        except AttributeError:
+            is_int_text = None
+        if is_int_text is not None:
+            text_cells = is_int_text.notna().to_numpy()
+            valid &= ~text_cells | is_int_text.fillna(False).to_numpy(dtype=bool)
+
+    ids = np.zeros(len(column), dtype=np.int64)
+    ids[valid] = np.trunc(numeric[valid]).astype(np.int64)
+    return ids, present, valid
+
+
+def _clean_text(
+    column: Optional[pd.Series], length: int, normalize: Callable[[pd.Series], pd.Series]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (normalized text or None, filled mask) for a free-text column"""
+    if column is None:
+        return np.full(length, None, dtype=object), np.zeros(length, dtype=bool)
+
+    present = column.notna().to_numpy()
+    text = np.full(length, None, dtype=object)
+    if present.any():
+        text[present] = normalize(column[present].astype(str)).to_numpy(dtype=object)
+
+    filled = present.copy()
+    filled[present] = text[present] != ''
+    return text, filled
+
+
+def _normalize_dates(column: Optional[pd.Series], keep: np.ndarray, today: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (date, dated mask) for every kept row: real datetimes and
+    YYYY-MM-DD strings are honoured, anything else (blank, numbers, bad
+    strings) becomes today and is left out of the mask.
+    """
+    count = int(keep.sum())
+    if column is None or count == 0:
+        return np.full(count, today, dtype=object), np.zeros(count, dtype=bool)
+
+    column = column[keep]
+    if pd.api.types.is_datetime64_any_dtype(column):
+        parsed = column
+    elif pd.api.types.is_numeric_dtype(column):
+        return np.full(count, today, dtype=object), np.zeros(count, dtype=bool)
+    else:
+        parsed = pd.to_datetime(column, format=DATE_FORMAT, errors='coerce')
+
+    valid = parsed.notna().to_numpy()
+    dates = np.full(count, today, dtype=object)
+    if valid.any():
+        dates[valid] = parsed[valid].dt.normalize().dt.to_pydatetime()
+    return dates, valid
+
+
 def validate_excel_structure(df: pd.DataFrame) -> List[str]:
     """Validate that Excel file has required columns"""
     required_columns = ['ID', 'Name', 'Contact']
     optional_columns = ['Date', 'Collected']
-    
+
     errors = []
-    
+
     # Check for required columns
     for col in required_columns:
         if col not in df.columns:
             errors.append(f"Missing required column: {col}")
-    
+
     # Check for unexpected columns
     expected_columns = required_columns + optional_columns
     unexpected_columns = [col for col in df.columns if col not in expected_columns]
     if unexpected_columns:
         errors.append(f"Unexpected columns found: {', '.join(unexpected_columns)}")
-    
-    return errors 
\ No newline at end of file
+
+    return errors
@@ -0,0 +1,31 @@
+from typing import Dict, Tuple
+
+# Upload formats and the engines that can read them, kept free of pandas so the
+# API can validate filenames without importing the readers
+
+# Engines per file type, fastest first; the first one whose module is installed is used
+FORMAT_ENGINES: Dict[str, Tuple[str, ...]] = {
+    '.xlsx': ('calamine', 'openpyxl'),
+    '.xlsm': ('calamine', 'openpyxl'),
+    '.xls': ('calamine', 'xlrd'),
+    '.ods': ('calamine', 'odf'),
+    '.csv': ('pyarrow-csv', 'pandas-csv'),
+    '.parquet': ('pyarrow-parquet',),
+}
+SUPPORTED_SUFFIXES = tuple(FORMAT_ENGINES)
+# Engines reading these formats in bounded memory, used for files above EXCEL_STREAM_THRESHOLD_MB
+STREAMING_ENGINES: Dict[str, str] = {
+    '.xlsx': 'openpyxl',
+    '.xlsm': 'openpyxl',
+}
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm', '.xls', '.ods')
+
+ENGINE_MODULES = {
+    'calamine': 'python_calamine',
+    'openpyxl': 'openpyxl',
+    'xlrd': 'xlrd',
+    'odf': 'odf',
+    'pyarrow-csv': 'pyarrow',
+    'pandas-csv': 'pandas',
+    'pyarrow-parquet': 'pyarrow',
+}
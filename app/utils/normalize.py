@@ -0,0 +1,120 @@
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    # Only the column functions take Series; the scalar helpers must not pull pandas into the API's startup
+    import pandas as pd
+
+# Distinct raw ID strings remembered by the scalar path; legacy batches repeat IDs a lot
+ID_CACHE_SIZE = 65536
+
+# Every ASCII character except 0-9, deleted in one str.translate pass
+_ASCII_NON_DIGITS = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+# Phone-shaped contacts: digits with optional leading '+' and spaces, dashes or
+# parentheses in between. '.' is not a separator so numeric cells read as
+# "712345678.0" are never mistaken for one.
+_PHONE = re.compile(r"\s*\+?[\d\s()-]*\d[\d\s()-]*")
+_PHONE_SEPARATOR = re.compile(r"[\s()-]")
+_WHITESPACE = re.compile(r"\s+")
+
+# The column functions only hand ASCII cells to pandas' string ops, spelled
+# with ASCII classes: pyarrow-backed strings treat \d and \s as ASCII-only
+# while Python's re does not. Other cells take the scalar path.
+_ASCII = r"[\x00-\x7f]*"
+_ASCII_SPACE_CHARS = " \t\n\r\f\v\x1c\x1d\x1e\x1f"  # what str.isspace() accepts in ASCII
+_WS = r" \t\n\r\f\v\x1c-\x1f"
+# Once whitespace is normalized the only separators left are ' ', '(', ')' and '-'
+_ASCII_PHONE = r"\+?[0-9 ()-]*[0-9][0-9 ()-]*"
+_ASCII_PHONE_SEPARATORS = r"[ ()-]"
+_ASCII_WHITESPACE = rf"[{_WS}]+"
+_ASCII_UNCOLLAPSED = r"  |[\t\n\r\f\v\x1c-\x1f]"
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def id_digits(raw: str) -> str:
+    """
+    The digits of an ID number, in order ("AB12C034" -> "12034").
+
+    Same result as ``''.join(re.findall(r'\\d', raw))``: ASCII input goes
+    through a translation table, anything else keeps every Unicode decimal
+    digit, which is what ``\\d`` matches.
+    """
+    if not isinstance(raw, str):
+        raise TypeError(f"expected string, got {type(raw).__name__}")
+    if raw.isascii():
+        return raw.translate(_ASCII_NON_DIGITS)
+    return "".join(filter(str.isdecimal, raw))
+
+
+def id_digits_many(raws: Iterable[str]) -> List[str]:
+    """id_digits over a batch, sharing the memo cache"""
+    return [id_digits(raw) for raw in raws]
+
+
+def _by_ascii(column: "pd.Series", vectorized, scalar) -> "pd.Series":
+    """Apply ``vectorized`` to the ASCII cells of a string column and ``scalar`` to the rest"""
+    other = column.notna().to_numpy() & ~column.str.fullmatch(_ASCII).to_numpy(dtype=bool, na_value=True)
+    result = vectorized(column)
+    if other.any():
+        result = result.astype(object)
+        result[other] = [scalar(value) for value in column[other]]
+    return result
+
+
+def id_digits_column(column: "pd.Series") -> "pd.Series":
+    """id_digits for a whole column of strings; missing cells stay missing"""
+    return _by_ascii(column, lambda c: c.str.replace(r"[^0-9]", "", regex=True), id_digits)
+
+
+def normalize_whitespace(value: Optional[str], case: Optional[str] = None) -> Optional[str]:
+    """
+    Trim and collapse runs of whitespace to one space; ``case`` "lower" or
+    "casefold" also folds case (for matching keys, not for stored values)
+    """
+    if value is None:
+        return None
+    value = _WHITESPACE.sub(" ", value.strip())
+    if case == "lower":
+        return value.lower()
+    if case == "casefold":
+        return value.casefold()
+    return value
+
+
+def normalize_whitespace_column(column: "pd.Series", case: Optional[str] = None) -> "pd.Series":
+    """normalize_whitespace for a column of strings"""
+    def vectorized(c: "pd.Series") -> "pd.Series":
+        c = c.str.strip(_ASCII_SPACE_CHARS)
+        # Searching is cheaper than replacing, and most cells need no collapsing
+        if c.str.contains(_ASCII_UNCOLLAPSED).to_numpy(dtype=bool, na_value=False).any():
+            c = c.str.replace(_ASCII_WHITESPACE, " ", regex=True)
+        return c.str.lower() if case in ("lower", "casefold") else c
+
+    return _by_ascii(column, vectorized, lambda value: normalize_whitespace(value, case))
+
+
+def canonical_contact(value: Optional[str]) -> Optional[str]:
+    """
+    "0712 345-678" -> "0712345678" and "+254 (712) 345678" -> "+254712345678".
+    Contacts that are not phone-shaped (emails, notes) only get their
+    whitespace normalized; non-strings are returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    if _PHONE.fullmatch(value):
+        return _PHONE_SEPARATOR.sub("", value)
+    return normalize_whitespace(value)
+
+
+def canonical_contact_column(column: "pd.Series") -> "pd.Series":
+    """canonical_contact for a column of strings"""
+    def vectorized(c: "pd.Series") -> "pd.Series":
+        c = normalize_whitespace_column(c)
+        if not c.str.contains(_ASCII_PHONE_SEPARATORS).to_numpy(dtype=bool, na_value=False).any():
+            return c
+        phone = c.str.fullmatch(_ASCII_PHONE).to_numpy(dtype=bool, na_value=False)
+        return c.mask(phone, c.str.replace(_ASCII_PHONE_SEPARATORS, "", regex=True))
+
+    return _by_ascii(column, vectorized, canonical_contact)
@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Response header carrying the token for the next page of a list endpoint
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(record_id: int, last_updated_at: Optional[datetime] = None) -> str:
+    """Opaque, URL-safe token for the position after the given row"""
+    position = {"r": record_id}
+    if last_updated_at is not None:
+        position["t"] = last_updated_at.isoformat()
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, history: bool = False) -> Tuple[int, Optional[datetime]]:
+    """
+    Return (record_id, last_updated_at) from a token; raises ValueError if
+    malformed or issued by the other kind of endpoint (history cursors carry
+    last_updated_at, list cursors do not)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        position = json.loads(raw)
+        record_id = int(position["r"])
+        if ("t" in position) != history:
+            raise KeyError("t")
+        last_updated_at = datetime.fromisoformat(position["t"]) if history else None
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    return record_id, last_updated_at
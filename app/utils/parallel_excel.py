@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.cofig import INGEST_WORKERS, ZIP_MAX_MEMBERS, ZIP_MAX_UNCOMPRESSED_MB
+from app.schemas import CollectionCreate
+from app.utils.excel_processor import process_excel_stream
+from app.utils.readers import SUPPORTED_SUFFIXES, sheet_names
+
+SheetResult = Tuple[List[Tuple[CollectionCreate, bool]], List[str]]
+
+# Size of each read when unpacking a zip member
+COPY_SIZE = 1024 * 1024
+
+
+def is_zip_upload(path: str) -> bool:
+    return path.lower().endswith('.zip')
+
+
+def extract_workbooks(
+    path: str,
+    directory: str,
+    max_members: int = ZIP_MAX_MEMBERS,
+    max_bytes: int = int(ZIP_MAX_UNCOMPRESSED_MB * 1024 * 1024)
+) -> List[Tuple[str, str]]:
+    """
+    Copy every readable file (workbooks, CSV, Parquet) in a zip archive into ``directory``.
+
+    Members are written under generated names, never their archive paths, so
+    a crafted archive cannot write outside ``directory``. Archives with more
+    than ``max_members`` members, or whose readable files unpack to more than
+    ``max_bytes``, raise ValueError: the declared sizes are checked up front
+    and the bytes actually written while copying, since headers can lie.
+    Returns (extracted_path, member_name) pairs in archive order.
+    """
+    workbooks = []
+    with zipfile.ZipFile(path) as archive:
+        members = archive.infolist()
+        if len(members) > max_members:
+            raise ValueError(f"Archive has {len(members)} members; at most {max_members} are accepted")
+        members = [
+            (index, member) for index, member in enumerate(members)
+            if not member.is_dir() and member.filename.lower().endswith(SUPPORTED_SUFFIXES)
+            and not member.filename.startswith('__MACOSX/')
+        ]
+        if sum(member.file_size for _, member in members) > max_bytes:
+            raise ValueError(f"Archive unpacks to more than {max_bytes // 2**20} MiB")
+
+        written = 0
+        for index, member in members:
+            target = os.path.join(directory, f"{index}{os.path.splitext(member.filename)[1].lower()}")
+            with archive.open(member) as src, open(target, 'wb') as dst:
+                while True:
+                    piece = src.read(COPY_SIZE)
+                    if not piece:
+                        break
+                    written += len(piece)
+                    if written > max_bytes:
+                        raise ValueError(f"Archive unpacks to more than {max_bytes // 2**20} MiB")
+                    dst.write(piece)
+            workbooks.append((target, member.filename))
+    return workbooks
+
+
+def parse_sheet(path: str, sheet: Optional[str], label: str, output: str) -> str:
+    """
+    Classify one sheet chunk by chunk into ``output``; runs in a worker process.
+
+    Each chunk's ``(results, errors)`` is pickled to the file as soon as it is
+    classified, so neither this process nor the one reading the file back
+    (iter_spooled_chunks) holds more than a chunk. Errors are prefixed with
+    ``label`` so rows can be traced back to their file and sheet. A sheet
+    that cannot be read is reported as an error instead of failing the rest
+    of the upload. Returns ``output``.
+    """
+    with open(output, 'wb') as f:
+        try:
+            for results, errors in process_excel_stream(path, sheet=sheet):
+                pickle.dump((results, [f"{label}: {error}" for error in errors]), f, pickle.HIGHEST_PROTOCOL)
+        except ValueError as e:
+            pickle.dump(([], [f"{label}: {str(e)}"]), f, pickle.HIGHEST_PROTOCOL)
+    return output
+
+
+def iter_spooled_chunks(output: str) -> Iterator[SheetResult]:
+    """The chunks parse_sheet wrote, one at a time; removes the file once read"""
+    try:
+        with open(output, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    break
+    finally:
+        os.remove(output)
+
+
+def iter_sheet_chunks(path: str, sheet: Optional[str], label: str) -> Iterator[SheetResult]:
+    """parse_sheet for parsing in this process: chunks are yielded instead of spooled"""
+    try:
+        for results, errors in process_excel_stream(path, sheet=sheet):
+            yield results, [f"{label}: {error}" for error in errors]
+    except ValueError as e:
+        yield [], [f"{label}: {str(e)}"]
+
+
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """
+    This process's pool of ``workers`` parser processes, started on first use
+    and shared by every later upload. Spawned rather than forked: the API
+    process has threads and open connections a fork would copy.
+    """
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return executor
+
+
+def _discard_executor(workers: int, executor: ProcessPoolExecutor) -> None:
+    with _executors_lock:
+        if _executors.get(workers) is executor:
+            del _executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_parallel_sheets(
+    path: str,
+    filename: Optional[str] = None,
+    workers: int = INGEST_WORKERS
+) -> Iterator[SheetResult]:
+    """
+    Parse every sheet of a workbook, or of every workbook in a zip archive,
+    across a shared pool of ``workers`` processes.
+
+    Yields ``(results, errors)`` chunks in file and sheet order, the same
+    shape as process_excel_stream, so a single writer can consume the merged
+    stream. ``workers=1`` parses in this process.
+    """
+    with tempfile.TemporaryDirectory(prefix="ingest-") as directory:
+        if is_zip_upload(path):
+            workbooks = extract_workbooks(path, directory)
+        else:
+            workbooks = [(path, filename or os.path.basename(path))]
+
+        tasks = []
+        for workbook, name in workbooks:
+            try:
+                tasks.extend(
+                    (workbook, sheet, f"{name}/{sheet}" if sheet is not None else name)
+                    for sheet in sheet_names(workbook)
+                )
+            except Exception as e:
+                # One unreadable workbook in an archive should not sink the others
+                yield [], [f"{name}: Failed to process Excel file: {str(e)}"]
+        if not tasks:
+            return
+
+        if workers <= 1 or len(tasks) == 1:
+            for workbook, sheet, label in tasks:
+                yield from iter_sheet_chunks(workbook, sheet, label)
+            return
+
+        executor = _executor(workers)
+        futures = [
+            executor.submit(parse_sheet, workbook, sheet, label, os.path.join(directory, f"sheet-{index}.pickle"))
+            for index, (workbook, sheet, label) in enumerate(tasks)
+        ]
+        try:
+            for future in futures:
+                yield from iter_spooled_chunks(future.result())
+        except BrokenProcessPool:
+            # A parser process died (e.g. killed for memory); start a fresh pool next time
+            _discard_executor(workers, executor)
+            raise
+        finally:
+            # Stopped early: let running sheets finish before their directory is removed
+            for future in futures:
+                future.cancel()
+            wait(futures)
@@ -0,0 +1,179 @@
+import csv
+import os
+from importlib.util import find_spec
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from app.cofig import EXCEL_CHUNK_SIZE, EXCEL_ENGINE, EXCEL_STREAM_THRESHOLD_MB
+from app.utils.formats import (  # noqa: F401
+    ENGINE_MODULES, EXCEL_SUFFIXES, FORMAT_ENGINES, STREAMING_ENGINES, SUPPORTED_SUFFIXES
+)
+
+# Reads a sheet (or the whole file for single-table formats) as DataFrames of at most chunk_size rows
+FrameReader = Callable[[Union[str, BinaryIO], int, Optional[str]], Iterator[pd.DataFrame]]
+
+# pd.read_excel options matching the streaming readers: cell values as stored, only blank cells missing
+EXCEL_READ_OPTIONS = {'dtype': object, 'keep_default_na': False, 'na_values': ['']}
+
+
+def engine_available(engine: str) -> bool:
+    return find_spec(ENGINE_MODULES[engine]) is not None
+
+
+def select_engine(path: str) -> str:
+    """
+    Engine used for ``path``. EXCEL_ENGINE can pin the engine for Excel
+    formats; otherwise .xlsx/.xlsm files above EXCEL_STREAM_THRESHOLD_MB are
+    streamed in bounded memory and the fastest installed engine reads the rest.
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in FORMAT_ENGINES:
+        raise ValueError(f"Unsupported file type: {suffix or path}")
+
+    engines = FORMAT_ENGINES[suffix]
+    if suffix in EXCEL_SUFFIXES and EXCEL_ENGINE != 'auto':
+        if EXCEL_ENGINE not in engines:
+            raise ValueError(f"EXCEL_ENGINE={EXCEL_ENGINE} cannot read {suffix} files")
+        engines = (EXCEL_ENGINE,)
+    elif suffix in STREAMING_ENGINES and os.path.getsize(path) > EXCEL_STREAM_THRESHOLD_MB * 1024 * 1024:
+        engines = (STREAMING_ENGINES[suffix],)
+
+    for engine in engines:
+        if engine_available(engine):
+            return engine
+    raise ValueError(f"Reading {suffix} files requires one of: {', '.join(ENGINE_MODULES[e] for e in engines)}")
+
+
+def iter_frames(
+    source: Union[str, BinaryIO],
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    sheet: Optional[str] = None,
+    engine: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield a file's rows as DataFrames of at most ``chunk_size`` rows, using
+    ``engine`` or the one select_engine picks. File objects are read as .xlsx
+    with openpyxl. ``sheet`` names a worksheet (the first by default) and is
+    ignored for single-table formats.
+    """
+    if not isinstance(source, str):
+        return stream_openpyxl(source, chunk_size, sheet)
+    return READERS[engine or select_engine(source)](source, chunk_size, sheet)
+
+
+def sheet_names(path: str) -> List[Optional[str]]:
+    """Names of every sheet in a workbook in workbook order; [None] for CSV and Parquet"""
+    if not path.lower().endswith(EXCEL_SUFFIXES):
+        return [None]
+    engine = select_engine(path)
+    if engine == 'openpyxl':
+        workbook = load_workbook(path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    with pd.ExcelFile(path, engine=engine) as workbook:
+        return list(workbook.sheet_names)
+
+
+def _chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+
+
+def stream_openpyxl(source: Union[str, BinaryIO], chunk_size: int, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    .xlsx through openpyxl in read-only mode, which parses the sheet XML
+    lazily: slow per row, but memory stays bounded by the chunk size.
+    """
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+        width = len(columns)
+        while True:
+            block = list(islice(rows, chunk_size))
+            if not block:
+                break
+            # Read-only sheets may return ragged rows; pad/trim them to the header width
+            block = [tuple(row[:width]) + (None,) * (width - len(row)) for row in block]
+            yield pd.DataFrame.from_records(block, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _whole_sheet_reader(engine: str) -> FrameReader:
+    """
+    Engines that load a whole sheet at once (calamine, xlrd, odf); chunked
+    afterwards. Cell values are kept as openpyxl returns them: no re-inferring
+    "0712345678" as a number, and only blank cells are missing ("N/A" stays text).
+    """
+    def read(path: str, chunk_size: int, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        df = pd.read_excel(
+            path, sheet_name=sheet if sheet is not None else 0, engine=engine, **EXCEL_READ_OPTIONS
+        )
+        yield from _chunks(df, chunk_size)
+    return read
+
+
+def stream_csv_pyarrow(path: str, chunk_size: int, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    CSV through pyarrow's multithreaded streaming reader. Every column is
+    read as text, with only blank cells null, so phone numbers keep leading
+    zeros and type inference cannot fail part-way through the file.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        return
+
+    reader = pa_csv.open_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            null_values=[''],
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        yield from _chunks(batch.to_pandas(), chunk_size)
+
+
+def stream_csv_pandas(path: str, chunk_size: int, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """CSV through pandas' C parser; the fallback when pyarrow is not installed"""
+    with pd.read_csv(
+        path, dtype=str, keep_default_na=False, na_values=[''], chunksize=chunk_size, encoding='utf-8-sig'
+    ) as reader:
+        for chunk in reader:
+            yield chunk.reset_index(drop=True)
+
+
+def stream_parquet(path: str, chunk_size: int, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Parquet row groups read ``chunk_size`` rows at a time"""
+    from pyarrow import parquet as pa_parquet
+
+    parquet = pa_parquet.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+READERS: Dict[str, FrameReader] = {
+    'calamine': _whole_sheet_reader('calamine'),
+    'openpyxl': stream_openpyxl,
+    'xlrd': _whole_sheet_reader('xlrd'),
+    'odf': _whole_sheet_reader('odf'),
+    'pyarrow-csv': stream_csv_pyarrow,
+    'pandas-csv': stream_csv_pandas,
+    'pyarrow-parquet': stream_parquet,
+}
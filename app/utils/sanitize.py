@@ -1,4 +1,6 @@
-import re
+from app.utils.normalize import id_digits
+
 
 def sanitize_id_no(raw_input):
-    return ''.join(re.findall(r'\d', raw_input))
+    """Digits of a raw ID number; see app.utils.normalize for the batch and column forms"""
+    return id_digits(raw_input)
@@ -0,0 +1,41 @@
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional
+
+import orjson
+from fastapi import Response
+
+from app.schemas import CollectionOut
+
+# CollectionOut's fields in order; list queries select exactly these columns as tuples
+COLLECTION_FIELDS = tuple(CollectionOut.model_fields)
+
+
+def _wire_date(value):
+    # CollectionOut.date (Union[date, datetime]) validates dates into midnight datetimes; keep that wire format
+    return datetime.combine(value, time()) if type(value) is date else value
+
+
+def collection_dicts(rows: Iterable[tuple]) -> List[dict]:
+    """
+    CollectionOut-shaped dicts straight from column tuples. The values come
+    from typed columns, so validating them through pydantic again is skipped.
+    """
+    collections = [dict(zip(COLLECTION_FIELDS, row)) for row in rows]
+    for collection in collections:
+        collection["date"] = _wire_date(collection["date"])
+    return collections
+
+
+def jsonable_collection_dicts(rows: Iterable[tuple]) -> List[dict]:
+    """Like collection_dicts, with dates as ISO strings: the form the cache stores (model_dump(mode="json"))"""
+    collections = collection_dicts(rows)
+    for collection in collections:
+        for field in ("date", "last_updated_at"):
+            if collection[field] is not None:
+                collection[field] = collection[field].isoformat()
+    return collections
+
+
+def json_response(content, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Response serialized by orjson, bypassing response_model validation and the stdlib encoder"""
+    return Response(orjson.dumps(content), media_type="application/json", headers=headers)
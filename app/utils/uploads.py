@@ -0,0 +1,28 @@
+import os
+import tempfile
+from typing import Optional
+from fastapi import UploadFile
+from app.cofig import UPLOAD_SPOOL_DIR
+
+# Size of each read from the incoming request body
+SPOOL_READ_SIZE = 1024 * 1024
+
+
+async def spool_upload(file: UploadFile, directory: Optional[str] = UPLOAD_SPOOL_DIR) -> str:
+    """
+    Copy an uploaded file to a named temporary file in fixed-size pieces and
+    return its path. The caller is responsible for removing the file.
+    """
+    suffix = os.path.splitext(file.filename or "")[1]
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while True:
+                piece = await file.read(SPOOL_READ_SIZE)
+                if not piece:
+                    break
+                spool.write(piece)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for GET /collections/: p50/p99 latency and throughput under
+many concurrent clients, with the sync (threadpool) and async DB layers.
+
+Each mode starts its own uvicorn server on DATABASE_URL with DB_ASYNC set
+accordingly. Point DATABASE_URL at a seeded Postgres for meaningful numbers
+(a SQLite URL works too, with aiosqlite installed).
+
+Usage: python -m benchmarks.bench_api_latency [--clients 200] [--requests 20]
+       python -m benchmarks.bench_api_latency --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def _client(http: httpx.AsyncClient, path: str, count: int, latencies: list, failures: list):
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            response = await http.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError as e:
+            failures.append(str(e))
+
+
+async def run_load(base_url: str, path: str, clients: int, requests: int) -> dict:
+    """Run ``clients`` concurrent loops of ``requests`` GETs each and summarize latencies"""
+    latencies, failures = [], []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(_client(http, path, requests, latencies, failures) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "failures": len(failures),
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "req_per_sec": len(latencies) / elapsed,
+    }
+
+
+def _wait_for_server(base_url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy")
+
+
+def bench_mode(db_async: bool, args) -> dict:
+    """Start api_main under uvicorn with DB_ASYNC set and load it"""
+    env = dict(os.environ, DB_ASYNC="true" if db_async else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_for_server(base_url)
+        return asyncio.run(run_load(base_url, args.path, args.clients, args.requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _print(label: str, result: dict):
+    print(
+        f"{label:<18} {result['requests']:>7} ok {result['failures']:>5} failed  "
+        f"p50 {result['p50_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  {result['req_per_sec']:8.1f} req/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--path", default="/collections/?limit=100")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one per mode")
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests: GET {args.path}")
+    if args.url:
+        _print("server", asyncio.run(run_load(args.url, args.path, args.clients, args.requests)))
+        return
+
+    _print("sync (threadpool)", bench_mode(False, args))
+    _print("async (asyncio)", bench_mode(True, args))
+
+
+if __name__ == "__main__":
+    main()
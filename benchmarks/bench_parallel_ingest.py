@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel sheet parsing: a multi-sheet workbook parsed by
+iter_parallel_sheets with 1, 2, 4 ... up to --max-workers processes.
+
+Only parsing and classification are timed; nothing is written to a database.
+
+Usage: python -m benchmarks.bench_parallel_ingest [--sheets 16] [--rows 20000] [--max-workers 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from app.utils.parallel_excel import iter_parallel_sheets
+from benchmarks.bench_excel_processor import make_frame
+
+
+def write_workbook(path: str, sheets: int, rows: int):
+    """
+    Write ``sheets`` sheets of ``rows`` rows each. Uses pandas rather than a
+    write-only openpyxl workbook so sheets carry the <dimension> element Excel
+    writes; without it every read-only open rescans each sheet.
+    """
+    with pd.ExcelWriter(path) as writer:
+        for index in range(sheets):
+            make_frame(rows, seed=index).to_excel(writer, sheet_name=f"Region {index + 1}", index=False)
+
+
+def worker_counts(max_workers: int):
+    count = 1
+    while count < max_workers:
+        yield count
+        count *= 2
+    yield max_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sheets', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=20_000, help="Rows per sheet")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "regions.xlsx")
+        write_workbook(path, args.sheets, args.rows)
+        total = args.sheets * args.rows
+        print(f"{args.sheets} sheets x {args.rows:,} rows ({os.path.getsize(path) / 2**20:.1f} MiB)")
+
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            start = time.perf_counter()
+            records = sum(len(results) for results, _ in iter_parallel_sheets(path, workers=workers))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>3} workers: {elapsed:8.2f}s  {total / elapsed:12,.0f} rows/sec  "
+                f"speedup {baseline / elapsed:5.2f}x  ({records:,} records)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the upload readers: the same generated dataset written as .xlsx,
+.csv and .parquet, then read and classified by every installed engine.
+
+Each engine's time covers reading plus classify_frame, i.e. what an upload
+pays before the database insert.
+
+Usage: python -m benchmarks.bench_readers [--rows 100000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.utils.excel_processor import classify_frame
+from app.utils.readers import engine_available, iter_frames
+from benchmarks.bench_excel_processor import make_frame
+
+CHUNK_SIZE = 5000
+
+ENGINES = [
+    ('xlsx', 'openpyxl'),
+    ('xlsx', 'calamine'),
+    ('csv', 'pandas-csv'),
+    ('csv', 'pyarrow-csv'),
+    ('parquet', 'pyarrow-parquet'),
+]
+
+
+def write_files(directory: str, rows: int) -> dict:
+    df = make_frame(rows)
+    paths = {fmt: os.path.join(directory, f"collections.{fmt}") for fmt in ('xlsx', 'csv', 'parquet')}
+    df.to_excel(paths['xlsx'], index=False)
+    df.to_csv(paths['csv'], index=False)
+    if engine_available('pyarrow-parquet'):
+        # Machine exports are typed: bad IDs were never written as text
+        df['ID'] = df['ID'].where(df['ID'] != 'N/A', None).astype('Int64')
+        df.to_parquet(paths['parquet'], index=False)
+    return paths
+
+
+def run(path: str, engine: str):
+    start = time.perf_counter()
+    records = errors = 0
+    for frame in iter_frames(path, CHUNK_SIZE, engine=engine):
+        results, frame_errors = classify_frame(frame)
+        records += len(results)
+        errors += len(frame_errors)
+    return time.perf_counter() - start, records, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, args.rows)
+        print(f"Rows: {args.rows:,}")
+
+        baseline = None
+        for fmt, engine in ENGINES:
+            if not engine_available(engine):
+                print(f"{fmt:<8} {engine:<16} not installed")
+                continue
+            elapsed, records, errors = run(paths[fmt], engine)
+            baseline = baseline or elapsed
+            size = os.path.getsize(paths[fmt]) / 2**20
+            print(
+                f"{fmt:<8} {engine:<16} {elapsed:8.2f}s  {args.rows / elapsed:12,.0f} rows/sec  "
+                f"{baseline / elapsed:6.1f}x  ({size:.1f} MiB, {records:,} records, {errors:,} errors)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Payload build time per page of /collections/: query plus serialization of
+``--limit`` rows, for
+
+- orm + stdlib json: ORM objects, CollectionOut validation, jsonable_encoder
+  and json.dumps (the classic FastAPI path)
+- orm + pydantic: ORM objects validated and dumped by a pydantic TypeAdapter
+  (FastAPI's path when a response_model is set)
+- tuples + orjson: column tuples zipped into dicts and dumped by orjson (the
+  path the list endpoints use)
+
+Runs against an in-memory SQLite database seeded with --rows records.
+
+Usage: python -m benchmarks.bench_serialization [--rows 20000] [--limit 1000] [--repeat 50]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud import get_collection_rows, get_collections
+from app.database import create_schema
+from app.models.enhanced_collection import Collection
+from app.schemas import CollectionOut
+from app.utils.serialization import collection_dicts
+
+page_adapter = TypeAdapter(List[CollectionOut])
+
+
+def seed(db, rows: int):
+    now = datetime(2024, 1, 1)
+    db.execute(insert(Collection), [
+        {
+            "id": 1000 + i % 500, "name": f"Person {i}", "email": f"p{i}@example.com", "contact": f"07{i:08d}",
+            "date": (now + timedelta(days=i % 365)).date(), "read_only": i % 3 == 0,
+            "last_updated_by": "bench", "last_updated_at": now + timedelta(seconds=i),
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+
+
+def orm_stdlib_json(db, limit: int) -> bytes:
+    page = [CollectionOut.model_validate(c) for c in get_collections(db, limit=limit)]
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+def orm_pydantic(db, limit: int) -> bytes:
+    return page_adapter.dump_json(page_adapter.validate_python(get_collections(db, limit=limit), from_attributes=True))
+
+
+def tuples_orjson(db, limit: int) -> bytes:
+    return orjson.dumps(collection_dicts(get_collection_rows(db, limit=limit)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_schema(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.rows)
+
+    paths = [("orm + stdlib json", orm_stdlib_json), ("orm + pydantic", orm_pydantic), ("tuples + orjson", tuples_orjson)]
+    assert len({json.dumps(json.loads(build(db, args.limit)), sort_keys=True) for _, build in paths}) == 1
+
+    print(f"{args.limit:,} rows per page, best of {args.repeat}")
+    baseline = None
+    for label, build in paths:
+        timings = []
+        for _ in range(args.repeat):
+            db.expunge_all()  # no identity-map reuse between pages
+            start = time.perf_counter()
+            build(db, args.limit)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        baseline = baseline or best
+        print(f"{label:<18} {best * 1000:8.2f} ms per page  {baseline / best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
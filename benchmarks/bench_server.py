@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Throughput of the production server profile (serve.py) across worker
+counts and SQLAlchemy pool sizes.
+
+Every combination of --workers and --pool-sizes starts its own server on
+DATABASE_URL (max_overflow is set equal to the pool size) and is loaded by
+the same concurrent clients. Failures include pool checkout timeouts
+surfacing as 500s. Point DATABASE_URL at a seeded Postgres for meaningful
+numbers.
+
+Usage: python -m benchmarks.bench_server [--workers 1,2,4] [--pool-sizes 5,10,20] [--clients 200]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_api_latency import _print, _wait_for_server, run_load
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def bench_profile(workers: int, pool_size: int, args) -> dict:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        DB_POOL_SIZE=str(pool_size),
+        DB_MAX_OVERFLOW=str(pool_size),
+        API_HOST="127.0.0.1",
+        API_PORT=str(args.port),
+    )
+    server = subprocess.Popen([sys.executable, "serve.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_for_server(base_url, timeout=60)
+        # Warm every worker's pool before measuring
+        asyncio.run(run_load(base_url, args.path, workers * pool_size, 2))
+        return asyncio.run(run_load(base_url, args.path, args.clients, args.requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--pool-sizes", type=_int_list, default=[5, 10, 20])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--path", default="/collections/?limit=100")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests: GET {args.path} ({os.cpu_count()} CPUs)")
+    for workers in sorted(set(args.workers)):
+        for pool_size in args.pool_sizes:
+            _print(f"{workers}w pool {pool_size}+{pool_size}", bench_profile(workers, pool_size, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup cost of the API: cold ``import api_main`` in a fresh interpreter,
+then time to a healthy server and the latency of the first list request
+and the first upload (which now pays the pandas/reader import).
+
+Usage: DATABASE_URL=sqlite:////tmp/startup.db python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_api_latency import _wait_for_server
+from benchmarks.bench_excel_processor import make_frame
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import api_main
+heavy = [m for m in ("pandas", "numpy", "openpyxl", "pyarrow") if m in sys.modules]
+print(time.perf_counter() - start, ",".join(heavy) or "-")
+"""
+
+
+def cold_import() -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), output[1]
+
+
+def first_requests(port: int, workbook: str) -> dict:
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_for_server(base_url, timeout=60)
+        ready = time.perf_counter() - start
+
+        timings = {"ready_s": ready}
+        with httpx.Client(base_url=base_url, timeout=120) as http:
+            start = time.perf_counter()
+            http.get("/collections/?limit=100").raise_for_status()
+            timings["first_list_ms"] = (time.perf_counter() - start) * 1000
+
+            with open(workbook, "rb") as f:
+                start = time.perf_counter()
+                http.post(
+                    "/upload/", headers={"X-User": "bench"},
+                    files={"file": (f"bench-{os.getpid()}-{port}.xlsx", f)}
+                ).raise_for_status()
+            timings["first_upload_ms"] = (time.perf_counter() - start) * 1000
+        return timings
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    imports = [cold_import() for _ in range(args.runs)]
+    print(f"cold import api_main: median {statistics.median(t for t, _ in imports) * 1000:7.1f} ms  "
+          f"(heavy modules loaded: {imports[0][1]})")
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = []
+        for run in range(args.runs):
+            # A new workbook each run so the duplicate-file check does not skip parsing
+            workbook = os.path.join(directory, f"upload-{run}.xlsx")
+            make_frame(200, seed=run).to_excel(workbook, index=False)
+            runs.append(first_requests(args.port, workbook))
+
+    for key, label in (("ready_s", "spawn to healthy"), ("first_list_ms", "first GET /collections/"),
+                       ("first_upload_ms", "first POST /upload/")):
+        value = statistics.median(r[key] for r in runs)
+        print(f"{label:<24} median {value * 1000 if key == 'ready_s' else value:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
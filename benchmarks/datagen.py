@@ -0,0 +1,170 @@
+"""
+Seeded synthetic data for the benchmarks.
+
+Everything here is a pure function of (rows, mix, seed), so two runs of the
+suite on different commits measure exactly the same input. Sheets use the
+upload columns (ID, Name, Contact, Date, Collected) and are built
+column-wise with numpy, so a million rows take a few seconds.
+"""
+
+import os
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.schemas import CollectionCreate
+from app.utils.excel_processor import classify_frame
+
+# Named sizes accepted wherever a row count is
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+DEFAULT_SEED = 42
+
+# Dates are spread over the two years before this day rather than before
+# today, so output does not drift from one day to the next
+ANCHOR_DATE = date(2024, 1, 1)
+
+
+def parse_size(value: str) -> int:
+    """'100k' -> 100000; plain integers pass through"""
+    return SIZES.get(value.lower()) or int(value.replace("_", ""))
+
+
+@dataclass(frozen=True)
+class RowMix:
+    """
+    Share of generated rows of each kind; whatever is left over are ID-only
+    rows, which the importer skips. ``missing_date`` applies independently
+    to every row.
+    """
+    read_only: float = 0.6      # ID, Name and Contact filled
+    editable: float = 0.3       # ID plus one of Name/Contact
+    invalid_id: float = 0.02    # ID cell that is not an integer
+    missing_date: float = 0.1
+
+    def __post_init__(self):
+        if any(share < 0 for share in asdict(self).values()):
+            raise ValueError("Row mix shares must not be negative")
+        if self.read_only + self.editable + self.invalid_id > 1:
+            raise ValueError("read_only + editable + invalid_id must not exceed 1")
+
+    @classmethod
+    def parse(cls, spec: str) -> "RowMix":
+        """Build a mix from 'read_only=0.5,editable=0.4'; unnamed kinds keep their defaults"""
+        names = {f.name for f in fields(cls)}
+        values = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            name, _, share = part.partition("=")
+            if name not in names:
+                raise ValueError(f"Unknown row kind: {name}")
+            values[name] = float(share)
+        return cls(**values)
+
+
+def generate_frame(rows: int, mix: RowMix = RowMix(), seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """An upload sheet of ``rows`` rows in the proportions of ``mix``"""
+    rng = np.random.default_rng(seed)
+    kind = rng.random(rows)
+    read_only = kind < mix.read_only
+    editable = (kind >= mix.read_only) & (kind < mix.read_only + mix.editable)
+    invalid = (kind >= mix.read_only + mix.editable) & (kind < mix.read_only + mix.editable + mix.invalid_id)
+
+    ids = rng.integers(1000, 999_999, size=rows).astype(object)
+    ids[invalid] = rng.choice(np.array(["N/A", "12AB", "1.5", "-"], dtype=object), size=int(invalid.sum()))
+
+    # Editable rows keep either the name or the contact, never both
+    keep_name = read_only | (editable & (rng.random(rows) < 0.5)) | invalid
+    keep_contact = read_only | (editable & ~keep_name) | invalid
+    numbers = pd.Series(rng.integers(10**7, 10**8, size=rows)).astype(str)
+    names = np.where(keep_name, "Person " + pd.Series(np.arange(rows)).astype(str), None)
+    contacts = np.where(keep_contact, "07" + numbers, None)
+
+    offsets = rng.integers(0, 730, size=rows)
+    dates = (np.datetime64(ANCHOR_DATE) - offsets.astype("timedelta64[D]")).astype(str).astype(object)
+    dates[rng.random(rows) < mix.missing_date] = None
+
+    collected = np.where(rng.random(rows) < 0.5, "Yes", "No")
+    return pd.DataFrame({"ID": ids, "Name": names, "Contact": contacts, "Date": dates, "Collected": collected})
+
+
+def write_sheet(frame: pd.DataFrame, path: str) -> str:
+    """
+    Write ``frame`` as .xlsx (through a write-only workbook, which keeps
+    memory flat at a million rows) or .csv, depending on the suffix
+    """
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+        return path
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Collections")
+    sheet.append(list(frame.columns))
+    for row in frame.itertuples(index=False):
+        sheet.append(list(row))
+    workbook.save(path)
+    return path
+
+
+def sheet_path(directory: str, rows: int, mix: RowMix = RowMix(), seed: int = DEFAULT_SEED, suffix: str = "xlsx") -> str:
+    """
+    Path of the generated sheet for these parameters, writing it first if
+    ``directory`` does not have it yet (large workbooks are slow to write,
+    so a persistent directory saves time across runs)
+    """
+    mix_tag = "-".join(f"{share:g}" for share in asdict(mix).values())
+    path = os.path.join(directory, f"collections-{rows}-{mix_tag}-{seed}.{suffix}")
+    if not os.path.exists(path):
+        partial = f"{path}.partial.{suffix}"
+        write_sheet(generate_frame(rows, mix, seed), partial)
+        os.replace(partial, path)
+    return path
+
+
+def generate_collections(
+    rows: int, mix: RowMix = RowMix(), seed: int = DEFAULT_SEED
+) -> List[Tuple[CollectionCreate, bool]]:
+    """(data, read_only) pairs as the importer would produce them from the generated sheet"""
+    results, _ = classify_frame(generate_frame(rows, mix, seed))
+    return results
+
+
+def generate_raw_ids(rows: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """ID numbers as typed by hand: digits mixed with letters, spaces and separators"""
+    rng = np.random.default_rng(seed)
+    digits = rng.integers(10**5, 10**9, size=rows).astype(str)
+    templates = ("{}", " {} ", "ID{}", "{}-A", "AB{}C", "{}/{}", "00{}")
+    styles = rng.integers(0, len(templates), size=rows)
+    return [templates[style].format(d, d[:2]) for style, d in zip(styles, digits)]
+
+
+def generate_legacy_rows(rows: int, seed: int = DEFAULT_SEED) -> Dict[str, list]:
+    """
+    Parameter tuples for the legacy insert_*_many functions, keyed by table:
+    collections (raw_id, collected_by, phone_no, email_address), users
+    (raw_id, name, dob, expires_in, phone_no, image_data) and production
+    (raw_id, expires_on, user_image, produced_on, dispatched_on)
+    """
+    rng = np.random.default_rng(seed)
+    raw_ids = generate_raw_ids(rows, seed)
+    phones = [f"07{n}" for n in rng.integers(10**7, 10**8, size=rows)]
+    produced_days = rng.integers(7, 31, size=rows)
+    dispatch_days = rng.integers(1, 6, size=rows)
+    image = bytes(rng.integers(0, 256, size=256, dtype=np.uint8))
+    anchor = datetime.combine(ANCHOR_DATE, datetime.min.time())
+
+    collections, users, production = [], [], []
+    for i in range(rows):
+        produced_on = anchor - timedelta(days=int(produced_days[i]))
+        dispatched_on = produced_on + timedelta(days=int(dispatch_days[i]))
+        collections.append((raw_ids[i], f"Collector {i % 50}", phones[i], f"user{i}@example.com"))
+        users.append((raw_ids[i], f"Person {i}", "1990-01-01", "2030-01-01", phones[i], image))
+        production.append((
+            raw_ids[i], "2030-01-01", image,
+            produced_on.strftime("%Y-%m-%d %H:%M:%S"), dispatched_on.strftime("%Y-%m-%d %H:%M:%S")
+        ))
+    return {"collections": collections, "users": users, "production": production}
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+End-to-end load harness for the HTTP API.
+
+Concurrent asyncio clients issue a weighted mix of scenarios:
+
+  list     GET /collections/?limit=100, following X-Next-Cursor page by page
+  history  GET /collections/history/{ID} for a seeded ID
+  update   PUT /collections/{record_id} on an editable record, with X-User
+  upload   POST /upload/ of a fresh generated CSV (--upload-rows rows)
+
+or replay a recorded JSONL request log (--replay). Per scenario it reports
+throughput, latency percentiles, error rate and status codes; DB usage
+(checked-out pool connections sampled from /metrics, and SQL statements per
+request by route) is reported alongside.
+
+Targets:
+  --target inprocess  api_main.app through httpx's ASGI transport (default)
+  --target launch     a uvicorn subprocess on --port
+  --url URL           an already running server (nothing is seeded unless --seed-rows is given)
+
+The first two run on a temporary SQLite database unless DATABASE_URL is
+set, and are seeded through the API with --seed-rows generated rows.
+
+Replay logs hold one request per line:
+  {"offset": 0.25, "scenario": "list", "method": "GET", "path": "/collections/?limit=100",
+   "headers": {"X-User": "ops"}, "json": null, "upload": null}
+"offset" (seconds from the start) is honoured when --speed is given;
+"upload" is {"filename": "day.csv", "rows": 500} and is regenerated with
+unique content. --record writes the requests of a run in this format.
+
+Usage: python -m benchmarks.load [--mix list=6,history=2,update=1,upload=1] [--clients 50] [--duration 30]
+       python -m benchmarks.load --target launch --replay traffic.jsonl --speed 2 --output run.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks.bench_api_latency import _wait_for_server
+
+DEFAULT_MIX = "list=6,history=2,update=1,upload=1"
+
+# Route template each scenario hits, for the per-route SQL statement counts in /metrics
+SCENARIO_ROUTES = {
+    "list": "/collections/",
+    "history": "/collections/history/{ID}",
+    "update": "/collections/{record_id}",
+    "upload": "/upload/",
+}
+
+LOAD_USER = "load-test"
+
+METRIC_LINE = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+@dataclass
+class Request:
+    scenario: str
+    method: str
+    path: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    json: Optional[dict] = None
+    upload: Optional[dict] = None  # {"filename": ..., "rows": ...}
+    offset: float = 0.0
+
+    def to_record(self) -> dict:
+        return {
+            "offset": round(self.offset, 4), "scenario": self.scenario, "method": self.method, "path": self.path,
+            "headers": self.headers, "json": self.json, "upload": self.upload,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Request":
+        method = record.get("method", "GET").upper()
+        path = record["path"]
+        return cls(
+            scenario=record.get("scenario") or f"{method} {path.split('?')[0]}",
+            method=method, path=path, headers=record.get("headers") or {},
+            json=record.get("json"), upload=record.get("upload"), offset=float(record.get("offset", 0)),
+        )
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def add(self, scenario: str, latency: float, status: str):
+        self.latencies[scenario].append(latency)
+        self.statuses[scenario][status] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        summary = {}
+        for scenario, latencies in sorted(self.latencies.items()):
+            statuses = self.statuses[scenario]
+            errors = sum(n for status, n in statuses.items() if not status.startswith(("2", "3")))
+            ordered = sorted(latencies)
+            quantiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+            summary[scenario] = {
+                "requests": len(ordered),
+                "errors": errors,
+                "error_rate": round(errors / len(ordered), 4),
+                "req_per_sec": round(len(ordered) / elapsed, 2),
+                "p50_ms": round(quantiles[49] * 1000, 2),
+                "p90_ms": round(quantiles[89] * 1000, 2),
+                "p99_ms": round(quantiles[98] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "statuses": dict(statuses),
+            }
+        return summary
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIO_ROUTES:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIO_ROUTES)}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("The mix needs at least one scenario with a positive weight")
+    return mix
+
+
+def parse_metrics(text: str) -> Dict[tuple, float]:
+    """Prometheus text exposition -> {(name, ((label, value), ...)): value}"""
+    samples = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match and not line.startswith("#"):
+            name, labels, value = match.groups()
+            samples[(name, tuple(sorted(LABEL.findall(labels or ""))))] = float(value)
+    return samples
+
+
+def upload_csv(rows: int, serial: int) -> bytes:
+    """A CSV upload no earlier upload has matched, so the duplicate-file check never short-cuts it"""
+    rng = random.Random(serial)
+    lines = ["ID,Name,Contact,Date"]
+    for i in range(rows):
+        contact = f"07{rng.randrange(10**7, 10**8)}" if rng.random() < 0.7 else ""
+        lines.append(f"{rng.randrange(1000, 999_999)},Load {serial}-{i},{contact},2024-0{rng.randrange(1, 10)}-1{rng.randrange(10)}")
+    return "\n".join(lines).encode()
+
+
+class Workload:
+    """Builds scenario requests from what the seeded database contains"""
+
+    def __init__(self, mix: Dict[str, float], ids: List[int], editable: List[int], upload_rows: int, seed: int):
+        self.scenarios, self.weights = list(mix), list(mix.values())
+        self.ids = ids
+        self.editable = editable
+        self.upload_rows = upload_rows
+        self.rng = random.Random(seed)
+
+    def next(self, cursor: Optional[str]) -> Request:
+        scenario = self.rng.choices(self.scenarios, self.weights)[0]
+        if scenario == "history" and self.ids:
+            return Request(scenario, "GET", f"/collections/history/{self.rng.choice(self.ids)}?limit=100")
+        if scenario == "update" and self.editable:
+            return Request(
+                scenario, "PUT", f"/collections/{self.rng.choice(self.editable)}", {"X-User": LOAD_USER},
+                json={"email": f"load{self.rng.randrange(10**6)}@example.com", "last_updated_by": LOAD_USER}
+            )
+        if scenario == "upload":
+            return Request(scenario, "POST", "/upload/", {"X-User": LOAD_USER},
+                           upload={"filename": "load.csv", "rows": self.upload_rows})
+        path = "/collections/?limit=100" + (f"&cursor={cursor}" if cursor else "")
+        return Request("list", "GET", path)
+
+
+async def send(http: httpx.AsyncClient, request: Request, uploads: itertools.count) -> httpx.Response:
+    files = None
+    if request.upload:
+        content = upload_csv(int(request.upload.get("rows", 100)), next(uploads))
+        files = {"file": (request.upload.get("filename", "load.csv"), content, "text/csv")}
+    return await http.request(request.method, request.path, headers=request.headers, json=request.json, files=files)
+
+
+async def timed(http, request: Request, results: Results, uploads, recorded: Optional[list], started: float):
+    if recorded is not None:
+        recorded.append(Request(**{**request.__dict__, "offset": time.perf_counter() - started}))
+    start = time.perf_counter()
+    try:
+        response = await send(http, request, uploads)
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        response, status = None, type(e).__name__
+    results.add(request.scenario, time.perf_counter() - start, status)
+    return response
+
+
+async def run_mix(http, workload: Workload, clients: int, duration: float, results: Results, recorded) -> float:
+    uploads = itertools.count(int(time.time()))
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def client():
+        cursor = None
+        while time.perf_counter() < deadline:
+            request = workload.next(cursor)
+            response = await timed(http, request, results, uploads, recorded, started)
+            if request.scenario == "list":
+                cursor = response.headers.get("X-Next-Cursor") if response is not None else None
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - started
+
+
+async def run_replay(http, requests: List[Request], clients: int, speed: Optional[float], results: Results, recorded) -> float:
+    uploads = itertools.count(int(time.time()))
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    started = time.perf_counter()
+
+    async def client():
+        while not queue.empty():
+            request = queue.get_nowait()
+            if speed:
+                await asyncio.sleep(max(0.0, started + request.offset / speed - time.perf_counter()))
+            await timed(http, request, results, uploads, recorded, started)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - started
+
+
+async def sample_pool(http: httpx.AsyncClient, samples: List[float], interval: float = 0.25):
+    """Checked-out DB connections over time, from the db_pool_connections gauge"""
+    while True:
+        try:
+            metrics = parse_metrics((await http.get("/metrics")).text)
+            samples.append(metrics.get(("db_pool_connections", (("state", "checked_out"),)), 0.0))
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+def queries_per_request(before: Dict[tuple, float], after: Dict[tuple, float]) -> Dict[str, float]:
+    """Mean SQL statements per request by route template over the run"""
+    per_route = {}
+    for (name, labels), total in after.items():
+        if name != "db_queries_per_request_sum":
+            continue
+        count = after.get(("db_queries_per_request_count", labels), 0) - before.get(("db_queries_per_request_count", labels), 0)
+        if count > 0:
+            per_route[dict(labels)["route"]] = round((total - before.get((name, labels), 0)) / count, 2)
+    return per_route
+
+
+async def seed(http: httpx.AsyncClient, rows: int):
+    if rows:
+        response = await http.post("/upload/", headers={"X-User": LOAD_USER},
+                                   files={"file": ("seed.csv", upload_csv(rows, 0), "text/csv")}, timeout=600)
+        response.raise_for_status()
+    page = (await http.get("/collections/?limit=1000")).json()
+    editable = (await http.get("/collections/editable/?limit=1000")).json()
+    return sorted({r["id"] for r in page}), [r["record_id"] for r in editable]
+
+
+@asynccontextmanager
+async def target_client(args, clients: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as http:
+            yield http
+        return
+
+    with tempfile.TemporaryDirectory(prefix="load-") as directory:
+        env = {"DATABASE_URL": os.environ.get("DATABASE_URL") or f"sqlite:///{os.path.join(directory, 'load.db')}"}
+        if args.target == "inprocess":
+            os.environ.update(env)
+            import api_main
+
+            async with api_main.app.router.lifespan_context(api_main.app):
+                transport = httpx.ASGITransport(app=api_main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=120) as http:
+                    yield http
+            return
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api_main:app", "--port", str(args.port), "--log-level", "warning"],
+            env={**os.environ, **env}
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            await asyncio.to_thread(_wait_for_server, base_url, 60)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+                yield http
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def run(args) -> dict:
+    results, recorded, pool_samples = Results(), [] if args.record else None, []
+    async with target_client(args, args.clients) as http:
+        seed_rows = args.seed_rows if args.seed_rows is not None else (0 if args.url else 5000)
+        ids, editable = await seed(http, seed_rows)
+        before = parse_metrics((await http.get("/metrics")).text)
+        sampler = asyncio.create_task(sample_pool(http, pool_samples))
+        try:
+            if args.replay:
+                with open(args.replay) as f:
+                    requests = [Request.from_record(json.loads(line)) for line in f if line.strip()]
+                elapsed = await run_replay(http, requests, args.clients, args.speed, results, recorded)
+            else:
+                workload = Workload(args.mix, ids, editable, args.upload_rows, args.seed)
+                elapsed = await run_mix(http, workload, args.clients, args.duration, results, recorded)
+        finally:
+            sampler.cancel()
+        after = parse_metrics((await http.get("/metrics")).text)
+
+    if args.record:
+        with open(args.record, "w") as f:
+            for request in sorted(recorded, key=lambda r: r.offset):
+                f.write(json.dumps(request.to_record()) + "\n")
+
+    scenarios = results.summary(elapsed)
+    per_route = queries_per_request(before, after)
+    for name, summary in scenarios.items():
+        if SCENARIO_ROUTES.get(name) in per_route:
+            summary["queries_per_request"] = per_route[SCENARIO_ROUTES[name]]
+    total = sum(s["requests"] for s in scenarios.values())
+    return {
+        "target": args.url or args.target,
+        "clients": args.clients,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": total,
+        "req_per_sec": round(total / elapsed, 2) if elapsed else None,
+        "scenarios": scenarios,
+        "db": {
+            "pool_checked_out_max": max(pool_samples, default=None),
+            "pool_checked_out_mean": round(statistics.fmean(pool_samples), 2) if pool_samples else None,
+            "queries_per_request": per_route,
+        },
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"{report['requests']:,} requests in {report['elapsed_seconds']:.1f}s "
+        f"({report['req_per_sec']:.1f} req/s, {report['clients']} clients, {report['target']})", file=sys.stderr
+    )
+    for name, s in report["scenarios"].items():
+        print(
+            f"{name:<28} {s['requests']:>7} {s['req_per_sec']:8.1f}/s  p50 {s['p50_ms']:8.1f}  p90 {s['p90_ms']:8.1f}  "
+            f"p99 {s['p99_ms']:8.1f} ms  errors {s['error_rate']:6.1%}  sql/req {s.get('queries_per_request', '-')}",
+            file=sys.stderr
+        )
+    db = report["db"]
+    print(f"pool connections checked out: max {db['pool_checked_out_max']}, mean {db['pool_checked_out_mean']}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("inprocess", "launch"), default="inprocess")
+    parser.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run the mix for")
+    parser.add_argument("--seed-rows", type=int, help="Rows uploaded before the run (default 5000; 0 with --url)")
+    parser.add_argument("--upload-rows", type=int, default=200, help="Rows per upload scenario request")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the scenario sequence")
+    parser.add_argument("--replay", help="JSONL request log to replay instead of the mix")
+    parser.add_argument("--speed", type=float, help="Replay at recorded offsets, sped up by this factor (default: as fast as possible)")
+    parser.add_argument("--record", help="Write the requests issued to this JSONL file")
+    parser.add_argument("--output", help="Write the report JSON here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark suite: times the hot paths on seeded synthetic data
+(benchmarks.datagen) at several sizes and writes the results as JSON, so
+runs on different commits can be compared.
+
+Cases:
+  excel.process_excel_data     read + classify a generated .xlsx upload
+  sanitize.sanitize_id_no      clean hand-typed ID numbers one at a time
+  normalize.id_digits_column   the same as one column operation
+  crud.bulk_create             bulk_create_collections into empty tables
+  crud.list                    page through every record with get_collection_rows
+  crud.update                  update_collection on up to 1000 editable records
+  crud.search                  search_collections for 200 names and contacts (index built untimed)
+  legacy.insert_*_many         executemany inserts into the MySQL tables
+
+crud cases run against --database-url (a temporary SQLite file by default).
+Its collection tables are DROPPED and recreated, so only point it at a
+scratch database. Legacy cases use DB_CONFIG and are reported as skipped
+when MySQL is unreachable; they add rows to its tables.
+
+Usage: python -m benchmarks.suite [--sizes 1k 100k 1m] [--cases crud excel] [--output run.json]
+       python -m benchmarks.suite --compare baseline.json --output run.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import (
+    bulk_create_collections, get_collection_rows, next_page_cursor, search_collections, update_collection
+)
+from app.database import Base, create_schema
+from app.db import pool
+from app.models.collection import insert_collections_many
+from app.models.enhanced_collection import Collection
+from app.models.production import insert_productions_many
+from app.models.users import insert_users_many
+from app.search import discard_index
+from app.schemas import CollectionUpdate
+from app.utils.excel_processor import process_excel_data
+from app.utils.normalize import id_digits_column
+from app.utils.sanitize import sanitize_id_no
+from benchmarks.datagen import (
+    DEFAULT_SEED, RowMix, generate_collections, generate_legacy_rows, generate_raw_ids, parse_size, sheet_path
+)
+
+RESULTS_VERSION = 1
+
+LIST_PAGE_SIZE = 1000
+MAX_UPDATES = 1000
+SEARCHES = 200
+
+
+class Skip(Exception):
+    """A case cannot run in this environment"""
+
+
+@dataclass
+class Context:
+    mix: RowMix
+    seed: int
+    data_dir: str
+    session_factory: sessionmaker
+
+
+@dataclass
+class Case:
+    name: str
+    prepare: Callable[[Context, int], Any]             # untimed, once per size
+    run: Callable[[Any], int]                          # timed; returns the number of items handled
+    before_each: Optional[Callable[[Any], None]] = None  # untimed, before every repeat
+    finish: Optional[Callable[[Any], None]] = None       # untimed, after the last repeat
+
+
+def _reset_tables(ctx: Context):
+    engine = ctx.session_factory.kw["bind"]
+    Base.metadata.drop_all(engine)
+    create_schema(engine)
+    discard_index(engine)
+
+
+def _seeded_session(ctx: Context, rows: int):
+    _reset_tables(ctx)
+    db = ctx.session_factory()
+    bulk_create_collections(db, generate_collections(rows, ctx.mix, ctx.seed), user="bench")
+    return db
+
+
+# excel / sanitize
+
+def prepare_excel(ctx: Context, rows: int):
+    with open(sheet_path(ctx.data_dir, rows, ctx.mix, ctx.seed), "rb") as f:
+        return f.read(), rows
+
+
+def run_excel(state) -> int:
+    content, rows = state
+    process_excel_data(content)
+    return rows
+
+
+def run_sanitize(raw_ids: List[str]) -> int:
+    for raw_id in raw_ids:
+        sanitize_id_no(raw_id)
+    return len(raw_ids)
+
+
+def run_id_digits_column(raw_ids: pd.Series) -> int:
+    id_digits_column(raw_ids)
+    return len(raw_ids)
+
+
+# crud
+
+def prepare_bulk_create(ctx: Context, rows: int):
+    return ctx, generate_collections(rows, ctx.mix, ctx.seed)
+
+
+def reset_bulk_create(state):
+    _reset_tables(state[0])
+
+
+def run_bulk_create(state) -> int:
+    ctx, collections = state
+    with ctx.session_factory() as db:
+        added, _ = bulk_create_collections(db, collections, user="bench")
+    return added
+
+
+def prepare_list(ctx: Context, rows: int):
+    return _seeded_session(ctx, rows)
+
+
+def run_list(db) -> int:
+    count, cursor = 0, None
+    while True:
+        page = get_collection_rows(db, limit=LIST_PAGE_SIZE, cursor=cursor)
+        count += len(page)
+        cursor = next_page_cursor(page, LIST_PAGE_SIZE)
+        if cursor is None:
+            return count
+
+
+def close_session(db):
+    db.close()
+
+
+def close_update_session(state):
+    state[0].close()
+
+
+def prepare_update(ctx: Context, rows: int):
+    db = _seeded_session(ctx, rows)
+    record_ids = db.execute(
+        select(Collection.record_id).where(Collection.read_only.is_(False))
+        .order_by(Collection.record_id).limit(MAX_UPDATES)
+    ).scalars().all()
+    return db, record_ids
+
+
+def run_update(state) -> int:
+    db, record_ids = state
+    for n, record_id in enumerate(record_ids):
+        update_collection(db, record_id, CollectionUpdate(email=f"u{n}@example.com", last_updated_by="bench"))
+    return len(record_ids)
+
+
+def prepare_search(ctx: Context, rows: int):
+    db = _seeded_session(ctx, rows)
+    people = db.execute(
+        select(Collection.name, Collection.contact).order_by(Collection.record_id).limit(SEARCHES)
+    ).all()
+    # Half prefixes, half misspellings (two letters swapped), of names or contacts
+    queries = []
+    for n, (name, contact) in enumerate(people):
+        text = name or contact
+        queries.append(text[:len(text) // 2 + 1] if n % 2 else text[:2] + text[3] + text[2] + text[4:])
+    search_collections(db, queries[0])  # builds the in-process index on SQLite
+    return db, queries
+
+
+def run_search(state) -> int:
+    db, queries = state
+    for q in queries:
+        search_collections(db, q)
+    return len(queries)
+
+
+# legacy MySQL models
+
+def prepare_legacy(table: str):
+    def prepare(ctx: Context, rows: int):
+        try:
+            with pool.connection():
+                pass
+        except Exception as e:
+            raise Skip(f"MySQL unavailable: {e}")
+        return generate_legacy_rows(rows, ctx.seed)[table]
+    return prepare
+
+
+def run_legacy(insert_many: Callable[[list], int]):
+    def run(params: list) -> int:
+        return insert_many(params)
+    return run
+
+
+CASES = [
+    Case("excel.process_excel_data", prepare_excel, run_excel),
+    Case("sanitize.sanitize_id_no", lambda ctx, rows: generate_raw_ids(rows, ctx.seed), run_sanitize),
+    Case("normalize.id_digits_column", lambda ctx, rows: pd.Series(generate_raw_ids(rows, ctx.seed)), run_id_digits_column),
+    Case("crud.bulk_create", prepare_bulk_create, run_bulk_create, before_each=reset_bulk_create),
+    Case("crud.list", prepare_list, run_list, finish=close_session),
+    Case("crud.update", prepare_update, run_update, finish=close_update_session),
+    Case("crud.search", prepare_search, run_search, finish=close_update_session),
+    Case("legacy.insert_collections_many", prepare_legacy("collections"), run_legacy(insert_collections_many)),
+    Case("legacy.insert_users_many", prepare_legacy("users"), run_legacy(insert_users_many)),
+    Case("legacy.insert_productions_many", prepare_legacy("production"), run_legacy(insert_productions_many)),
+]
+
+
+def time_case(case: Case, ctx: Context, rows: int, repeat: int) -> Dict[str, Any]:
+    result = {"case": case.name, "rows": rows}
+    try:
+        state = case.prepare(ctx, rows)
+    except Skip as e:
+        return {**result, "skipped": str(e)}
+
+    timings, items = [], 0
+    try:
+        for _ in range(repeat):
+            if case.before_each:
+                case.before_each(state)
+            gc.collect()
+            start = time.perf_counter()
+            items = case.run(state)
+            timings.append(time.perf_counter() - start)
+    finally:
+        if case.finish:
+            case.finish(state)
+
+    best = min(timings)
+    return {
+        **result,
+        "items": items,
+        "repeat": repeat,
+        "best_seconds": round(best, 6),
+        "median_seconds": round(statistics.median(timings), 6),
+        "items_per_second": round(items / best, 1) if best else None,
+    }
+
+
+def run_metadata(args, mix: RowMix, database_url: str) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": database_url.split("://", 1)[0],
+        "seed": args.seed,
+        "mix": asdict(mix),
+    }
+
+
+def compare(previous: dict, current: dict):
+    """Print best-time ratios (previous / current; above 1 is faster) for the cases both runs have"""
+    before = {(r["case"], r["rows"]): r for r in previous["results"] if "best_seconds" in r}
+    print(f"\nvs. {previous['meta'].get('commit') or 'baseline'} ({previous['meta'].get('started_at')})", file=sys.stderr)
+    for r in current["results"]:
+        old = before.get((r["case"], r["rows"]))
+        if old and "best_seconds" in r:
+            print(f"{r['case']:<34} {r['rows']:>10,} {old['best_seconds'] / r['best_seconds']:8.2f}x", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help="Row counts: 1k, 10k, 100k, 1m or integers")
+    parser.add_argument("--cases", nargs="+", help="Run only cases whose name starts with one of these")
+    parser.add_argument("--mix", type=RowMix.parse, default=RowMix(), help="e.g. read_only=0.5,editable=0.3,invalid_id=0.1,missing_date=0.2")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database-url", help="Scratch database for the crud cases (default: temporary SQLite file)")
+    parser.add_argument("--data-dir", help="Keep generated workbooks here between runs (default: temporary directory)")
+    parser.add_argument("--output", help="Write the results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    cases = [c for c in CASES if not args.cases or c.name.startswith(tuple(args.cases))]
+    sizes = [parse_size(s) for s in args.sizes]
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+        data_dir = args.data_dir or scratch
+        os.makedirs(data_dir, exist_ok=True)
+        database_url = args.database_url or f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        engine = create_engine(database_url)
+        ctx = Context(args.mix, args.seed, data_dir, sessionmaker(bind=engine))
+
+        report = {"version": RESULTS_VERSION, "meta": run_metadata(args, args.mix, database_url), "results": []}
+        try:
+            for case in cases:
+                for rows in sizes:
+                    result = time_case(case, ctx, rows, args.repeat)
+                    report["results"].append(result)
+                    if "skipped" in result:
+                        print(f"{case.name:<34} {rows:>10,}  skipped: {result['skipped']}", file=sys.stderr)
+                    else:
+                        print(
+                            f"{case.name:<34} {rows:>10,} {result['best_seconds']:10.3f}s "
+                            f"{result['items_per_second']:14,.0f} items/s", file=sys.stderr
+                        )
+        finally:
+            engine.dispose()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
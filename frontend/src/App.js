@@ -11,6 +11,7 @@ axios.defaults.headers.common['X-User'] = 'admin_user'; // Replace with actual u
 function App() {
   const [activeTab, setActiveTab] = useState('upload');
   const [collections, setCollections] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -18,8 +19,13 @@ function App() {
     setLoading(true);
     setError(null);
     try {
-      const response = await axios.get('/collections/');
+      // Totals come from the server-side summary, not from aggregating pages here
+      const [response, statsResponse] = await Promise.all([
+        axios.get('/collections/'),
+        axios.get('/collections/stats')
+      ]);
       setCollections(response.data);
+      setStats(statsResponse.data);
     } catch (err) {
       setError('Failed to fetch collections');
       console.error('Error fetching collections:', err);
@@ -78,6 +84,7 @@ function App() {
         {activeTab === 'view' && (
           <TableView 
             collections={collections} 
+            stats={stats}
             loading={loading} 
             onRefresh={fetchCollections}
           />
@@ -1,14 +1,36 @@
-import React, { useState, useMemo } from 'react';
+import React, { useState, useMemo, useEffect } from 'react';
+import axios from 'axios';
 import './TableView.css';
 
-const TableView = ({ collections, loading, onRefresh }) => {
+const TableView = ({ collections, stats, loading, onRefresh }) => {
   const [filterID, setFilterID] = useState('');
   const [filterReadOnly, setFilterReadOnly] = useState('all');
   const [sortBy, setSortBy] = useState('record_id');
   const [sortOrder, setSortOrder] = useState('desc');
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
+
+  // Name/contact search runs on the server; wait for typing to pause
+  useEffect(() => {
+    const q = searchQuery.trim();
+    if (!q) {
+      setSearchResults(null);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      axios.get('/collections/search', { params: { q, limit: 100 } })
+        .then(response => { if (!cancelled) setSearchResults(response.data); })
+        .catch(() => { if (!cancelled) setSearchResults([]); });
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery]);
 
   const filteredAndSortedCollections = useMemo(() => {
-    let filtered = collections;
+    let filtered = searchResults !== null ? [...searchResults] : collections;
 
     // Filter by ID
     if (filterID) {
@@ -21,6 +43,11 @@ const TableView = ({ collections, loading, onRefresh }) => {
       filtered = filtered.filter(c => c.read_only === isReadOnly);
     }
 
+    // Search results stay in rank order
+    if (searchResults !== null) {
+      return filtered;
+    }
+
     // Sort
     filtered.sort((a, b) => {
       let aVal = a[sortBy];
@@ -42,7 +69,7 @@ const TableView = ({ collections, loading, onRefresh }) => {
     });
 
     return filtered;
-  }, [collections, filterID, filterReadOnly, sortBy, sortOrder]);
+  }, [collections, searchResults, filterID, filterReadOnly, sortBy, sortOrder]);
 
   const handleSort = (column) => {
     if (sortBy === column) {
@@ -85,7 +112,25 @@ const TableView = ({ collections, loading, onRefresh }) => {
         </button>
       </div>
 
+      {stats && (
+        <div className="stats-summary">
+          <span>Total: {stats.total}</span>
+          <span>Read-only: {stats.read_only}</span>
+          <span>Editable: {stats.editable}</span>
+          <span>Unique IDs: {stats.distinct_ids}</span>
+        </div>
+      )}
+
       <div className="filters">
+        <div className="filter-group">
+          <label>Search name or contact:</label>
+          <input
+            type="text"
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+            placeholder="Start typing..."
+          />
+        </div>
         <div className="filter-group">
           <label>Filter by ID:</label>
           <input
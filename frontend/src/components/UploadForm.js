@@ -2,6 +2,8 @@ import React, { useState } from 'react';
 import axios from 'axios';
 import './UploadForm.css';
 
+const ACCEPTED_EXTENSIONS = ['.xlsx', '.xls', '.xlsm', '.ods', '.csv', '.parquet', '.zip'];
+
 const UploadForm = ({ onUploadSuccess }) => {
   const [file, setFile] = useState(null);
   const [uploading, setUploading] = useState(false);
@@ -41,8 +43,8 @@ const UploadForm = ({ onUploadSuccess }) => {
       return;
     }
 
-    if (!file.name.endsWith('.xlsx') && !file.name.endsWith('.xls')) {
-      setError('Please select an Excel file (.xlsx or .xls)');
+    if (!ACCEPTED_EXTENSIONS.some((ext) => file.name.toLowerCase().endsWith(ext))) {
+      setError(`Please select one of: ${ACCEPTED_EXTENSIONS.join(', ')}`);
       return;
     }
 
@@ -108,7 +110,7 @@ const UploadForm = ({ onUploadSuccess }) => {
             <p>Drag and drop an Excel file here, or click to select</p>
             <input
               type="file"
-              accept=".xlsx,.xls"
+              accept={ACCEPTED_EXTENSIONS.join(',')}
               onChange={handleFileSelect}
               style={{ display: 'none' }}
               id="file-input"
@@ -132,6 +134,8 @@ const UploadForm = ({ onUploadSuccess }) => {
           <p><strong>Message:</strong> {uploadResult.message}</p>
           <p><strong>Records Processed:</strong> {uploadResult.records_processed}</p>
           <p><strong>Records Added:</strong> {uploadResult.records_added}</p>
+          <p><strong>Records Updated:</strong> {uploadResult.records_updated}</p>
+          <p><strong>Records Skipped:</strong> {uploadResult.records_skipped}</p>
           {uploadResult.errors.length > 0 && (
             <div className="upload-errors">
               <h4>Errors:</h4>
@@ -1,8 +1,9 @@
 -- Database initialization script for Collection Management System
 
--- Create the collections table
+-- Create the collections table, partitioned by month of Date (see app/partitions.py).
+-- Unique keys of a partitioned table must include Date, hence no plain primary key.
 CREATE TABLE IF NOT EXISTS collections (
-    record_id SERIAL PRIMARY KEY,
+    record_id SERIAL NOT NULL,
     ID INTEGER NOT NULL,
     Name VARCHAR(255),
     Email VARCHAR(255),
@@ -10,14 +11,90 @@ CREATE TABLE IF NOT EXISTS collections (
     Date DATE DEFAULT CURRENT_DATE,
     read_only BOOLEAN DEFAULT FALSE,
     last_updated_by VARCHAR(255),
-    last_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    last_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    upload_key VARCHAR(64), -- ID, sheet date and occurrence of an uploaded row; conflict target for re-upload upserts
+    row_fingerprint VARCHAR(32),
+    UNIQUE (record_id, Date),
+    UNIQUE (upload_key, Date)
+) PARTITION BY RANGE (Date);
+
+-- NULL dates and months without a partition land in the default partition;
+-- python -m app.partitions (also run at API startup) splits them out
+CREATE TABLE IF NOT EXISTS collections_default PARTITION OF collections DEFAULT;
+
+-- Monthly partitions from the sample data's month to three months ahead
+DO $$
+DECLARE
+    month DATE;
+BEGIN
+    FOR month IN
+        SELECT generate_series(DATE '2024-01-01', date_trunc('month', CURRENT_DATE) + INTERVAL '3 months', INTERVAL '1 month')::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF collections FOR VALUES FROM (%L) TO (%L)',
+            'collections_p' || to_char(month, 'YYYY_MM'), month, (month + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_collections_id ON collections(ID);
 CREATE INDEX IF NOT EXISTS idx_collections_read_only ON collections(read_only);
 CREATE INDEX IF NOT EXISTS idx_collections_date ON collections(Date);
 
+-- Composite indexes for keyset (cursor) pagination: one per filter combination
+CREATE INDEX IF NOT EXISTS idx_collections_read_only_record ON collections(read_only, record_id);
+CREATE INDEX IF NOT EXISTS idx_collections_id_record ON collections(ID, record_id);
+CREATE INDEX IF NOT EXISTS idx_collections_id_history ON collections(ID, last_updated_at DESC, record_id DESC);
+
+-- Trigram indexes for GET /collections/search: prefix (LIKE 'q%') and fuzzy (%) matching
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_collections_name_trgm ON collections USING GIN (lower(Name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_collections_contact_trgm ON collections USING GIN (lower(Contact) gin_trgm_ops);
+
+-- Background upload job state, shared by all API workers (UPLOAD_JOB_STORE=database)
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    job_id VARCHAR(32) PRIMARY KEY,
+    status VARCHAR(16) NOT NULL,
+    filename VARCHAR(255),
+    submitted_by VARCHAR(255),
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    rows_inserted INTEGER NOT NULL DEFAULT 0,
+    errors TEXT NOT NULL DEFAULT '[]',
+    message TEXT,
+    created_at TIMESTAMP NOT NULL,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Content hashes of cleanly ingested workbooks; identical re-uploads are skipped
+CREATE TABLE IF NOT EXISTS uploaded_files (
+    content_hash VARCHAR(64) PRIMARY KEY,
+    filename VARCHAR(255),
+    uploaded_by VARCHAR(255),
+    uploaded_at TIMESTAMP NOT NULL,
+    records_processed INTEGER NOT NULL DEFAULT 0
+);
+
+-- Summary tables behind /collections/stats, recounted by the API for the dates and IDs each write touches
+CREATE TABLE IF NOT EXISTS collection_date_stats (
+    date DATE NOT NULL,
+    read_only BOOLEAN NOT NULL,
+    records INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (date, read_only)
+);
+
+CREATE TABLE IF NOT EXISTS collection_undated_stats (
+    read_only BOOLEAN PRIMARY KEY,
+    records INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS collection_id_stats (
+    id INTEGER PRIMARY KEY,
+    records INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_collection_id_stats_records ON collection_id_stats(records DESC, id);
+
 -- Function to prevent updates on read-only rows
 CREATE OR REPLACE FUNCTION prevent_update_on_readonly()
 RETURNS TRIGGER AS $$
@@ -60,4 +137,17 @@ INSERT INTO collections (ID, Name, Contact, Date, read_only, last_updated_by) VA
 (1001, 'John Doe', '0712345678', '2024-01-15', true, 'system'),
 (1002, 'Jane Smith', '0723456789', '2024-01-16', false, 'system'),
 (1003, NULL, '0734567890', '2024-01-17', false, 'system'),
-(1001, 'John Doe Updated', '0712345678', '2024-01-18', true, 'system'); -- Multiple entries for same ID 
\ No newline at end of file
+(1001, 'John Doe Updated', '0712345678', '2024-01-18', true, 'system'); -- Multiple entries for same ID
+
+-- Count the sample rows into the summary tables (same as python -m app.stats)
+INSERT INTO collection_date_stats (date, read_only, records)
+SELECT Date, COALESCE(read_only, FALSE), COUNT(*) FROM collections WHERE Date IS NOT NULL GROUP BY Date, COALESCE(read_only, FALSE)
+ON CONFLICT (date, read_only) DO UPDATE SET records = EXCLUDED.records;
+
+INSERT INTO collection_undated_stats (read_only, records)
+SELECT COALESCE(read_only, FALSE), COUNT(*) FROM collections WHERE Date IS NULL GROUP BY COALESCE(read_only, FALSE)
+ON CONFLICT (read_only) DO UPDATE SET records = EXCLUDED.records;
+
+INSERT INTO collection_id_stats (id, records)
+SELECT ID, COUNT(*) FROM collections GROUP BY ID
+ON CONFLICT (id) DO UPDATE SET records = EXCLUDED.records; 
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Production server: api_main under uvicorn with WEB_CONCURRENCY worker
+processes (one per CPU by default). uvicorn's supervisor restarts workers
+that die.
+
+Each worker has its own SQLAlchemy pool and cache. Metrics go through
+prometheus_client's multiprocess mode: PROMETHEUS_MULTIPROC_DIR (a fresh
+temporary directory unless set; emptied at startup) collects every worker's
+samples, so /metrics reports all workers whichever one answers. The pool
+defaults share DB_MAX_CONNECTIONS between the workers; the server refuses to
+start when explicit DB_POOL_SIZE / DB_MAX_OVERFLOW settings would exceed it.
+With several workers upload jobs are kept in the database (UPLOAD_JOB_STORE
+defaults to "database" and "memory" is refused) so every worker sees the
+same jobs. Missing tables are created once, before the workers start.
+
+Usage: python serve.py
+"""
+
+import glob
+import logging
+import os
+import tempfile
+
+import uvicorn
+
+from app.cofig import (
+    API_HOST, API_PORT, WEB_CONCURRENCY, UPLOAD_JOB_STORE, CACHE_REDIS_URL, DB_ASYNC, DB_CREATE_TABLES,
+    DB_MAX_CONNECTIONS, DB_MAX_OVERFLOW, DB_POOL_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    connections = WEB_CONCURRENCY * (2 if DB_ASYNC else 1) * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    if connections > DB_MAX_CONNECTIONS:
+        raise SystemExit(
+            f"{WEB_CONCURRENCY} workers with DB_POOL_SIZE={DB_POOL_SIZE} and DB_MAX_OVERFLOW={DB_MAX_OVERFLOW} "
+            f"may open {connections} connections, more than DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}; "
+            f"lower WEB_CONCURRENCY or the pool settings"
+        )
+    if WEB_CONCURRENCY > 1:
+        if "UPLOAD_JOB_STORE" not in os.environ:
+            # Read by each worker's app.cofig, like DB_CREATE_TABLES below
+            os.environ["UPLOAD_JOB_STORE"] = "database"
+        elif UPLOAD_JOB_STORE == "memory":
+            raise SystemExit(
+                f"UPLOAD_JOB_STORE=memory with {WEB_CONCURRENCY} workers: job status would only be visible "
+                f"to the worker that ran it; use UPLOAD_JOB_STORE=database or WEB_CONCURRENCY=1"
+            )
+        # Before anything imports app.metrics, here and in the workers
+        metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="collection-metrics-")
+        os.makedirs(metrics_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(metrics_dir, "*.db")):
+            os.remove(stale)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+        if not CACHE_REDIS_URL:
+            logger.warning("No CACHE_REDIS_URL: a worker may serve records changed through another worker for up to "
+                           "CACHE_TTL_SECONDS (CACHE_READ_ONLY_TTL_SECONDS for read-only records)")
+
+    if DB_CREATE_TABLES:
+        # Once here instead of in every worker's startup, which would race on CREATE TABLE
+        from app.database import create_schema, engine
+
+        create_schema()
+        engine.dispose()
+        os.environ["DB_CREATE_TABLES"] = "false"
+
+    uvicorn.run(
+        "api_main:app",
+        host=API_HOST,
+        port=API_PORT,
+        workers=WEB_CONCURRENCY,
+        timeout_keep_alive=5,
+        proxy_headers=True
+    )
+
+
+if __name__ == "__main__":
+    main()
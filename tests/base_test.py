@@ -1,5 +1,9 @@
 import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.db import get_connection
+from app.database import Base
 
 class DBTestCase(unittest.TestCase):
 
@@ -15,3 +19,19 @@ class DBTestCase(unittest.TestCase):
         self.conn.commit()
         self.cursor.close()
         self.conn.close()
+
+class SQLiteTestCase(unittest.TestCase):
+    """Runs the SQLAlchemy layer against an in-memory SQLite database"""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        self.db = self.SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+        self.engine.dispose()
@@ -0,0 +1,91 @@
+import asyncio
+import importlib.util
+import inspect
+import unittest
+from unittest import mock
+
+from app import async_crud, crud
+from app.database import Base
+from app.schemas import BulkTarget, CollectionBulkUpdate, CollectionCreate, CollectionUpdate
+
+
+@unittest.skipUnless(importlib.util.find_spec("aiosqlite"), "aiosqlite is not installed")
+class TestAsyncCrud(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.db = async_sessionmaker(self.engine, expire_on_commit=False)()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        await self.engine.dispose()
+
+    async def test_create_list_and_history(self):
+        added, errors = await async_crud.bulk_create_collections(self.db, [
+            (CollectionCreate(id=1001, name="John", contact="0712"), True),
+            (CollectionCreate(id=1001, name="John again"), False),
+            (CollectionCreate(id=1002, name="Jane"), False),
+        ])
+        self.assertEqual((added, errors), (3, []))
+
+        self.assertEqual(len(await async_crud.get_collections(self.db)), 3)
+        self.assertEqual(len(await async_crud.get_editable_collections(self.db)), 2)
+        self.assertEqual(len(await async_crud.get_collections_by_id(self.db, 1001)), 2)
+
+        stats = await async_crud.get_collection_stats(self.db)
+        self.assertEqual((stats.total, stats.read_only, stats.distinct_ids), (3, 1, 2))
+
+    async def test_read_only_enforcement(self):
+        locked = await async_crud.create_collection(self.db, CollectionCreate(id=1, name="a", contact="b"), True)
+        open_row = await async_crud.create_collection(self.db, CollectionCreate(id=2, name="a"), False)
+
+        with self.assertRaises(ValueError):
+            await async_crud.update_collection(self.db, locked.record_id, CollectionUpdate(name="x", last_updated_by="me"))
+        with self.assertRaises(ValueError):
+            await async_crud.delete_collection(self.db, locked.record_id)
+
+        updated = await async_crud.update_collection(
+            self.db, open_row.record_id, CollectionUpdate(contact="0700", last_updated_by="me")
+        )
+        self.assertEqual((updated.contact, updated.last_updated_by), ("0700", "me"))
+        self.assertTrue(await async_crud.delete_collection(self.db, open_row.record_id))
+        self.assertIsNone(await async_crud.get_collection_by_record_id(self.db, open_row.record_id))
+
+    async def test_bulk_update_and_delete(self):
+        locked = await async_crud.create_collection(self.db, CollectionCreate(id=1, name="a", contact="b"), True)
+        open_row = await async_crud.create_collection(self.db, CollectionCreate(id=1, name="a"), False)
+
+        result = await async_crud.bulk_update_collections(
+            self.db, CollectionBulkUpdate(filter={"ids": [1]}, changes={"email": "a@b.c"}), "me"
+        )
+        self.assertEqual((result.affected, result.read_only), (1, 1))
+
+        target = BulkTarget(record_ids=[locked.record_id, open_row.record_id])
+        result = await async_crud.bulk_delete_collections(self.db, target)
+        self.assertEqual([o.status for o in result.results], ["read_only", "deleted"])
+        self.assertEqual((await async_crud.get_collection_stats(self.db)).total, 1)
+
+
+class TestRunCrud(unittest.TestCase):
+    def test_every_counterpart_is_the_same_named_coroutine(self):
+        for func, counterpart in async_crud.ASYNC_COUNTERPARTS.items():
+            self.assertEqual(func.__name__, counterpart.__name__)
+            self.assertTrue(inspect.iscoroutinefunction(counterpart))
+
+    def test_dispatches_to_the_counterpart(self):
+        counterpart = mock.AsyncMock(return_value="async")
+        with mock.patch.dict(async_crud.ASYNC_COUNTERPARTS, {crud.get_collection_rows: counterpart}), \
+                mock.patch.object(async_crud, "DB_ASYNC", True):
+            self.assertEqual(asyncio.run(async_crud.run_crud(crud.get_collection_rows, "db", limit=5)), "async")
+        counterpart.assert_awaited_once_with("db", limit=5)
+
+    def test_function_without_counterpart_is_refused(self):
+        with self.assertRaises(TypeError):
+            asyncio.run(async_crud.run_crud(crud.upsert_collections, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.cache import CollectionCache, LRUCache, LocalSharedBackend, MISSING, collection_cache
+from app.crud import (
+    bulk_create_collections, create_collection, delete_collection, get_collection_by_record_id,
+    get_collections_by_id, update_collection, upsert_collections
+)
+from app.schemas import CollectionCreate, CollectionUpdate
+from tests.base_test import SQLiteTestCase
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, MISSING, 3))
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_entries=10)
+        with mock.patch("app.cache.time.monotonic", return_value=100.0):
+            cache.set("editable", 1, ttl=5)
+            cache.set("read_only", 2)
+        with mock.patch("app.cache.time.monotonic", return_value=106.0):
+            self.assertIs(cache.get("editable"), MISSING)
+            self.assertEqual(cache.get("read_only"), 2)
+
+
+class TestCollectionCache(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        collection_cache.clear()
+        self.locked = create_collection(self.db, CollectionCreate(id=1001, name="John", contact="0712"), True)
+        self.open = create_collection(self.db, CollectionCreate(id=1001, name="John"), False)
+
+    def get_record(self, record_id, cache=collection_cache):
+        async def load():
+            return get_collection_by_record_id(self.db, record_id)
+        return asyncio.run(cache.get_record(record_id, load))
+
+    def get_history(self, ID, cache=collection_cache):
+        async def load():
+            return get_collections_by_id(self.db, ID)
+        return asyncio.run(cache.get_history(ID, load))
+
+    def test_read_through_counts_hits_and_misses(self):
+        before = collection_cache.stats()
+        self.assertEqual(self.get_record(self.locked.record_id).name, "John")
+        self.assertEqual(self.get_record(self.locked.record_id).name, "John")
+        self.assertIsNone(self.get_record(999))
+
+        stats = collection_cache.stats()
+        self.assertEqual(stats["hits"]["record"] - before["hits"]["record"], 1)
+        self.assertEqual(stats["misses"]["record"] - before["misses"]["record"], 2)
+
+    def test_update_and_delete_invalidate_record_and_history(self):
+        self.get_record(self.open.record_id)
+        self.assertEqual(len(self.get_history(1001)), 2)
+
+        update_collection(self.db, self.open.record_id, CollectionUpdate(name="Changed", last_updated_by="me"))
+        self.assertEqual(self.get_record(self.open.record_id).name, "Changed")
+        self.assertIn("Changed", [c.name for c in self.get_history(1001)])
+
+        delete_collection(self.db, self.open.record_id)
+        self.assertIsNone(self.get_record(self.open.record_id))
+        self.assertEqual(len(self.get_history(1001)), 1)
+
+    def test_upload_invalidates_history_of_touched_ids(self):
+        self.assertEqual(len(self.get_history(1001)), 2)
+        bulk_create_collections(self.db, [(CollectionCreate(id=1001, name="Again"), False)])
+        self.assertEqual(len(self.get_history(1001)), 3)
+
+    def test_reupload_fill_in_invalidates_the_record(self):
+        upsert_collections(self.db, [(CollectionCreate(id=7, name=None, contact="0700"), False)])
+        record_id = get_collections_by_id(self.db, 7)[0].record_id
+        self.assertIsNone(self.get_record(record_id).name)
+
+        upsert_collections(self.db, [(CollectionCreate(id=7, name="Alice", contact="0700"), True)])
+        self.assertEqual(self.get_record(record_id).name, "Alice")
+
+    def test_shared_backend_is_seen_by_other_workers(self):
+        shared = LocalSharedBackend()
+        worker_a = CollectionCache(shared=shared)
+        worker_b = CollectionCache(shared=shared)
+
+        self.get_record(self.locked.record_id, cache=worker_a)
+        self.assertEqual(self.get_record(self.locked.record_id, cache=worker_b).name, "John")
+        self.assertEqual(worker_b.stats()["hits"]["record"], 1)
+
+        worker_a.invalidate(record_ids=[self.locked.record_id])
+        self.assertIsNone(shared.get(f"record:{self.locked.record_id}"))
+
+        # A write through worker_a reaches worker_b, which keeps no local copy
+        self.assertEqual(self.get_record(self.open.record_id, cache=worker_b).name, "John")
+        update_collection(self.db, self.open.record_id, CollectionUpdate(name="Again", last_updated_by="me"))
+        worker_a.invalidate(record_ids=[self.open.record_id])
+        self.assertEqual(self.get_record(self.open.record_id, cache=worker_b).name, "Again")
+
+    def test_read_only_records_expire_after_the_longer_ttl(self):
+        cache = CollectionCache(ttl=60, read_only_ttl=3600)
+        with mock.patch("app.cache.time.monotonic", return_value=100.0):
+            self.get_record(self.locked.record_id, cache=cache)
+            self.get_record(self.open.record_id, cache=cache)
+        with mock.patch("app.cache.time.monotonic", return_value=200.0):
+            self.assertIs(cache.local.get(f"record:{self.open.record_id}"), MISSING)
+            self.assertIsNot(cache.local.get(f"record:{self.locked.record_id}"), MISSING)
+        with mock.patch("app.cache.time.monotonic", return_value=3800.0):
+            self.assertIs(cache.local.get(f"record:{self.locked.record_id}"), MISSING)
+
+    def test_load_racing_with_write_is_not_cached(self):
+        async def load():
+            row = get_collection_by_record_id(self.db, self.open.record_id)
+            collection_cache.invalidate(record_ids=[self.open.record_id])
+            return row
+
+        asyncio.run(collection_cache.get_record(self.open.record_id, load))
+        self.assertIs(collection_cache.local.get(f"record:{self.open.record_id}"), MISSING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import false
+from sqlalchemy.dialects import postgresql
+
+from app.models.enhanced_collection import Collection
+from app.crud import (
+    bulk_create_collections, bulk_delete_collections, bulk_matches_query, bulk_target_clauses,
+    bulk_update_collections, get_collections, get_collections_by_id, get_editable_collections, next_page_cursor
+)
+from app.schemas import BulkTarget, CollectionBulkUpdate, CollectionCreate
+from app.stats import get_collection_stats
+from tests.base_test import SQLiteTestCase
+
+# New records are dated with the UTC day; frozen late in the day, when it
+# differs from the local day in timezones behind UTC
+FROZEN_NOW = datetime(2024, 5, 1, 23, 30)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return FROZEN_NOW
+
+
+def freeze_time(test):
+    patcher = mock.patch("app.crud.datetime", FrozenDatetime)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class TestBulkCreate(SQLiteTestCase):
+    def test_inserts_across_batches(self):
+        freeze_time(self)
+        rows = [(CollectionCreate(id=i, name=f"Name {i}", contact="0700"), i % 2 == 0) for i in range(25)]
+        added, errors = bulk_create_collections(self.db, rows, user="uploader", batch_size=10)
+
+        self.assertEqual((added, errors), (25, []))
+        stored = self.db.query(Collection).order_by(Collection.id).all()
+        self.assertEqual(len(stored), 25)
+        self.assertTrue(stored[0].read_only)
+        self.assertFalse(stored[1].read_only)
+        self.assertEqual(stored[0].last_updated_by, "uploader")
+        self.assertEqual(stored[0].date, FROZEN_NOW.date())
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        good = (CollectionCreate(id=1, name="Good"), False)
+        bad = (CollectionCreate.model_construct(id=None, name="Bad"), False)
+        added, errors = bulk_create_collections(self.db, [good, bad, good], batch_size=3)
+
+        self.assertEqual(added, 2)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith("Failed to insert record (ID None)"))
+        self.assertEqual(self.db.query(Collection).count(), 2)
+
+
+class TestKeysetPagination(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [(CollectionCreate(id=1000 + i % 3, name=f"Name {i}"), i % 2 == 0) for i in range(20)]
+        bulk_create_collections(self.db, rows)
+
+    def walk(self, fetch, limit, **kwargs):
+        pages, cursor = [], None
+        while True:
+            page = fetch(self.db, limit=limit, cursor=cursor, **kwargs)
+            pages.append([c.record_id for c in page])
+            cursor = next_page_cursor(page, limit, **({"history": True} if fetch is get_collections_by_id else {}))
+            if cursor is None:
+                return pages
+
+    def test_cursor_walks_every_row_once(self):
+        pages = self.walk(get_collections, 6)
+        self.assertEqual([len(p) for p in pages], [6, 6, 6, 2])
+        self.assertEqual([r for p in pages for r in p], list(range(1, 21)))
+
+    def test_cursor_respects_filters(self):
+        pages = self.walk(get_editable_collections, 4)
+        self.assertEqual([r for p in pages for r in p], list(range(2, 21, 2)))
+
+        pages = self.walk(get_collections, 3, ID=1001)
+        self.assertEqual([r for p in pages for r in p], [2, 5, 8, 11, 14, 17, 20])
+
+    def test_history_pages_newest_first(self):
+        # Give rows distinct, shuffled timestamps plus one tie broken by record_id
+        base = datetime(2024, 1, 1)
+        for row in self.db.query(Collection).filter(Collection.id == 1000):
+            row.last_updated_at = base + timedelta(minutes=(row.record_id * 7) % 5)
+        self.db.commit()
+
+        expected = [c.record_id for c in get_collections_by_id(self.db, 1000)]
+        pages = self.walk(get_collections_by_id, 2, ID=1000)
+        self.assertEqual([r for p in pages for r in p], expected)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            get_collections(self.db, cursor="not-a-cursor")
+
+    def test_cursor_from_the_other_endpoint_is_rejected(self):
+        list_cursor = next_page_cursor(get_collections(self.db, limit=2), 2)
+        with self.assertRaises(ValueError):
+            get_collections_by_id(self.db, 1000, limit=2, cursor=list_cursor)
+
+        history = get_collections_by_id(self.db, 1000, limit=2)
+        with self.assertRaises(ValueError):
+            get_collections(self.db, limit=2, cursor=next_page_cursor(history, 2, history=True))
+
+
+class TestBulkEdits(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        freeze_time(self)
+        # record_ids 1-3 editable, 4 read-only
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=1, name="a"), False),
+            (CollectionCreate(id=1, name="b"), False),
+            (CollectionCreate(id=2, name="c"), False),
+            (CollectionCreate(id=2, name="d", contact="0700"), True),
+        ])
+
+    def statuses(self, result):
+        return {outcome.record_id: outcome.status for outcome in result.results}
+
+    def test_update_by_record_ids_skips_read_only_and_reports_missing(self):
+        request = CollectionBulkUpdate(record_ids=[1, 3, 4, 99], changes={"contact": "0711"})
+        result = bulk_update_collections(self.db, request, "clerk")
+
+        self.assertEqual((result.affected, result.read_only, result.not_found), (2, 1, 1))
+        self.assertEqual(self.statuses(result), {1: "updated", 3: "updated", 4: "read_only", 99: "not_found"})
+        rows = {c.record_id: c for c in self.db.query(Collection)}
+        self.assertEqual((rows[1].contact, rows[1].last_updated_by), ("0711", "clerk"))
+        self.assertEqual(rows[2].contact, None)
+        self.assertEqual(rows[4].contact, "0700")
+
+    def test_update_by_filter_moves_stats(self):
+        new_date = FROZEN_NOW.date() - timedelta(days=2)
+        request = CollectionBulkUpdate(filter={"ids": [1]}, changes={"date": new_date})
+        result = bulk_update_collections(self.db, request, "clerk")
+
+        self.assertEqual(self.statuses(result), {1: "updated", 2: "updated"})
+        by_date = {d.date: d.total for d in get_collection_stats(self.db).by_date}
+        self.assertEqual(by_date, {new_date: 2, FROZEN_NOW.date(): 2})
+
+    def test_delete_keeps_read_only_records(self):
+        result = bulk_delete_collections(self.db, BulkTarget(filter={"ids": [2]}))
+
+        self.assertEqual(self.statuses(result), {3: "deleted", 4: "read_only"})
+        self.assertEqual(sorted(c.record_id for c in self.db.query(Collection)), [1, 2, 4])
+        self.assertEqual(get_collection_stats(self.db).total, 3)
+
+    def test_matched_rows_are_locked(self):
+        query = bulk_matches_query(bulk_target_clauses(BulkTarget(filter={"ids": [1]})))
+        self.assertIn("FOR UPDATE", str(query.compile(dialect=postgresql.dialect())))
+
+    def test_rows_missed_by_the_select_are_reported_from_returning(self):
+        # As if records 1-3 were inserted by another writer between the SELECT and the DELETE
+        nothing = bulk_matches_query([false()])
+        with mock.patch("app.crud.bulk_matches_query", return_value=nothing):
+            result = bulk_delete_collections(self.db, BulkTarget(filter={"ids": [1, 2]}))
+
+        self.assertEqual((result.affected, result.read_only), (3, 0))
+        self.assertEqual(self.statuses(result), {1: "deleted", 2: "deleted", 3: "deleted"})
+        self.assertEqual(get_collection_stats(self.db).total, 1)
+
+    def test_empty_target_is_rejected(self):
+        with self.assertRaises(ValueError):
+            BulkTarget(filter={})
+        with self.assertRaises(ValueError):
+            CollectionBulkUpdate(record_ids=[1], changes={})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import QueuePool
+
+from app import database
+from app.database import create_schema, engine_options, pool_stats
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_sqlite_keeps_its_own_pool(self):
+        self.assertEqual(engine_options("sqlite:////tmp/app.db"), {})
+
+    def test_pool_settings_come_from_config(self):
+        with patch.multiple(database, DB_POOL_SIZE=7, DB_MAX_OVERFLOW=3, DB_STATEMENT_TIMEOUT_MS=0):
+            options = engine_options("postgresql://user:pass@db/app")
+
+        self.assertEqual((options["pool_size"], options["max_overflow"]), (7, 3))
+        self.assertNotIn("connect_args", options)
+
+    def test_statement_timeout_per_driver(self):
+        with patch.object(database, "DB_STATEMENT_TIMEOUT_MS", 5000):
+            sync = engine_options("postgresql://user:pass@db/app")
+            async_ = engine_options("postgresql+asyncpg://user:pass@db/app", async_driver=True)
+
+        self.assertEqual(sync["connect_args"], {"options": "-c statement_timeout=5000"})
+        self.assertEqual(async_["connect_args"], {"server_settings": {"statement_timeout": "5000"}})
+
+
+class TestPoolStats(unittest.TestCase):
+    def test_counts_checked_out_and_overflow_connections(self):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=2)
+        try:
+            first, second = engine.connect(), engine.connect()
+            stats = pool_stats(engine.pool)
+            first.close()
+            second.close()
+        finally:
+            engine.dispose()
+
+        self.assertEqual(stats[("checked_out",)], 2)
+        self.assertEqual(stats[("overflow",)], 1)
+
+
+class TestLazyStartup(unittest.TestCase):
+    def test_create_schema_registers_every_model(self):
+        engine = create_engine("sqlite://")
+        try:
+            create_schema(engine)
+            tables = set(inspect(engine).get_table_names())
+        finally:
+            engine.dispose()
+
+        self.assertTrue({"collections", "upload_jobs", "uploaded_files"} <= tables)
+
+    def test_importing_the_api_skips_pandas_and_the_database(self):
+        # An unreachable database proves import does no DDL
+        code = "import sys, api_main; print(any(m in sys.modules for m in ('pandas', 'openpyxl')))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True,
+            env={**os.environ, "DATABASE_URL": "postgresql://nobody@127.0.0.1:1/none"}
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
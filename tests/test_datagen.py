@@ -0,0 +1,37 @@
+import unittest
+
+from app.utils.excel_processor import classify_frame
+from benchmarks.datagen import RowMix, generate_frame, generate_raw_ids, parse_size
+
+
+class TestBenchmarkData(unittest.TestCase):
+    def test_same_seed_same_data(self):
+        self.assertTrue(generate_frame(500, seed=7).equals(generate_frame(500, seed=7)))
+        self.assertFalse(generate_frame(500, seed=7).equals(generate_frame(500, seed=8)))
+        self.assertEqual(generate_raw_ids(50, seed=7), generate_raw_ids(50, seed=7))
+
+    def test_mix_carries_through_the_importer(self):
+        rows = 20_000
+        mix = RowMix(read_only=0.5, editable=0.3, invalid_id=0.1, missing_date=0.2)
+        frame = generate_frame(rows, mix)
+        results, errors = classify_frame(frame)
+
+        read_only = sum(ro for _, ro in results)
+        self.assertAlmostEqual(read_only / rows, 0.5, delta=0.02)
+        self.assertAlmostEqual((len(results) - read_only) / rows, 0.3, delta=0.02)
+        self.assertAlmostEqual(len(errors) / rows, 0.1, delta=0.02)
+        self.assertAlmostEqual(frame["Date"].isna().mean(), 0.2, delta=0.02)
+
+    def test_mix_parsing_and_validation(self):
+        self.assertEqual(RowMix.parse("read_only=0.2, invalid_id=0"), RowMix(read_only=0.2, invalid_id=0))
+        with self.assertRaises(ValueError):
+            RowMix.parse("duplicates=0.1")
+        with self.assertRaises(ValueError):
+            RowMix(read_only=0.8, editable=0.3)
+
+    def test_named_sizes(self):
+        self.assertEqual([parse_size(s) for s in ("1k", "100K", "1m", "2500")], [1_000, 100_000, 1_000_000, 2_500])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.db import ConnectionPool, PoolTimeout, executemany_chunked
+from app.models.collection import insert_collections_many
+from app.models.users import iter_users
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, query, params):
+        self.conn.batches.append(list(params))
+
+    def execute(self, query, params=()):
+        self.conn.queries.append((query, params))
+        self.conn.unread_result = bool(self.conn.result)
+
+    def fetchmany(self, size):
+        rows, self.conn.result = self.conn.result[:size], self.conn.result[size:]
+        self.conn.unread_result = bool(self.conn.result)
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.commits = 0
+        self.batches = []
+        self.queries = []
+        self.result = []
+        self.unread_result = False
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def consume_results(self):
+        self.result = []
+        self.unread_result = False
+
+    def commit(self):
+        self.commits += 1
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect():
+            conn = FakeConnection()
+            self.opened.append(conn)
+            return conn
+
+        self.pool = ConnectionPool(size=2, timeout=0.2, ping_after=0, connect=connect)
+
+    def test_reuses_connections(self):
+        for _ in range(5):
+            with self.pool.connection():
+                pass
+        self.assertEqual(len(self.opened), 1)
+        stats = self.pool.stats()
+        self.assertEqual((stats["checkouts"], stats["open"], stats["in_use"]), (5, 1, 0))
+
+    def test_replaces_dead_connection_on_checkout(self):
+        with self.pool.connection() as conn:
+            pass
+        conn.alive = False
+
+        with self.pool.connection() as replacement:
+            self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.stats()["replaced"], 1)
+        self.assertEqual(self.pool.stats()["open"], 1)
+
+    def test_rolls_back_uncommitted_work_on_return(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.connection() as conn:
+                conn.in_transaction = True
+                raise RuntimeError("boom")
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertFalse(conn.closed)
+
+    def test_waits_for_a_free_connection(self):
+        first = self.pool.acquire()
+        self.pool.acquire()
+        threading.Timer(0.05, self.pool.release, args=(first,)).start()
+
+        self.assertIs(self.pool.acquire(), first)
+        stats = self.pool.stats()
+        self.assertGreater(stats["wait_seconds_max"], 0.02)
+        self.assertEqual((stats["in_use"], stats["utilization"]), (2, 1.0))
+
+    def test_discarding_a_connection_wakes_a_waiter(self):
+        first = self.pool.acquire()
+        self.pool.acquire()
+        threading.Timer(0.05, self.pool.release, args=(first,), kwargs={"broken": True}).start()
+
+        replacement = self.pool.acquire()
+        self.assertIsNot(replacement, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(self.pool.stats()["open"], 2)
+        self.pool.close_all()
+
+    def test_times_out_when_exhausted(self):
+        self.pool.acquire()
+        self.pool.acquire()
+        started = time.monotonic()
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+
+class TestLegacyBatchIO(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect():
+            conn = FakeConnection()
+            self.opened.append(conn)
+            return conn
+
+        self.pool = ConnectionPool(size=1, connect=connect)
+        patcher = mock.patch("app.db.pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_commits_each_chunk_on_one_connection(self):
+        count = executemany_chunked("INSERT", ((i,) for i in range(5)), chunk_size=2)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(len(self.opened), 1)
+        conn = self.opened[0]
+        self.assertEqual([len(batch) for batch in conn.batches], [2, 2, 1])
+        self.assertEqual(conn.commits, 3)
+
+    def test_insert_collections_many_sanitizes_ids(self):
+        count = insert_collections_many([("ab-12", "Tester", "0712345678", None)])
+
+        self.assertEqual(count, 1)
+        (row,) = self.opened[0].batches[0]
+        self.assertEqual(row[:4], ("12", "Tester", "0712345678", None))
+
+    def test_iter_users_streams_projected_batches(self):
+        with self.pool.connection() as conn:
+            conn.result = [{"ID No": str(i), "name": f"user {i}"} for i in range(5)]
+
+        batches = list(iter_users(filters={"ID No": "ab-12"}, batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        query, params = conn.queries[0]
+        self.assertNotIn("user_image", query)
+        self.assertIn("WHERE `ID No` = %s", query)
+        self.assertEqual(params, ("12",))
+
+    def test_closing_stream_early_drains_connection(self):
+        with self.pool.connection() as conn:
+            conn.result = [{"ID No": str(i)} for i in range(5)]
+
+        stream = iter_users(columns=["ID No", "user_image"], batch_size=2)
+        next(stream)
+        stream.close()
+
+        self.assertFalse(conn.unread_result)
+        self.assertIn("`user_image`", conn.queries[0][0])
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_rejects_unknown_columns(self):
+        with self.assertRaises(ValueError):
+            iter_users(columns=["name; DROP TABLE Users"])
+
+
+if __name__ == "__main__":
+    unittest.main()
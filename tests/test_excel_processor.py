@@ -0,0 +1,111 @@
+import io
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from app.utils.excel_processor import classify_frame, process_excel_data, process_excel_stream
+
+TODAY = datetime(2025, 1, 1).date()
+
+
+class TestExcelProcessor(unittest.TestCase):
+    def classify(self, rows, **kwargs):
+        return classify_frame(pd.DataFrame(rows), today=TODAY, **kwargs)
+
+    def test_three_filled_columns_are_read_only(self):
+        results, errors = self.classify([{'ID': 1001, 'Name': 'John', 'Contact': '0712345678', 'Date': '2024-01-15'}])
+        self.assertEqual(errors, [])
+        collection, read_only = results[0]
+        self.assertTrue(read_only)
+        self.assertEqual(collection.id, 1001)
+        self.assertEqual(collection.name, 'John')
+        self.assertEqual(collection.contact, '0712345678')
+        self.assertEqual(collection.date, datetime(2024, 1, 15))
+        self.assertIsNone(collection.email)
+
+    def test_two_filled_columns_are_editable(self):
+        results, _ = self.classify([
+            {'ID': 1004, 'Name': 'Alice', 'Contact': None},
+            {'ID': 1005, 'Name': '   ', 'Contact': '0745678901'},
+        ])
+        self.assertEqual([read_only for _, read_only in results], [False, False])
+        self.assertEqual(results[1][0].name, '')
+
+    def test_rows_without_enough_fields_are_skipped(self):
+        results, errors = self.classify([
+            {'ID': 1007, 'Name': None, 'Contact': ''},
+            {'ID': None, 'Name': 'Nobody', 'Contact': '0700000000'},
+        ])
+        self.assertEqual(results, [])
+        self.assertEqual(errors, [])
+
+    def test_invalid_ids_cite_original_row_numbers(self):
+        results, errors = self.classify([
+            {'ID': '12', 'Name': 'Ok', 'Contact': 'x'},
+            {'ID': 'abc', 'Name': 'Bad', 'Contact': 'x'},
+            {'ID': '1.5', 'Name': 'Bad', 'Contact': 'x'},
+        ], row_offset=100)
+        self.assertEqual([c.id for c, _ in results], [12])
+        self.assertEqual(errors, ["Row 102: Invalid ID value 'abc'", "Row 103: Invalid ID value '1.5'"])
+
+    def test_dates_fall_back_to_today(self):
+        results, _ = self.classify([
+            {'ID': 1, 'Name': 'a', 'Date': pd.Timestamp('2024-02-01 13:45')},
+            {'ID': 2, 'Name': 'b', 'Date': 'not a date'},
+            {'ID': 3, 'Name': 'c', 'Date': None},
+        ])
+        self.assertEqual(
+            [c.date for c, _ in results],
+            [datetime(2024, 2, 1), datetime(2025, 1, 1), datetime(2025, 1, 1)]
+        )
+
+    def test_process_excel_data_reads_workbook_bytes(self):
+        buffer = io.BytesIO()
+        pd.DataFrame([
+            {'ID': 1001, 'Name': 'John', 'Contact': '0712345678', 'Date': '2024-01-15', 'Collected': 'Yes'},
+            {'ID': 1006, 'Name': 'Charlie', 'Contact': None, 'Date': None, 'Collected': 'No'},
+        ]).to_excel(buffer, index=False)
+        results, errors = process_excel_data(buffer.getvalue())
+        self.assertEqual(errors, [])
+        self.assertEqual([(c.id, ro) for c, ro in results], [(1001, True), (1006, False)])
+
+    def test_stream_matches_whole_sheet_processing(self):
+        buffer = io.BytesIO()
+        pd.DataFrame([
+            {'ID': 1001 + i, 'Name': 'Name' if i % 3 else None, 'Contact': '07' if i % 2 else None,
+             'Date': '2024-01-15' if i % 4 else None}
+            for i in range(23)
+        ] + [{'ID': 'bad', 'Name': 'x', 'Contact': 'y', 'Date': None}]).to_excel(buffer, index=False)
+
+        expected_results, expected_errors = process_excel_data(buffer.getvalue())
+        chunks = list(process_excel_stream(io.BytesIO(buffer.getvalue()), chunk_size=5))
+
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(
+            [(c.model_dump(), ro) for results, _ in chunks for c, ro in results],
+            [(c.model_dump(), ro) for c, ro in expected_results]
+        )
+        self.assertEqual([e for _, errors in chunks for e in errors], expected_errors)
+        self.assertEqual(expected_errors, ["Row 24: Invalid ID value 'bad'"])
+
+
+    def test_na_strings_classify_the_same_on_every_path(self):
+        buffer = io.BytesIO()
+        pd.DataFrame([
+            {'ID': 1, 'Name': 'N/A', 'Contact': '0712'},
+            {'ID': 2, 'Name': 'NA', 'Contact': None},
+            {'ID': 3, 'Name': None, 'Contact': 'null'},
+        ]).to_excel(buffer, index=False)
+
+        in_memory, _ = process_excel_data(buffer.getvalue())
+        streamed = [row for results, _ in process_excel_stream(io.BytesIO(buffer.getvalue())) for row in results]
+
+        self.assertEqual(
+            [(c.name, c.contact, ro) for c, ro in in_memory],
+            [('N/A', '0712', True), ('NA', None, False), (None, 'null', False)]
+        )
+        self.assertEqual([(c.model_dump(), ro) for c, ro in streamed], [(c.model_dump(), ro) for c, ro in in_memory])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from openpyxl import load_workbook
+
+from app import export
+from app.crud import bulk_create_collections
+from app.export import export_collections, export_query, iter_batches
+from app.schemas import CollectionCreate
+from app.utils.serialization import COLLECTION_FIELDS
+from tests.base_test import SQLiteTestCase
+
+
+class TestExport(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=i % 3, name=f"n{i}", contact="0700" if i % 2 else None, date=date(2024, 1, 1)), bool(i % 2))
+            for i in range(7)
+        ])
+
+    def export(self, fmt, **filters):
+        return list(export_collections(fmt, session_factory=self.SessionLocal, **filters))
+
+    def test_rows_arrive_in_batches(self):
+        batches = list(iter_batches(export_query(batch_size=3), self.SessionLocal))
+        self.assertEqual([len(b) for b in batches], [3, 3, 1])
+        self.assertEqual([row.record_id for b in batches for row in b], list(range(1, 8)))
+
+    def test_ndjson_one_record_per_line(self):
+        lines = b"".join(self.export("ndjson", read_only=True)).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertTrue(all(r["read_only"] for r in records))
+        self.assertEqual(records[0]["date"], "2024-01-01T00:00:00")
+
+    def test_csv_has_header_and_filters(self):
+        rows = list(csv.reader(io.StringIO(b"".join(self.export("csv", ID=1)).decode())))
+        self.assertEqual(tuple(rows[0]), COLLECTION_FIELDS)
+        self.assertEqual([r[0] for r in rows[1:]], ["1", "1"])
+
+    def test_gzip_round_trip(self):
+        plain = b"".join(self.export("csv"))
+        self.assertEqual(gzip.decompress(b"".join(self.export("csv", gzip=True))), plain)
+
+    def test_xlsx_is_readable(self):
+        sheet = load_workbook(io.BytesIO(b"".join(self.export("xlsx")))).active
+        rows = list(sheet.values)
+        self.assertEqual(rows[0], COLLECTION_FIELDS)
+        self.assertEqual(len(rows), 8)
+
+    def test_xlsx_continues_on_a_new_sheet(self):
+        with patch.object(export, "XLSX_MAX_ROWS", 5):
+            workbook = load_workbook(io.BytesIO(b"".join(self.export("xlsx"))))
+        self.assertEqual([ws.max_row for ws in workbook.worksheets], [6, 3])
+
+    def test_date_range_filters(self):
+        bulk_create_collections(self.db, [(CollectionCreate(id=9, name="late", date=date(2024, 3, 1)), False)])
+        lines = b"".join(self.export("ndjson", date_from=date(2024, 2, 1))).splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["late"])
+        self.assertEqual(len(b"".join(self.export("ndjson", date_to=date(2024, 1, 31))).splitlines()), 7)
+
+    def test_formulas_are_quoted_in_spreadsheet_formats(self):
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=9, name='=HYPERLINK("http://x")', contact="+254700", date=date(2024, 1, 1)), False)
+        ])
+        row = list(csv.reader(io.StringIO(b"".join(self.export("csv", ID=9)).decode())))[1]
+        self.assertEqual((row[1], row[3]), ('\'=HYPERLINK("http://x")', "'+254700"))
+
+        sheet = load_workbook(io.BytesIO(b"".join(self.export("xlsx", ID=9)))).active
+        cells = list(sheet.values)[1]
+        self.assertEqual((cells[1], cells[3]), ('\'=HYPERLINK("http://x")', "'+254700"))
+
+        record = json.loads(b"".join(self.export("ndjson", ID=9)))
+        self.assertEqual(record["name"], '=HYPERLINK("http://x")')
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.export("pdf")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import unittest
+from datetime import date, timedelta
+
+from app.crud import upsert_collections
+from app.ingest import ingest_excel_file
+from app.models.enhanced_collection import Collection
+from app.schemas import CollectionCreate
+from tests.base_test import SQLiteTestCase
+from tests.test_jobs import write_workbook
+
+
+class TestUpsertCollections(SQLiteTestCase):
+    def rows(self, names):
+        today = date.today()
+        return [(CollectionCreate(id=i, name=name, contact="0700", date=today), False) for i, name in names.items()]
+
+    def test_reupload_skips_unchanged_and_fills_blanks(self):
+        today = date.today()
+        self.assertEqual(upsert_collections(self.db, self.rows({1: "Ann"}) + [
+            (CollectionCreate(id=2, name="Bob", date=today), False)
+        ]), (2, 0, 0, []))
+
+        result = upsert_collections(self.db, self.rows({1: "Ann", 2: "Robert", 3: "Cy"}), user="clerk")
+
+        self.assertEqual(result, (1, 1, 1, []))
+        self.assertEqual(self.db.query(Collection).count(), 3)
+        bob = self.db.query(Collection).filter(Collection.id == 2).one()
+        self.assertEqual((bob.name, bob.contact, bob.last_updated_by), ("Bob", "0700", "clerk"))
+        # Complete once filled in, so read-only like a complete row uploaded fresh
+        self.assertTrue(bob.read_only)
+
+    def test_partial_fill_in_stays_editable(self):
+        upsert_collections(self.db, [(CollectionCreate(id=1, name=None, contact="0700"), False)])
+        upsert_collections(self.db, [(CollectionCreate(id=1, name=None, contact="0700", email="a@b.c"), False)])
+        self.assertFalse(self.db.query(Collection).one().read_only)
+
+    def test_reupload_keeps_values_entered_since(self):
+        upsert_collections(self.db, self.rows({1: "Ann"}))
+        record = self.db.query(Collection).one()
+        record.name, record.email = "Ann Mwangi", "ann@example.com"
+        self.db.commit()
+
+        self.assertEqual(upsert_collections(self.db, self.rows({1: "Ann"})), (0, 0, 1, []))
+        self.db.refresh(record)
+        self.assertEqual((record.name, record.email), ("Ann Mwangi", "ann@example.com"))
+
+    def test_read_only_records_are_not_overwritten(self):
+        yesterday = date.today() - timedelta(days=1)
+        upsert_collections(self.db, [(CollectionCreate(id=1, name="Ann", date=yesterday), True)])
+
+        inserted, updated, skipped, errors = upsert_collections(
+            self.db, [(CollectionCreate(id=1, name="Changed", contact="0700", date=yesterday), True)]
+        )
+
+        self.assertEqual((inserted, updated, skipped), (0, 0, 1))
+        self.assertEqual(len(errors), 1)
+        stored = self.db.query(Collection).one()
+        self.assertEqual((stored.name, stored.contact), ("Ann", None))
+
+    def test_rows_sharing_id_and_date_stay_separate_records(self):
+        result = upsert_collections(self.db, self.rows({1: "Ann"}) + self.rows({1: "Anne"}) + self.rows({1: "Ann"}))
+
+        self.assertEqual(result, (2, 0, 1, []))
+        self.assertEqual(sorted(name for name, in self.db.query(Collection.name)), ["Ann", "Anne"])
+        self.assertEqual(upsert_collections(self.db, self.rows({1: "Ann"}) + self.rows({1: "Anne"})), (0, 0, 2, []))
+
+    def test_identical_rows_collapse_across_batches(self):
+        rows = self.rows({1: "Ann"}) + self.rows({1: "Anne"}) + self.rows({1: "Ann"}) + self.rows({1: "Anne"})
+        self.assertEqual(upsert_collections(self.db, rows, batch_size=1), (2, 0, 2, []))
+        self.assertEqual(upsert_collections(self.db, rows, batch_size=3), (0, 0, 4, []))
+
+    def test_undated_rows_match_on_a_later_day(self):
+        upsert_collections(self.db, [(CollectionCreate(id=1, name="Ann"), False)])
+        record = self.db.query(Collection).one()
+        record.date = date.today() - timedelta(days=3)  # uploaded three days ago
+        self.db.commit()
+
+        result = upsert_collections(self.db, [
+            (CollectionCreate(id=1, name="Ann"), False),
+            (CollectionCreate(id=1, name="Ann", contact="0700"), False),
+        ])
+
+        self.assertEqual(result, (1, 0, 1, []))
+        self.assertEqual(self.db.query(Collection).count(), 2)
+
+
+class TestIngestDedup(SQLiteTestCase):
+    def test_identical_file_is_short_circuited(self):
+        path = write_workbook([
+            {'ID': 1001, 'Name': 'John', 'Contact': '0712345678'},
+            {'ID': 1002, 'Name': 'Jane', 'Contact': '0723456789'},
+        ])
+        self.addCleanup(os.remove, path)
+
+        first = ingest_excel_file(self.db, path, "clerk", filename="upload.xlsx")
+        again = ingest_excel_file(self.db, path, "clerk", filename="upload.xlsx")
+
+        self.assertEqual((first.records_inserted, first.duplicate_file), (2, False))
+        self.assertTrue(again.duplicate_file)
+        self.assertEqual((again.records_processed, again.records_inserted, again.records_skipped), (0, 0, 2))
+        self.assertEqual(self.db.query(Collection).count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
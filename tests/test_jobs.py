@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from app.jobs import (
+    InMemoryJobStore, DatabaseJobStore, JobStore, run_upload_job, get_job_status, submit_upload_job,
+    JOB_COMPLETED, JOB_FAILED
+)
+from app.models.enhanced_collection import Collection
+from tests.base_test import SQLiteTestCase
+
+
+def write_workbook(rows):
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return path
+
+
+class UploadJobTests:
+    """Shared checks run against every JobStore implementation"""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def test_job_reports_progress_and_completion(self):
+        store = self.make_store()
+        path = write_workbook([
+            {'ID': 1001, 'Name': 'John', 'Contact': '0712345678'},
+            {'ID': 1002, 'Name': 'Jane', 'Contact': None},
+            {'ID': 'bad', 'Name': 'Nope', 'Contact': '0700'},
+        ])
+        store.create("job1", "upload.xlsx", "clerk")
+        run_upload_job("job1", path, "clerk", store, session_factory=self.SessionLocal)
+
+        status = get_job_status("job1", store)
+        self.assertEqual(status.status, JOB_COMPLETED)
+        self.assertEqual((status.rows_processed, status.rows_inserted), (2, 2))
+        self.assertEqual(status.errors, ["Row 3: Invalid ID value 'bad'"])
+        self.assertIsNotNone(status.finished_at)
+        self.assertEqual(self.db.query(Collection).count(), 2)
+        self.assertFalse(os.path.exists(path))
+
+    def test_unreadable_file_marks_job_failed(self):
+        store = self.make_store()
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.write(fd, b"not a workbook")
+        os.close(fd)
+        store.create("job2", "broken.xlsx", "clerk")
+        run_upload_job("job2", path, "clerk", store, session_factory=self.SessionLocal)
+
+        status = get_job_status("job2", store)
+        self.assertEqual(status.status, JOB_FAILED)
+        self.assertIn("Failed to process Excel file", status.message)
+
+    def test_unknown_job(self):
+        self.assertIsNone(get_job_status("missing", self.make_store()))
+
+    def test_spooled_file_is_removed_when_the_job_cannot_be_queued(self):
+        store = self.make_store()
+        path = write_workbook([{'ID': 1001, 'Name': 'John', 'Contact': None}])
+        with mock.patch("app.jobs._executor.submit", side_effect=RuntimeError("cannot schedule new futures")):
+            with self.assertRaises(RuntimeError):
+                submit_upload_job(path, "upload.xlsx", "clerk", store)
+
+        self.assertFalse(os.path.exists(path))
+
+
+class TestJobStoreInterface(unittest.TestCase):
+    def test_incomplete_store_cannot_be_created(self):
+        class NoProgress(JobStore):
+            def create(self, job_id, filename, user): ...
+            def get(self, job_id): ...
+            def update(self, job_id, **fields): ...
+
+        with self.assertRaises(TypeError):
+            NoProgress()
+
+
+class TestInMemoryJobStore(UploadJobTests, SQLiteTestCase):
+    def make_store(self):
+        return InMemoryJobStore()
+
+
+class TestDatabaseJobStore(UploadJobTests, SQLiteTestCase):
+    def make_store(self):
+        return DatabaseJobStore(self.SessionLocal)
+
+
+if __name__ == "__main__":
+    unittest.main()
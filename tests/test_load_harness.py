@@ -0,0 +1,52 @@
+import argparse
+import unittest
+
+from benchmarks.load import Request, Results, parse_metrics, parse_mix, queries_per_request, upload_csv
+
+METRICS = '''# HELP db_queries_per_request SQL statements executed while serving one request
+# TYPE db_queries_per_request histogram
+db_queries_per_request_bucket{route="/upload/",le="+Inf"} 4
+db_queries_per_request_sum{route="/upload/"} 40
+db_queries_per_request_count{route="/upload/"} 4
+db_pool_connections{state="checked_out"} 3
+'''
+
+
+class TestLoadHarness(unittest.TestCase):
+    def test_mix_weights(self):
+        self.assertEqual(parse_mix("list=3, upload"), {"list": 3.0, "upload": 1.0})
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_mix("browse=1")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_mix("list=0")
+
+    def test_metrics_text_and_queries_per_request(self):
+        after = parse_metrics(METRICS)
+        self.assertEqual(after[("db_pool_connections", (("state", "checked_out"),))], 3)
+
+        before = {("db_queries_per_request_sum", (("route", "/upload/"),)): 10,
+                  ("db_queries_per_request_count", (("route", "/upload/"),)): 2}
+        self.assertEqual(queries_per_request(before, after), {"/upload/": 15.0})
+
+    def test_replay_records_round_trip(self):
+        request = Request("update", "PUT", "/collections/7", {"X-User": "ops"}, json={"email": "a@b.c"}, offset=1.5)
+        self.assertEqual(Request.from_record(request.to_record()), request)
+        self.assertEqual(Request.from_record({"path": "/collections/?limit=5"}).scenario, "GET /collections/")
+
+    def test_uploads_are_unique_and_deterministic(self):
+        self.assertEqual(upload_csv(20, 1), upload_csv(20, 1))
+        self.assertNotEqual(upload_csv(20, 1), upload_csv(20, 2))
+        self.assertEqual(len(upload_csv(20, 1).splitlines()), 21)
+
+    def test_summary_counts_non_2xx_as_errors(self):
+        results = Results()
+        for latency, status in [(0.01, "200"), (0.02, "200"), (0.03, "404"), (0.5, "ReadTimeout")]:
+            results.add("history", latency, status)
+
+        summary = results.summary(elapsed=2.0)["history"]
+        self.assertEqual((summary["requests"], summary["errors"], summary["req_per_sec"]), (4, 2, 2.0))
+        self.assertEqual(summary["max_ms"], 500.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sqlalchemy import text
+
+from app.metrics import (
+    instrument_engine, register_collector, refresh_collectors, registry, start_request_query_count, _operation
+)
+from tests.base_test import SQLiteTestCase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, metrics_dir):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+class TestMetrics(unittest.TestCase):
+    def test_collectors_copy_values_on_refresh(self):
+        stats = {"entries": 3, "hits": 5}
+        register_collector("test_entries", "Entries", (), lambda: {(): stats["entries"]})
+        register_collector("test_hits_total", "Hits", ("kind",), lambda: {("record",): stats["hits"]}, kind="counter")
+
+        refresh_collectors(force=True)
+        stats.update(entries=2, hits=7)
+        refresh_collectors(force=True)
+
+        self.assertEqual(registry.get_sample_value("test_entries"), 2)
+        self.assertEqual(registry.get_sample_value("test_hits_total", {"kind": "record"}), 7)
+
+    def test_operation_label(self):
+        self.assertEqual(_operation("  select 1"), "SELECT")
+        self.assertEqual(_operation("INSERT INTO t VALUES (1)"), "INSERT")
+        self.assertEqual(_operation("PRAGMA foreign_keys"), "OTHER")
+
+    def test_scrape_merges_every_worker_in_multiprocess_mode(self):
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            for _ in range(2):
+                run_python("from app.metrics import upload_rows; upload_rows.labels(outcome='inserted').inc(2)", metrics_dir)
+            body = run_python("from app.metrics import render_metrics; print(render_metrics()[0].decode())", metrics_dir)
+
+        self.assertIn('upload_rows_total{outcome="inserted"} 4.0', body.splitlines())
+
+
+class TestEngineInstrumentation(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        instrument_engine(self.engine)
+
+    def test_statements_are_counted_against_the_current_request(self):
+        queries = start_request_query_count()
+        self.db.execute(text("SELECT 1"))
+        self.db.execute(text("SELECT 2"))
+        self.assertEqual(queries[0], 2)
+
+    def test_failed_statements_do_not_leak_timers(self):
+        with self.assertRaises(Exception):
+            self.db.execute(text("SELECT * FROM missing_table"))
+        self.db.rollback()
+        self.db.execute(text("SELECT 1"))
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.info.get("query_start", []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
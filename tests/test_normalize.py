@@ -0,0 +1,73 @@
+import re
+import unittest
+
+import pandas as pd
+
+from app.utils.excel_processor import classify_frame
+from app.utils.normalize import (
+    canonical_contact, canonical_contact_column, id_digits, id_digits_column, id_digits_many,
+    normalize_whitespace, normalize_whitespace_column
+)
+
+SAMPLES = [
+    "AB12C034", "00X1Y2", "999", "A", "", " 12-34 ", "٣4", "１２x", "0712 345-678", " +254 (712) 345678 ",
+    "712345678.0", "-", "a@b.c ", "  John \t  Doe ", "\x1cx\x1f", "Zoë  Ann", "(0)", "+", "12 34",
+]
+
+
+def regex_digits(raw):
+    return ''.join(re.findall(r'\d', raw))
+
+
+class TestIdDigits(unittest.TestCase):
+    def test_matches_the_regex_for_every_character(self):
+        for code in range(0x30000):
+            if not 0xD800 <= code <= 0xDFFF:
+                raw = f"a{chr(code)}1"
+                self.assertEqual(id_digits(raw), regex_digits(raw), hex(code))
+
+    def test_batch_and_column_forms_agree_with_the_scalar(self):
+        expected = [regex_digits(s) for s in SAMPLES]
+        self.assertEqual(id_digits_many(SAMPLES), expected)
+        for dtype in (None, object):
+            self.assertEqual(id_digits_column(pd.Series(SAMPLES, dtype=dtype)).tolist(), expected)
+
+    def test_rejects_non_strings_like_the_regex(self):
+        with self.assertRaises(TypeError):
+            id_digits(1234)
+
+
+class TestTextNormalization(unittest.TestCase):
+    def test_contacts(self):
+        self.assertEqual(canonical_contact("0712 345-678"), "0712345678")
+        self.assertEqual(canonical_contact(" +254 (712) 345678 "), "+254712345678")
+        self.assertEqual(canonical_contact("712345678.0"), "712345678.0")
+        self.assertEqual(canonical_contact(" call  after 5 "), "call after 5")
+        self.assertIsNone(canonical_contact(None))
+
+    def test_whitespace_and_case(self):
+        self.assertEqual(normalize_whitespace("  John \t  Doe "), "John Doe")
+        self.assertEqual(normalize_whitespace(" ÉMILE  Zola", case="casefold"), "émile zola")
+
+    def test_columns_match_scalars_for_both_string_dtypes(self):
+        for dtype in (None, object):
+            column = pd.Series(SAMPLES + [None], dtype=dtype)
+            for vectorized, scalar in [
+                (canonical_contact_column, canonical_contact),
+                (normalize_whitespace_column, normalize_whitespace),
+                (lambda c: normalize_whitespace_column(c, case="lower"), lambda v: normalize_whitespace(v, case="lower")),
+            ]:
+                result = vectorized(column)
+                self.assertEqual(result[:-1].tolist(), [scalar(s) for s in SAMPLES])
+                self.assertTrue(pd.isna(result.iloc[-1]))
+
+    def test_upload_rows_are_normalized(self):
+        results, _ = classify_frame(pd.DataFrame([
+            {'ID': 1, 'Name': '  Ann   Lee ', 'Contact': '0712 345 678'},
+            {'ID': 2, 'Name': 'Bo', 'Contact': '   '},
+        ]))
+        self.assertEqual([(c.name, c.contact, ro) for c, ro in results], [("Ann Lee", "0712345678", True), ("Bo", "", False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+import pandas as pd
+
+from app.ingest import ingest_excel_file
+from app.models.enhanced_collection import Collection
+from app.utils.parallel_excel import extract_workbooks, iter_parallel_sheets
+from tests.base_test import SQLiteTestCase
+
+
+def write_sheets(directory, name, sheets):
+    path = os.path.join(directory, name)
+    with pd.ExcelWriter(path) as writer:
+        for sheet, rows in sheets.items():
+            pd.DataFrame(rows).to_excel(writer, sheet_name=sheet, index=False)
+    return path
+
+
+class TestParallelSheets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.north = write_sheets(self.tmp.name, "north.xlsx", {
+            "Jan": [{'ID': 1, 'Name': 'Ann', 'Contact': '0700'}],
+            "Feb": [{'ID': 2, 'Name': 'Bob', 'Contact': None}, {'ID': 'bad', 'Name': 'X', 'Contact': '1'}],
+            "Notes": [{'Remark': 'no ID column, ignored'}],
+        })
+
+    def collect(self, path, workers):
+        ids, errors = [], []
+        for results, sheet_errors in iter_parallel_sheets(path, "north.xlsx", workers=workers):
+            ids.extend(data.id for data, _ in results)
+            errors.extend(sheet_errors)
+        return ids, errors
+
+    def test_reads_every_sheet_in_order(self):
+        for workers in (1, 2):
+            ids, errors = self.collect(self.north, workers)
+            self.assertEqual(ids, [1, 2])
+            self.assertEqual(errors, ["north.xlsx/Feb: Row 2: Invalid ID value 'bad'"])
+
+    def test_zip_of_workbooks(self):
+        south = write_sheets(self.tmp.name, "south.xlsx", {"Jan": [{'ID': 3, 'Name': 'Cy', 'Contact': '0711'}]})
+        archive = os.path.join(self.tmp.name, "regions.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.write(self.north, "regions/north.xlsx")
+            zf.write(south, "regions/south.xlsx")
+            zf.writestr("regions/readme.txt", "skipped")
+            zf.writestr("regions/broken.xlsx", b"not a workbook")
+
+        ids, errors = self.collect(archive, workers=2)
+
+        self.assertEqual(sorted(ids), [1, 2, 3])
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(any(e.startswith("regions/broken.xlsx: Failed to process Excel file") for e in errors))
+
+    def test_oversized_archives_are_refused(self):
+        archive = os.path.join(self.tmp.name, "bomb.zip")
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("a.csv", "ID,Name\n" + "1,x\n" * 100_000)
+            zf.writestr("b.csv", "ID,Name\n1,y\n")
+        self.assertLess(os.path.getsize(archive), 10_000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaisesRegex(ValueError, "members"):
+                extract_workbooks(archive, directory, max_members=1)
+            with self.assertRaisesRegex(ValueError, "unpacks"):
+                extract_workbooks(archive, directory, max_bytes=100_000)
+            self.assertEqual(len(extract_workbooks(archive, directory)), 2)
+
+class TestParallelIngest(SQLiteTestCase):
+    def test_all_sheets_upload_is_written_by_one_session(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_sheets(directory, "multi.xlsx", {
+                f"S{i}": [{'ID': 100 + i, 'Name': f'N{i}', 'Contact': '0700'}] for i in range(4)
+            })
+            result = ingest_excel_file(self.db, path, "clerk", all_sheets=True, workers=2)
+
+        self.assertEqual((result.records_processed, result.records_inserted, result.errors), (4, 4, []))
+        self.assertEqual(self.db.query(Collection).count(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
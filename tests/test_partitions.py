@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+
+from app.crud import bulk_create_collections, get_collection_rows, upsert_statement
+from app.models.enhanced_collection import Collection
+from app.partitions import _archive_path, add_months, archive_partitions, ensure_partitions, month_start, partition_name
+from app.schemas import CollectionCreate
+from tests.base_test import SQLiteTestCase
+
+
+def ddl(dialect):
+    return str(CreateTable(Collection.__table__).compile(dialect=dialect))
+
+
+class TestMonths(unittest.TestCase):
+    def test_month_arithmetic(self):
+        self.assertEqual(month_start(date(2024, 2, 29)), date(2024, 2, 1))
+        self.assertEqual(add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+        self.assertEqual(partition_name(date(2024, 3, 1)), "collections_p2024_03")
+
+    def test_rearchived_month_gets_a_suffix(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            first = _archive_path(archive_dir, "collections_p2024_01")
+            self.assertEqual(os.path.basename(first), "collections_p2024_01.ndjson.gz")
+            open(first, "wb").close()
+            self.assertEqual(os.path.basename(_archive_path(archive_dir, "collections_p2024_01")),
+                             "collections_p2024_01_2.ndjson.gz")
+
+
+
+class TestPartitionedSchema(unittest.TestCase):
+    def test_postgresql_table_is_partitioned_by_date(self):
+        statement = ddl(postgresql.dialect())
+        self.assertIn("PARTITION BY RANGE (date)", statement)
+        self.assertIn("UNIQUE (record_id, date)", statement)
+        self.assertIn("UNIQUE (upload_key, date)", statement)
+        self.assertNotIn("PRIMARY KEY", statement)
+
+    def test_other_databases_keep_a_plain_table(self):
+        statement = ddl(sqlite.dialect())
+        self.assertNotIn("PARTITION", statement)
+        self.assertIn("PRIMARY KEY (record_id)", statement)
+        self.assertIn("UNIQUE (upload_key)", statement)
+
+    def test_upsert_conflict_target_matches_the_unique_key(self):
+        compiled = str(upsert_statement("postgresql", partitioned=True).compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (upload_key, date)", compiled)
+        # Tables created before partitioning only have UNIQUE (upload_key)
+        compiled = str(upsert_statement("postgresql", partitioned=False).compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (upload_key)", compiled)
+        compiled = str(upsert_statement("sqlite").compile(dialect=sqlite.dialect()))
+        self.assertIn("ON CONFLICT (upload_key)", compiled)
+
+
+class TestDateRange(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=i, name=f"n{i}", date=date(2024, month, 15)), False) for i, month in enumerate((1, 2, 3, 4))
+        ])
+
+    def dates(self, **filters):
+        return [row.date for row in get_collection_rows(self.db, **filters)]
+
+    def test_bounds_are_inclusive(self):
+        self.assertEqual(self.dates(date_from=date(2024, 2, 15), date_to=date(2024, 3, 15)),
+                         [date(2024, 2, 15), date(2024, 3, 15)])
+        self.assertEqual(self.dates(date_from=date(2024, 3, 16)), [date(2024, 4, 15)])
+        self.assertEqual(self.dates(date_to=date(2024, 1, 31)), [date(2024, 1, 15)])
+
+    def test_maintenance_is_a_no_op_without_postgresql(self):
+        self.assertEqual(ensure_partitions(self.db), [])
+        self.assertEqual(archive_partitions(self.db, older_than_months=0), [])
+        self.assertEqual(len(self.dates()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from app.utils.excel_processor import classify_frame
+from app.utils.readers import engine_available, iter_frames, select_engine
+
+
+ROWS = [
+    {'ID': 1001, 'Name': 'John Doe', 'Contact': '0712345678', 'Date': '2024-01-15'},
+    {'ID': 1002, 'Name': 'Jane Smith', 'Contact': None, 'Date': None},
+    {'ID': 'bad', 'Name': 'Nope', 'Contact': '0700000000', 'Date': '2024-01-16'},
+    {'ID': None, 'Name': 'No ID', 'Contact': '0711111111', 'Date': None},
+    {'ID': 'N/A', 'Name': 'Text', 'Contact': '0722222222', 'Date': None},
+    {'ID': 1003, 'Name': None, 'Contact': '0734567890', 'Date': 'not a date'},
+]
+
+
+def classified(path, engine):
+    frames = list(iter_frames(path, 2, engine=engine))
+    results, errors = classify_frame(pd.concat(frames, ignore_index=True))
+    return [len(frame) for frame in frames], [(data.model_dump(), ro) for data, ro in results], errors
+
+
+class TestReaders(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_every_engine_classifies_the_same(self):
+        xlsx, csv = self.path("rows.xlsx"), self.path("rows.csv")
+        pd.DataFrame(ROWS).to_excel(xlsx, index=False)
+        pd.DataFrame(ROWS).to_csv(csv, index=False)
+
+        expected = classified(xlsx, 'openpyxl')
+        self.assertEqual(expected[0], [2, 2, 2])
+        self.assertEqual(expected[1][0][0]['contact'], '0712345678')
+        self.assertEqual(expected[2], ["Row 3: Invalid ID value 'bad'", "Row 5: Invalid ID value 'N/A'"])
+
+        for path, engine in [(xlsx, 'calamine'), (csv, 'pandas-csv'), (csv, 'pyarrow-csv')]:
+            if engine_available(engine):
+                with self.subTest(engine=engine):
+                    self.assertEqual(classified(path, engine), expected)
+
+    @unittest.skipUnless(engine_available('pyarrow-parquet'), "pyarrow not installed")
+    def test_parquet_export(self):
+        path = self.path("export.parquet")
+        pd.DataFrame({
+            'ID': [1001, 1002],
+            'Name': ['John Doe', None],
+            'Contact': ['0712345678', '0723456789'],
+            'Date': [datetime(2024, 1, 15), None],
+        }).to_parquet(path)
+
+        _, results, errors = classified(path, 'pyarrow-parquet')
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [(data['id'], data['contact'], ro) for data, ro in results],
+            [(1001, '0712345678', True), (1002, '0723456789', False)]
+        )
+        self.assertEqual(results[0][0]['date'], datetime(2024, 1, 15))
+
+    @unittest.skipUnless(engine_available('calamine'), "python-calamine not installed")
+    def test_large_xlsx_is_streamed(self):
+        xlsx = self.path("rows.xlsx")
+        pd.DataFrame(ROWS).to_excel(xlsx, index=False)
+        self.assertEqual(select_engine(xlsx), 'calamine')
+        with mock.patch("app.utils.readers.EXCEL_STREAM_THRESHOLD_MB", 0):
+            self.assertEqual(select_engine(xlsx), 'openpyxl')
+            with mock.patch("app.utils.readers.EXCEL_ENGINE", 'calamine'):
+                self.assertEqual(select_engine(xlsx), 'calamine')
+
+    def test_unsupported_suffix(self):
+        with self.assertRaises(ValueError):
+            select_engine("rows.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
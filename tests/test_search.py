@@ -0,0 +1,117 @@
+import importlib.util
+import unittest
+
+from app import async_crud
+from app.crud import (
+    COLLECTION_OUT_COLUMNS, bulk_create_collections, bulk_delete_collections, create_collection, delete_collection,
+    search_collections, update_collection
+)
+from app.database import Base
+from app.schemas import BulkTarget, CollectionCreate, CollectionFilter, CollectionUpdate
+from app.search import NgramIndex, index_for, similarity, trigram_search_query, trigrams
+from tests.base_test import SQLiteTestCase
+
+
+def names(rows):
+    return [row[1] for row in rows]  # CollectionOut column order: id, name, ...
+
+
+class TestTrigrams(unittest.TestCase):
+    def test_pg_trgm_padding(self):
+        self.assertEqual(trigrams("cat"), {"  c", " ca", "cat", "at "})
+        self.assertEqual(trigrams("a-b"), {"  a", " a ", "  b", " b "})
+
+    def test_similarity(self):
+        self.assertEqual(similarity(trigrams("word"), trigrams("word")), 1.0)
+        self.assertAlmostEqual(similarity(trigrams("word"), trigrams("two words")), 4 / 11)
+        self.assertEqual(similarity(set(), trigrams("word")), 0.0)
+
+
+class TestSearchCollections(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=1, name="Jane Wanjiku", contact="0712 345-678"), True),
+            (CollectionCreate(id=2, name="John Kamau", contact="0722000111"), True),
+            (CollectionCreate(id=3, name="Janet Otieno", contact="jotieno@example.com"), False),
+            (CollectionCreate(id=4, name="Peter Mwangi"), False),
+        ])
+
+    def test_prefix_matches_rank_first(self):
+        rows = search_collections(self.db, "jan")
+        self.assertEqual(names(rows), ["Jane Wanjiku", "Janet Otieno"])
+        self.assertTrue(all(row[-1] >= 1 for row in rows))
+
+    def test_prefix_of_a_later_word(self):
+        self.assertEqual(names(search_collections(self.db, "KAM")), ["John Kamau"])
+
+    def test_contact_prefix_ignores_separators(self):
+        self.assertEqual(names(search_collections(self.db, "0712 345")), ["Jane Wanjiku"])
+
+    def test_fuzzy_match(self):
+        rows = search_collections(self.db, "Peter Mwangy")
+        self.assertEqual(names(rows), ["Peter Mwangi"])
+        self.assertLess(rows[0][-1], 1)
+
+    def test_limit_and_no_match(self):
+        self.assertEqual(len(search_collections(self.db, "jan", limit=1)), 1)
+        self.assertEqual(search_collections(self.db, "zzzz"), [])
+
+    def test_blank_query_is_rejected(self):
+        for q in ("", "   ", "\t\n"):
+            with self.assertRaises(ValueError):
+                search_collections(self.db, q)
+            with self.assertRaises(ValueError):
+                trigram_search_query(q, 20, COLLECTION_OUT_COLUMNS)
+
+    def test_index_follows_writes(self):
+        search_collections(self.db, "jan")  # builds the index
+        created = create_collection(self.db, CollectionCreate(id=5, name="Janice Njeri"), False)
+        self.assertIn("Janice Njeri", names(search_collections(self.db, "jan")))
+
+        update_collection(self.db, created.record_id, CollectionUpdate(name="Alice Njeri", last_updated_by="me"))
+        self.assertNotIn("Janice Njeri", names(search_collections(self.db, "jan")))
+        self.assertEqual(names(search_collections(self.db, "alice")), ["Alice Njeri"])
+
+        delete_collection(self.db, created.record_id)
+        self.assertEqual(search_collections(self.db, "alice"), [])
+
+        bulk_delete_collections(self.db, BulkTarget(filter=CollectionFilter(ids=[3])))
+        self.assertEqual(names(search_collections(self.db, "jan")), ["Jane Wanjiku"])
+        self.assertEqual(len(index_for(self.db)), 3)
+
+    def test_stale_postings_are_compacted(self):
+        index = NgramIndex()
+        index.sync(self.db)
+        for n in range(10):
+            index.invalidate([1])
+            index.sync(self.db)
+        self.assertEqual(index._stale, 0)
+        self.assertEqual(len(index), 4)
+        self.assertEqual([record_id for record_id, _ in index.search("wanjiku", 5)], [1])
+
+
+@unittest.skipUnless(importlib.util.find_spec("aiosqlite"), "aiosqlite is not installed")
+class TestAsyncSearch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.db = async_sessionmaker(self.engine, expire_on_commit=False)()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        await self.engine.dispose()
+
+    async def test_search_follows_writes(self):
+        row = await async_crud.create_collection(self.db, CollectionCreate(id=1, name="Jane Wanjiku"), False)
+        self.assertEqual(names(await async_crud.search_collections(self.db, "wanj")), ["Jane Wanjiku"])
+
+        await async_crud.update_collection(self.db, row.record_id, CollectionUpdate(name="Mary Wanjiru", last_updated_by="me"))
+        self.assertEqual(names(await async_crud.search_collections(self.db, "wanj")), ["Mary Wanjiru"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import unittest
+from datetime import date, datetime
+
+import orjson
+
+from app.cache import CollectionCache
+from app.crud import bulk_create_collections, get_collection_rows, get_collection_rows_by_id, get_collections
+from app.models.enhanced_collection import Collection
+from app.schemas import CollectionCreate, CollectionOut
+from app.utils.serialization import collection_dicts, jsonable_collection_dicts
+from tests.base_test import SQLiteTestCase
+
+
+class TestFastListPayloads(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=1, name="a", email="a@b.c", contact="0700", date=date(2024, 1, 15)), True),
+            (CollectionCreate(id=1, name=None, date=datetime(2024, 2, 1)), False),
+            (CollectionCreate(id=2, name="Zoë"), False),
+        ])
+        # A row without a date, as legacy rows may have
+        self.db.add(Collection(id=3, read_only=False, date=None))
+        self.db.commit()
+
+    def expected(self):
+        return [CollectionOut.model_validate(c).model_dump(mode="json") for c in get_collections(self.db)]
+
+    def test_orjson_payload_matches_response_model_output(self):
+        payload = orjson.dumps(collection_dicts(get_collection_rows(self.db)))
+        self.assertEqual(json.loads(payload), self.expected())
+
+    def test_jsonable_dicts_match_cached_form(self):
+        self.assertEqual(jsonable_collection_dicts(get_collection_rows(self.db)), self.expected())
+
+    def test_history_dicts_share_cache_entries_with_get_history(self):
+        cache = CollectionCache()
+
+        async def load_dicts():
+            return jsonable_collection_dicts(get_collection_rows_by_id(self.db, 1))
+
+        stored = asyncio.run(cache.get_history_dicts(1, load_dicts))
+
+        async def fail():
+            raise AssertionError("should be served from the cache")
+
+        self.assertEqual([c.model_dump(mode="json") for c in asyncio.run(cache.get_history(1, fail))], stored)
+        self.assertEqual(cache.hits["history"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from app.crud import bulk_create_collections, delete_collection, update_collection, upsert_collections
+from app.models.enhanced_collection import Collection
+from app.schemas import CollectionCreate, CollectionUpdate
+from app.stats import get_collection_stats, rebuild_stats
+from tests.base_test import SQLiteTestCase
+
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+class TestCollectionStats(SQLiteTestCase):
+    def assertMatchesRebuild(self):
+        incremental = get_collection_stats(self.db, top_ids=100)
+        rebuild_stats(self.db)
+        self.assertEqual(incremental, get_collection_stats(self.db, top_ids=100))
+
+    def test_counts_by_status_date_and_id(self):
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=1, name="a", date=YESTERDAY), True),
+            (CollectionCreate(id=1, name="b", date=TODAY), False),
+            (CollectionCreate(id=2, name="c", date=TODAY), False),
+        ])
+
+        stats = get_collection_stats(self.db, top_ids=1)
+
+        self.assertEqual((stats.total, stats.read_only, stats.editable, stats.distinct_ids), (3, 1, 2, 2))
+        self.assertEqual(
+            [(d.date, d.total, d.read_only, d.editable) for d in stats.by_date],
+            [(YESTERDAY, 1, 1, 0), (TODAY, 2, 0, 2)]
+        )
+        self.assertEqual([(i.id, i.records) for i in stats.top_ids], [(1, 2)])
+
+    def test_updates_and_deletes_move_counts(self):
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=1, name="a", date=TODAY), False),
+            (CollectionCreate(id=2, name="b", date=TODAY), False),
+        ])
+        first, second = self.db.query(Collection).order_by(Collection.record_id).all()
+
+        update_collection(self.db, first.record_id, CollectionUpdate(date=YESTERDAY, last_updated_by="me"))
+        delete_collection(self.db, second.record_id)
+
+        stats = get_collection_stats(self.db)
+        self.assertEqual([(d.date, d.total) for d in stats.by_date], [(YESTERDAY, 1)])
+        self.assertEqual([(i.id, i.records) for i in stats.top_ids], [(1, 1)])
+        self.assertMatchesRebuild()
+
+    def test_uploads_keep_stats_in_step(self):
+        upsert_collections(self.db, [(CollectionCreate(id=i % 4, name="x", date=TODAY), False) for i in range(10)])
+        upsert_collections(self.db, [(CollectionCreate(id=9, name="y", date=YESTERDAY), True)])
+
+        self.assertEqual(get_collection_stats(self.db).total, self.db.query(Collection).count())
+        self.assertMatchesRebuild()
+
+    def test_undated_records_count_in_the_totals(self):
+        bulk_create_collections(self.db, [
+            (CollectionCreate(id=1, name="a", date=TODAY), True),
+            (CollectionCreate(id=2, name="b", date=TODAY), False),
+        ])
+        editable = self.db.query(Collection).filter(Collection.id == 2).one()
+
+        # e.g. rows loaded by init.sql or manual SQL; the API dates new records
+        update_collection(self.db, editable.record_id, CollectionUpdate(date=None, last_updated_by="me"))
+        stats = get_collection_stats(self.db)
+        self.assertEqual((stats.total, stats.read_only, stats.editable, stats.undated), (2, 1, 1, 1))
+        self.assertEqual([(d.date, d.total) for d in stats.by_date], [(TODAY, 1)])
+        self.assertMatchesRebuild()
+
+        update_collection(self.db, editable.record_id, CollectionUpdate(date=TODAY, last_updated_by="me"))
+        stats = get_collection_stats(self.db)
+        self.assertEqual((stats.total, stats.undated), (2, 0))
+        self.assertMatchesRebuild()
+
+    def test_unsupported_database_is_refused_before_writing(self):
+        with mock.patch.object(self.engine.dialect, "name", "mssql"):
+            with self.assertRaises(ValueError):
+                bulk_create_collections(self.db, [(CollectionCreate(id=1, name="a", date=TODAY), False)])
+        self.assertEqual(self.db.query(Collection).count(), 0)
+
+    def test_empty_table(self):
+        stats = get_collection_stats(self.db)
+        self.assertEqual((stats.total, stats.by_date, stats.top_ids), (0, [], []))
+
+
+if __name__ == '__main__':
+    unittest.main()